@@ -1,6 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import Lower
 
 
 class AuthorLoginForm(forms.Form):
@@ -80,28 +82,53 @@ class AuthorRegisterForm(forms.ModelForm):
         strip=False,
     )
 
-    def clean_email(self):
-        email = self.cleaned_data.get("email")
-        exists = User.objects.filter(email=email).exists()
-
-        if exists:
-            raise ValidationError("E-mail is already in use.", code="invalid")
-
-        return email
-
-    def clean_username(self):
-        username = self.cleaned_data.get("username")
-        exists = User.objects.filter(username=username).exists()
-
-        if exists:
-            raise ValidationError(
-                "Username is already in use.", code="invalid")
-
-        return username
+    def taken_fields(self, username, email):
+        """
+        Names of the fields whose value belongs to another user, checked
+        with one query served by the username index and the
+        case-insensitive e-mail index (auth_user_email_lower_uniq).
+        """
+        username_taken = Q(username=username)
+        email_taken = Q(email_lower=Lower(Value(email)), email__gt="")
+        rows = (User.objects
+                .alias(email_lower=Lower("email"))
+                .filter(username_taken | email_taken)
+                .annotate(
+                    username_taken=ExpressionWrapper(
+                        username_taken, output_field=BooleanField()),
+                    email_taken=ExpressionWrapper(
+                        email_taken, output_field=BooleanField()))
+                .values_list("username_taken", "email_taken")[:2])
+
+        taken = set()
+        for username_match, email_match in rows:
+            if username_match:
+                taken.add("username")
+            if email_match:
+                taken.add("email")
+        return taken
+
+    def add_taken_errors(self, taken):
+        if "username" in taken:
+            self.add_error("username", ValidationError(
+                "Username is already in use.", code="invalid"))
+        if "email" in taken:
+            self.add_error("email", ValidationError(
+                "E-mail is already in use.", code="invalid"))
+
+    def validate_unique(self):
+        # clean() already checked username and e-mail in a single query,
+        # and the database enforces both.
+        pass
 
     def clean(self):
         cleaned_data = super().clean()
 
+        username = cleaned_data.get("username")
+        email = cleaned_data.get("email")
+        if username or email:
+            self.add_taken_errors(self.taken_fields(username, email))
+
         password = cleaned_data.get("password")
         password2 = cleaned_data.get("password2")
 
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+# auth.User can't declare constraints of its own, so the index is created
+# here. "email > ''" leaves users without an e-mail out of the constraint;
+# queries must repeat that condition for the partial index to be used.
+# Case-insensitive duplicates must be merged before this migration runs.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE UNIQUE INDEX auth_user_email_lower_uniq "
+                "ON auth_user (LOWER(email)) WHERE email > ''"
+            ),
+            reverse_sql="DROP INDEX auth_user_email_lower_uniq",
+        ),
+    ]
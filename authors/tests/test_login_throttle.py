@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from authors.throttling import TokenBucket
+
+
+@override_settings(LOGIN_THROTTLE_ENABLED=True,
+                   LOGIN_THROTTLE_IP_RATE="20/60",
+                   LOGIN_THROTTLE_USERNAME_RATE="3/300")
+class LoginThrottleViewTests(TestCase):
+    def setUp(self):
+        caches["login_throttle"].clear()
+        User.objects.create_user(username="username", password="password")
+        self.url = reverse("authors:login-create")
+        return super().setUp()
+
+    def attempt(self, username="username", password="wrong", ip="10.0.0.1",
+                **headers):
+        return self.client.post(self.url, data={
+            "username": username,
+            "password": password,
+        }, REMOTE_ADDR=ip, **headers)
+
+    def test_failed_attempts_throttle_the_username_before_authenticate(self):
+        for _ in range(3):
+            self.assertEqual(self.attempt().status_code, 302)
+
+        with mock.patch("authors.views.authenticate") as authenticate:
+            response = self.attempt(password="password", ip="10.0.0.2")
+
+        authenticate.assert_not_called()
+        self.assertContains(response, "Try again in 100 seconds.",
+                            status_code=429)
+        self.assertEqual(response["Retry-After"], "100")
+
+    def test_usernames_are_throttled_case_insensitively(self):
+        for username in ("username", "USERNAME", "UserName"):
+            self.attempt(username=username)
+
+        self.assertEqual(self.attempt().status_code, 429)
+
+    def test_successful_logins_do_not_use_the_username_budget(self):
+        for _ in range(5):
+            response = self.attempt(password="password")
+            self.assertRedirects(response, reverse("questions:list"))
+            self.client.logout()
+
+    @override_settings(LOGIN_THROTTLE_IP_RATE="3/60")
+    def test_every_attempt_counts_against_the_client_ip(self):
+        for index in range(3):
+            self.attempt(username=f"user{index}")
+
+        self.assertEqual(self.attempt(username="other").status_code, 429)
+        self.assertEqual(
+            self.attempt(username="other", ip="10.0.0.9").status_code, 302)
+
+    @override_settings(LOGIN_THROTTLE_IP_RATE="3/60",
+                       LOGIN_THROTTLE_PROXY_HOPS=1)
+    def test_clients_behind_a_proxy_are_throttled_separately(self):
+        for index in range(3):
+            self.attempt(username=f"user{index}", ip="10.0.0.254",
+                         HTTP_X_FORWARDED_FOR="203.0.113.1")
+
+        blocked = self.attempt(username="other", ip="10.0.0.254",
+                               HTTP_X_FORWARDED_FOR="203.0.113.1")
+        self.assertEqual(blocked.status_code, 429)
+        # A spoofed first entry doesn't escape the proxy-added one.
+        spoofed = self.attempt(username="other", ip="10.0.0.254",
+                               HTTP_X_FORWARDED_FOR="1.2.3.4, 203.0.113.1")
+        self.assertEqual(spoofed.status_code, 429)
+        other = self.attempt(username="other", ip="10.0.0.254",
+                             HTTP_X_FORWARDED_FOR="203.0.113.2")
+        self.assertEqual(other.status_code, 302)
+
+    @override_settings(LOGIN_THROTTLE_ENABLED=False)
+    def test_throttling_can_be_disabled(self):
+        for _ in range(5):
+            self.assertEqual(self.attempt().status_code, 302)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches["login_throttle"]
+        self.cache.clear()
+        self.bucket = TokenBucket(self.cache, "test", capacity=2, period=10)
+
+    @mock.patch("authors.throttling.time.time")
+    def test_tokens_refill_over_time(self, now):
+        now.return_value = 1000.0
+        self.assertEqual(self.bucket.consume("key"), 0)
+        self.assertEqual(self.bucket.consume("key"), 0)
+        self.assertEqual(self.bucket.consume("key"), 5)
+
+        now.return_value = 1005.0
+        self.assertEqual(self.bucket.peek("key"), 0)
+        self.assertEqual(self.bucket.consume("key"), 0)
+        self.assertEqual(self.bucket.consume("key"), 5)
+
+    def test_one_cache_entry_per_key(self):
+        for _ in range(50):
+            self.bucket.consume("key")
+
+        self.assertEqual(len(self.cache._cache), 1)
+
+
+class RunLoginBenchmarkCommandTests(TestCase):
+    def test_legitimate_logins_are_measured_in_every_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_login_benchmark", stdout=StringIO(), logins=2,
+                         attackers=0, output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(set(results["modes"]), {
+            "no attack", "attack, throttle off", "attack, throttle on"})
+        for row in results["modes"].values():
+            self.assertEqual(row["requests"], 2)
+            self.assertEqual(row["errors"], 0)
+
+    @override_settings(
+        LOGIN_THROTTLE_IP_RATE="20/60",
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_legitimate_logins_are_not_throttled_by_default(self):
+        # Default logins; one fast attacker keeps the attack phases short.
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_login_benchmark", stdout=StringIO(),
+                         attackers=1, attack_rate=200, output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        for row in results["modes"].values():
+            self.assertEqual(row["requests"], 30)
+            self.assertEqual(row["throttled"], 0)
+            self.assertEqual(row["errors"], 0)
+        self.assertGreater(
+            results["modes"]["attack, throttle on"]["attack_throttled"], 0)
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from authors.forms import AuthorRegisterForm
+
+
+class RegisterUniquenessTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username="existing", email="Taken@Email.com",
+                                 password="password")
+        self.form_data = {
+            "username": "username",
+            "email": "email@email.com",
+            "password": "passwords",
+            "password2": "passwords",
+        }
+        return super().setUp()
+
+    def form(self, **data):
+        return AuthorRegisterForm(data={**self.form_data, **data})
+
+    def test_username_and_email_are_checked_in_one_query(self):
+        form = self.form()
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+
+    def test_email_is_compared_case_insensitively(self):
+        form = self.form(email="taken@EMAIL.com")
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["email"], ["E-mail is already in use."])
+        self.assertNotIn("username", form.errors)
+
+    def test_both_fields_can_be_taken(self):
+        form = self.form(username="existing", email="taken@email.com")
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["username"],
+                         ["Username is already in use."])
+        self.assertEqual(form.errors["email"], ["E-mail is already in use."])
+
+    def test_database_rejects_case_insensitive_duplicate_emails(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username="other", email="TAKEN@email.com")
+
+    def test_users_without_email_do_not_conflict(self):
+        User.objects.create(username="first", email="")
+        User.objects.create(username="second", email="")
+
+        self.assertEqual(User.objects.filter(email="").count(), 2)
+
+    def test_lost_race_becomes_a_form_error(self):
+        taken_fields = AuthorRegisterForm.taken_fields
+        calls = []
+
+        def race(form, username, email):
+            calls.append(username)
+            if len(calls) == 1:
+                # Another sign-up commits between clean() and save().
+                User.objects.create(username="racer", email=email.upper())
+                return set()
+            return taken_fields(form, username, email)
+
+        with mock.patch.object(AuthorRegisterForm, "taken_fields", race):
+            response = self.client.post(reverse("authors:register"),
+                                        data=self.form_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["form"].errors["email"],
+                         ["E-mail is already in use."])
+        self.assertFalse(User.objects.filter(username="username").exists())
+
+
+class RunRegisterBenchmarkCommandTests(TestCase):
+    def test_validation_is_timed_with_and_without_the_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_register_benchmark", stdout=StringIO(),
+                         users=5, registrations=3, without_index=True,
+                         output=path, yes=True)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["users"], 5)
+        for row in results["modes"].values():
+            self.assertEqual(row["requests"], 3)
+            self.assertEqual(row["errors"], 0)
+            self.assertEqual(row["queries_per_request"], 1)
+        # The index is back in place.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username="other",
+                                email="registered0@EXAMPLE.com")
+        # Nobody can log in as the users it added.
+        self.assertFalse(User.objects.filter(is_active=True).exists())
+        self.assertFalse(any(
+            user.has_usable_password() for user in User.objects.all()))
+
+    def test_refuses_to_run_without_confirmation(self):
+        with self.assertRaisesMessage(CommandError, "--yes"):
+            call_command("run_register_benchmark", stdout=StringIO(),
+                         users=5, registrations=3)
+
+        self.assertFalse(User.objects.exists())
+
+    def test_index_is_restored_when_the_run_fails(self):
+        with mock.patch("questions.benchmark.time_registration_forms",
+                        side_effect=[{}, RuntimeError("boom")]):
+            with self.assertRaisesMessage(RuntimeError, "boom"):
+                call_command("run_register_benchmark", stdout=StringIO(),
+                             users=1, without_index=True, yes=True)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username="other",
+                                email="registered0@EXAMPLE.com")
@@ -0,0 +1,108 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def parse_rate(rate):
+    """
+    ``"<attempts>/<seconds>"`` -> ``(attempts, seconds)``.
+
+    >>> parse_rate("20/60")
+    (20, 60.0)
+    """
+    attempts, seconds = rate.split("/")
+    return int(attempts), float(seconds)
+
+
+def client_ip(request):
+    """
+    The client's address. Behind LOGIN_THROTTLE_PROXY_HOPS reverse proxies,
+    that's the X-Forwarded-For entry the outermost of them added; entries
+    before it come from the client and can't be trusted.
+    """
+    hops = settings.LOGIN_THROTTLE_PROXY_HOPS
+    if hops:
+        forwarded = [address.strip() for address in request.META.get(
+            "HTTP_X_FORWARDED_FOR", "").split(",") if address.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+class TokenBucket:
+    """
+    A bucket of ``capacity`` tokens refilled at ``capacity / period`` per
+    second. Each key is stored as one ``(tokens, timestamp)`` pair that
+    expires once the bucket would be full again, so memory per key is
+    constant and idle keys cost nothing.
+
+    Reads and writes aren't atomic: with a shared cache, concurrent workers
+    can let a few extra attempts through, which is fine for throttling.
+    """
+
+    def __init__(self, cache, prefix, capacity, period):
+        self.cache = cache
+        self.prefix = prefix
+        self.capacity = capacity
+        self.rate = capacity / period
+
+    def cache_key(self, key):
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def tokens(self, key, now):
+        state = self.cache.get(self.cache_key(key))
+        if state is None:
+            return self.capacity
+        tokens, updated_at = state
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, tokens):
+        return max(1, math.ceil((1 - tokens) / self.rate))
+
+    def peek(self, key):
+        """Seconds until ``key`` has a token, 0 if it has one now."""
+        tokens = self.tokens(key, time.time())
+        return 0 if tokens >= 1 else self.retry_after(tokens)
+
+    def consume(self, key):
+        """Take a token from ``key``; same return value as ``peek``."""
+        now = time.time()
+        tokens = self.tokens(key, now)
+        if tokens < 1:
+            return self.retry_after(tokens)
+
+        tokens -= 1
+        refill = math.ceil((self.capacity - tokens) / self.rate)
+        self.cache.set(self.cache_key(key), (tokens, now), max(1, refill))
+        return 0
+
+
+class LoginThrottle:
+    """
+    Every login attempt takes a token from the client IP's bucket, and
+    every failed one from the username's bucket. ``check`` runs before
+    ``authenticate()`` so throttled attempts never pay for password hashing.
+    """
+
+    def __init__(self):
+        cache = caches[settings.LOGIN_THROTTLE_CACHE]
+        self.ip = TokenBucket(cache, "login-ip",
+                              *parse_rate(settings.LOGIN_THROTTLE_IP_RATE))
+        self.username = TokenBucket(
+            cache, "login-user",
+            *parse_rate(settings.LOGIN_THROTTLE_USERNAME_RATE))
+
+    def check(self, request, username):
+        """Seconds the client must wait, or 0 if it may try to log in."""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return 0
+        return (self.username.peek(username.casefold())
+                or self.ip.consume(client_ip(request)))
+
+    def failed(self, username):
+        if settings.LOGIN_THROTTLE_ENABLED:
+            self.username.consume(username.casefold())
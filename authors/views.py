@@ -6,6 +6,9 @@ from django.contrib.auth import authenticate, login
 from django.views.generic import CreateView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+
+from .throttling import LoginThrottle
 
 
 # Create your views here.
@@ -25,20 +28,40 @@ def login_create(request):
 
     form = AuthorLoginForm(request.POST)
     if form.is_valid():
+        username = form.cleaned_data.get("username", "")
+        throttle = LoginThrottle()
+        retry_after = throttle.check(request, username)
+        if retry_after:
+            return login_throttled(request, form, retry_after)
+
         authenticated_user = authenticate(
-            username=form.cleaned_data.get("username", ""),
+            username=username,
             password=form.cleaned_data.get("password", ""),
         )
         if authenticated_user is not None:
             login(request, authenticated_user)
             return redirect(reverse("questions:list"))
         else:
+            throttle.failed(username)
             messages.error(request, "Invalid credentials")
     else:
         messages.error(request, "Invalid username or password")
     return redirect(reverse("authors:login"))
 
 
+def login_throttled(request, form, retry_after):
+    messages.error(
+        request,
+        f"Too many login attempts. Try again in {retry_after} seconds.")
+    response = render(request, "authors/author_login.html", {
+        "form": AuthorLoginForm(initial={
+            "username": form.cleaned_data.get("username", "")}),
+        "form_action": reverse("authors:login-create"),
+    }, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
 class AuthorRegisterView(SuccessMessageMixin, CreateView):
     template_name = "authors/author_register.html"
     form_class = AuthorRegisterForm
@@ -47,7 +70,15 @@ class AuthorRegisterView(SuccessMessageMixin, CreateView):
     def form_valid(self, form):
         user = form.save(commit=False)
         user.set_password(user.password)
-        user.save()
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Another sign-up took the username or e-mail after clean().
+            form.add_taken_errors(
+                form.taken_fields(user.username, user.email)
+                or {"username", "email"})
+            return self.form_invalid(form)
 
         return super().form_valid(form)
 
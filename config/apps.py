@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    name = 'config'
+    verbose_name = 'Project'
+
+    def ready(self):
+        # Connection hooks have to be registered before the first query,
+        # including in management commands that never load the URLconf.
+        from . import checks, pool_stats, sqlite  # noqa: F401
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends that keep their entries inside each worker process: a purge in
+# one process never reaches the others.
+PER_PROCESS_BACKENDS = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+def is_per_process(alias):
+    return settings.CACHES[alias]["BACKEND"] in PER_PROCESS_BACKENDS
+
+
+@register(Tags.caches)
+def check_page_cache(app_configs, **kwargs):
+    if settings.PAGE_CACHE_ENABLED and is_per_process(
+            settings.PAGE_CACHE_ALIAS):
+        return [Warning(
+            "The page cache is enabled with a per-process cache backend.",
+            hint="With more than one worker, workers keep serving pages "
+                 "another one has purged. Set PAGE_CACHE_BACKEND to a shared "
+                 "backend such as RedisCache.",
+            id="config.W001",
+        )]
+    return []
+
+
+@register(Tags.caches)
+def check_comment_thread_cache(app_configs, **kwargs):
+    from questions.comment_cache import CACHE_ALIAS
+
+    if settings.COMMENT_THREAD_CACHE_TIMEOUT and is_per_process(CACHE_ALIAS):
+        return [Warning(
+            "The comment thread cache is enabled with a per-process cache "
+            "backend.",
+            hint="With more than one worker, workers keep serving threads "
+                 "another one has invalidated. Set FRAGMENT_CACHE_BACKEND to "
+                 "a shared backend such as RedisCache.",
+            id="config.W002",
+        )]
+    return []
+
+
+@register(Tags.caches)
+def check_count_cache(app_configs, **kwargs):
+    from questions.pagination import COUNT_CACHE_ALIAS
+
+    if settings.PAGINATION_COUNT_CACHE_TIMEOUT and is_per_process(
+            COUNT_CACHE_ALIAS):
+        return [Warning(
+            "The pagination count cache is enabled with a per-process cache "
+            "backend.",
+            hint="With more than one worker, workers keep serving counts "
+                 "another one has invalidated. Set COUNT_CACHE_BACKEND to a "
+                 "shared backend such as RedisCache.",
+            id="config.W003",
+        )]
+    return []
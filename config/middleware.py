@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.deprecation import MiddlewareMixin
+
+from .routers import RoutingState, routing_state
+
+logger = logging.getLogger("request_timing")
+
+current_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+    def timed_render(self, render):
+        # Lazy queries run while rendering are already counted as DB time.
+        def wrapper():
+            start, db_start = time.perf_counter(), self.db
+            try:
+                return render()
+            finally:
+                self.template += (time.perf_counter() - start
+                                  - (self.db - db_start))
+        return wrapper
+
+
+def record_query(execute, sql, params, many, context):
+    # Context variables follow the request into sync_to_async threads, so
+    # async ORM queries are attributed to the right request too.
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_on_new_connection(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class RequestTimingMiddleware(MiddlewareMixin):
+    """
+    Record DB queries, DB time, template render time and view time for a
+    sample of requests and report them as a Server-Timing header and a
+    JSON log line on the ``request_timing`` logger. The three durations
+    don't overlap and add up to ``total``.
+
+    Template time covers TemplateResponse rendering (class-based views);
+    templates rendered inside a function view count as view time.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        timings = self.start(request)
+        if timings is None:
+            return self.get_response(request)
+
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings,
+                           time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings = self.start(request)
+        if timings is None:
+            return await self.get_response(request)
+
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings,
+                           time.perf_counter() - start)
+
+    def start(self, request):
+        sample_rate = getattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 0)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return None
+
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        request._timings = RequestTimings()
+        return request._timings
+
+    def finish(self, request, response, timings, total):
+        metrics = {
+            "db": timings.db,
+            "tpl": timings.template,
+            "view": max(total - timings.db - timings.template, 0.0),
+            "total": total,
+        }
+        if getattr(settings, "REQUEST_TIMING_HEADER", True):
+            response["Server-Timing"] = ", ".join(
+                [f'{name};dur={seconds * 1000:.2f}'
+                 for name, seconds in metrics.items()]
+                + [f'queries;desc="{timings.queries}"'])
+
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(request.resolver_match, "view_name", None),
+            "status": response.status_code,
+            "queries": timings.queries,
+            **{f"{name}_ms": round(seconds * 1000, 3)
+               for name, seconds in metrics.items()},
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, "_timings", None)
+        if timings is not None:
+            response.render = timings.timed_render(response.render)
+        return response
+
+
+# Public views whose GET requests may read questions and comments from a
+# replica.
+REPLICA_READ_VIEWS = (
+    "questions:list",
+    "questions:detail",
+    "questions:comments",
+    "questions:search",
+    "questions-api:list",
+    "questions-api:detail",
+    "questions-api:comments",
+)
+REPLICA_PIN_COOKIE = "primary_pin"
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Let GET/HEAD requests to the public question views read from a replica
+    (see config.routers.PrimaryReplicaRouter). A client that writes a
+    question or comment gets a cookie that keeps its reads on the primary
+    for ``REPLICA_STICKY_SECONDS``, so it sees its own writes while the
+    replicas catch up.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = routing_state.get()
+        if state is not None and not state.wrote:
+            state.use_replica = (
+                bool(settings.REPLICA_DATABASES)
+                and request.method in ("GET", "HEAD")
+                and request.resolver_match.view_name in REPLICA_READ_VIEWS
+                and REPLICA_PIN_COOKIE not in request.COOKIES
+            )
+
+    def finish(self, response, state):
+        if state.wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite="Lax")
+        return response
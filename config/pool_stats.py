@@ -0,0 +1,77 @@
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+
+# Per process (worker) and per database alias:
+#   opened    - new connections to the database
+#   reused    - requests served by a connection kept from an earlier request
+#   discarded - connections closed and replaced by a new one: on every
+#               request with CONN_MAX_AGE=0, otherwise when they reached
+#               their max age, had errors or failed a health check
+_stats = defaultdict(Counter)
+_lock = threading.Lock()
+
+
+def _count(alias, event):
+    with _lock:
+        _stats[alias][event] += 1
+
+
+def snapshot():
+    with _lock:
+        databases = {
+            alias: {event: counts[event]
+                    for event in ("opened", "reused", "discarded")}
+            for alias, counts in _stats.items()
+        }
+    return {"pid": os.getpid(), "databases": databases}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def count_reuse(execute, sql, params, many, context):
+    connection = context["connection"]
+    if connection._pool_request_pending:
+        connection._pool_request_pending = False
+        _count(connection.alias, "reused")
+    return execute(sql, params, many, context)
+
+
+def install_reuse_counter(connection):
+    if count_reuse not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_reuse)
+
+
+@receiver(connection_created)
+def track_new_connection(sender, connection, **kwargs):
+    if getattr(connection, "_pool_has_connected", False):
+        _count(connection.alias, "discarded")
+    connection._pool_has_connected = True
+    install_reuse_counter(connection)
+    _count(connection.alias, "opened")
+    connection._pool_request_pending = False
+
+
+@receiver(request_started)
+def track_request_started(**kwargs):
+    # Whether Django's close_old_connections has run yet or not, the first
+    # query of the request tells: a connection that survives until then was
+    # reused, one that didn't is replaced through connection_created.
+    for connection in connections.all(initialized_only=True):
+        install_reuse_counter(connection)
+        connection._pool_request_pending = True
+
+
+@staff_member_required
+def pool_stats_view(request):
+    return JsonResponse(snapshot())
@@ -0,0 +1,46 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Only these models are read from replicas, and only while a request has
+# opted in (see config.middleware.ReplicaRoutingMiddleware). Everything
+# else, including sessions and users, stays on the primary.
+REPLICATED_MODELS = {"questions.question", "questions.comment"}
+
+routing_state = ContextVar("replica_routing", default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (state is None or not state.use_replica
+                or model._meta.label_lower not in REPLICATED_MODELS):
+            return None
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None and model._meta.label_lower in REPLICATED_MODELS:
+            # Read the rest of this request from the primary as well.
+            state.use_replica = False
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
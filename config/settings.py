@@ -40,12 +40,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     # my_apps
+    'config.apps.ProjectConfig',
     'questions.apps.QuestionsConfig',
     'authors.apps.AuthorsConfig',
+    'tasks.apps.TasksConfig',
 ]
 
 MIDDLEWARE = [
+    'config.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.ReplicaRoutingMiddleware',
+    'questions.page_cache.PageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,18 +79,139 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Serve the question list and detail pages with async views (ASGI only)
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Connections are kept open for CONN_MAX_AGE seconds (0 closes them after
+# every request) and checked before being reused by a new request.
+# Per-worker counts are served by config.pool_stats at /_stats/connections/
+
+CONN_MAX_AGE = int(os.environ.get("DATABASE_CONN_MAX_AGE", "60"))
+CONN_HEALTH_CHECKS = os.environ.get("DATABASE_CONN_HEALTH_CHECKS", "1") == "1"
+
 DATABASES = {
     'default': {
         'ENGINE': os.environ.get("DATABASE_ENGINE"),
         'NAME': os.environ.get("DATABASE_NAME"),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': CONN_HEALTH_CHECKS,
+    }
+}
+
+# SQLite production mode: WAL journaling and tuned pragmas applied to every
+# new SQLite connection (config.sqlite). cache_size is in KiB when negative.
+
+SQLITE_TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.environ.get("DATABASE_SQLITE_MMAP_SIZE", "268435456")),
+    'cache_size': int(os.environ.get("DATABASE_SQLITE_CACHE_SIZE", "-65536")),
+    'busy_timeout': int(os.environ.get("DATABASE_SQLITE_BUSY_TIMEOUT", "5000")),
+}
+SQLITE_PRAGMAS = (SQLITE_TUNED_PRAGMAS
+                  if os.environ.get("DATABASE_SQLITE_TUNED") == "1" else {})
+
+# Writes that hit "database is locked" are retried with jittered backoff
+SQLITE_LOCK_RETRIES = int(os.environ.get("DATABASE_SQLITE_LOCK_RETRIES", "5"))
+SQLITE_LOCK_RETRY_DELAY = float(
+    os.environ.get("DATABASE_SQLITE_LOCK_RETRY_DELAY", "0.05"))
+
+# Read replicas, as comma separated database names using the same engine.
+# They are aliased replica1, replica2, ... and only serve question and
+# comment reads of the public views (config.routers.PrimaryReplicaRouter).
+
+REPLICA_DATABASES = []
+for index, name in enumerate(
+        filter(None, os.environ.get("DATABASE_REPLICA_NAMES", "").split(",")),
+        start=1):
+    alias = f"replica{index}"
+    DATABASES[alias] = {
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'NAME': name.strip(),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': CONN_HEALTH_CHECKS,
+        'TEST': {'MIRROR': 'default'},
     }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["config.routers.PrimaryReplicaRouter"]
+
+# Seconds a client keeps reading from the primary after it writes
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The login throttle can use a shared store (e.g. RedisCache) so limits
+# hold across workers; local memory is the single-process stand-in.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'login_throttle': {
+        'BACKEND': os.environ.get(
+            "LOGIN_THROTTLE_CACHE_BACKEND",
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get(
+            "LOGIN_THROTTLE_CACHE_LOCATION", 'login-throttle'),
+    },
+    'sessions': {
+        'BACKEND': os.environ.get(
+            "SESSION_CACHE_BACKEND",
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("SESSION_CACHE_LOCATION", 'sessions'),
+    },
+    'fragments': {
+        'BACKEND': os.environ.get(
+            "FRAGMENT_CACHE_BACKEND",
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("FRAGMENT_CACHE_LOCATION", 'fragments'),
+    },
+    'pages': {
+        'BACKEND': os.environ.get(
+            "PAGE_CACHE_BACKEND",
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("PAGE_CACHE_LOCATION", 'pages'),
+    },
+    'counts': {
+        'BACKEND': os.environ.get(
+            "COUNT_CACHE_BACKEND",
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get("COUNT_CACHE_LOCATION", 'counts'),
+    },
 }
 
 
+# Sessions and messages
+# "db" keeps Django's defaults. "cached_db" reads sessions through the
+# "sessions" cache, which must be shared (e.g. RedisCache) when there is
+# more than one worker, and "signed_cookies" keeps them client side. Both
+# keep flashed messages in a cookie, never in the session.
+
+SESSION_PROFILES = {
+    'db': (
+        'django.contrib.sessions.backends.db',
+        'django.contrib.messages.storage.fallback.FallbackStorage',
+    ),
+    'cached_db': (
+        'django.contrib.sessions.backends.cached_db',
+        'django.contrib.messages.storage.cookie.CookieStorage',
+    ),
+    'signed_cookies': (
+        'django.contrib.sessions.backends.signed_cookies',
+        'django.contrib.messages.storage.cookie.CookieStorage',
+    ),
+}
+SESSION_PROFILE = os.environ.get("SESSION_PROFILE", "db")
+SESSION_ENGINE, MESSAGE_STORAGE = SESSION_PROFILES[SESSION_PROFILE]
+SESSION_CACHE_ALIAS = 'sessions'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -127,6 +253,101 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Request timing
+# Fraction of requests instrumented by config.middleware.RequestTimingMiddleware
+
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_TIMING_SAMPLE_RATE", "0.05"))
+REQUEST_TIMING_HEADER = os.environ.get("REQUEST_TIMING_HEADER", "1") == "1"
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'request_timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Login throttling (authors.throttling), as "<attempts>/<seconds>" token
+# buckets: every attempt per client IP, failed attempts per username.
+LOGIN_THROTTLE_ENABLED = os.environ.get("LOGIN_THROTTLE_ENABLED", "1") == "1"
+LOGIN_THROTTLE_CACHE = "login_throttle"
+LOGIN_THROTTLE_IP_RATE = os.environ.get("LOGIN_THROTTLE_IP_RATE", "20/60")
+LOGIN_THROTTLE_USERNAME_RATE = os.environ.get(
+    "LOGIN_THROTTLE_USERNAME_RATE", "5/300")
+# Reverse proxies in front of the app (e.g. 1 on PythonAnywhere). The client
+# IP is then read from X-Forwarded-For, as REMOTE_ADDR is the proxy's and
+# would put every client in one bucket.
+LOGIN_THROTTLE_PROXY_HOPS = int(
+    os.environ.get("LOGIN_THROTTLE_PROXY_HOPS", "0"))
+
+# Cached pages for anonymous visitors (questions.page_cache), off unless
+# enabled. The "pages" cache must be shared (e.g. RedisCache) when there is
+# more than one worker, or workers will keep serving pages another one has
+# purged; the config.W001 check warns about a per-process backend.
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "0") == "1"
+PAGE_CACHE_ALIAS = "pages"
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", "300"))
+# Cache-Control max-age for browsers and proxies, which can't be purged.
+PAGE_CACHE_MAX_AGE = int(os.environ.get("PAGE_CACHE_MAX_AGE", "0"))
+PAGE_CACHE_LOCK_TIMEOUT = float(
+    os.environ.get("PAGE_CACHE_LOCK_TIMEOUT", "5"))
+
+# Seconds a rendered comment thread stays in the "fragments" cache
+# (questions.comment_cache); 0, the default, disables it. New versions
+# replace stale threads, so this only bounds the memory they use. The
+# "fragments" cache must be shared (e.g. RedisCache) when there is more than
+# one worker, or workers will keep serving threads another one has
+# invalidated; the config.W002 check warns about a per-process backend.
+COMMENT_THREAD_CACHE_TIMEOUT = int(
+    os.environ.get("COMMENT_THREAD_CACHE_TIMEOUT", "0"))
+
+# Seconds a numbered list's (or, in ADMIN_SCALING_MODE, a question
+# changelist's) row count stays in the "counts" cache
+# (questions.pagination.CachedCountPaginator); 0, the default, disables it.
+# Adding, removing or (un)publishing questions invalidates the counts sooner.
+# The "counts" cache must be shared (e.g. RedisCache) when there is more
+# than one worker, or workers will keep serving counts another one has
+# invalidated; the config.W003 check warns about a per-process backend.
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get("PAGINATION_COUNT_CACHE_TIMEOUT", "0"))
+# Lists the planner statistics put at this many rows or more show their
+# estimate ("~N pages") instead of running a COUNT; 0 always counts.
+PAGINATION_ESTIMATE_THRESHOLD = int(
+    os.environ.get("PAGINATION_ESTIMATE_THRESHOLD", "100000"))
+
+# Newest matching documents (questions and comments) a search ranks; older
+# matches of common terms are left out so every page costs the same.
+SEARCH_CANDIDATES = int(os.environ.get("SEARCH_CANDIDATES", "1000"))
+
+# Admin for large tables (questions.admin): autocomplete author fields,
+# paginated comment inlines, changelist searches through the search index
+# and estimated changelist counts.
+ADMIN_SCALING_MODE = os.environ.get("ADMIN_SCALING_MODE", "0") == "1"
+
+# Questions per chunk of a bulk publish/unpublish from the admin. Bigger
+# selections are applied a chunk per background task.
+MODERATION_CHUNK_SIZE = int(os.environ.get("MODERATION_CHUNK_SIZE", "500"))
+
+# Background tasks (tasks app): search indexing, comment recounts and admin
+# bulk publishing. Unless eager mode runs them inline in the request, they
+# only run while a "python manage.py run_tasks" worker is up.
+TASKS_ALWAYS_EAGER = os.environ.get("TASKS_ALWAYS_EAGER", "0") == "1"
+TASKS_MAX_ATTEMPTS = int(os.environ.get("TASKS_MAX_ATTEMPTS", "5"))
+# Base of the exponential backoff between attempts, in seconds.
+TASKS_RETRY_DELAY = float(os.environ.get("TASKS_RETRY_DELAY", "2"))
+# Seconds before a task whose worker died is run again.
+TASKS_LEASE_SECONDS = int(os.environ.get("TASKS_LEASE_SECONDS", "300"))
+
 LOGIN_REDIRECT_URL = "questions:list"
 LOGIN_URL = "authors:login"
 LOGOUT_REDIRECT_URL = "questions:list"
@@ -0,0 +1,53 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+LOCK_ERRORS = ("database is locked", "database table is locked")
+
+_retries = 0
+_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if pragmas:
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def is_lock_error(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+def lock_retries():
+    return _retries
+
+
+def run_with_lock_retry(func):
+    """
+    Call ``func`` and call it again when SQLite reports a lock, sleeping a
+    random ("full jitter") delay that doubles with each attempt, up to
+    ``SQLITE_LOCK_RETRIES`` retries. ``func`` should hold the whole
+    transaction so every attempt starts from scratch.
+    """
+    global _retries
+    attempts = settings.SQLITE_LOCK_RETRIES + 1
+    delay = settings.SQLITE_LOCK_RETRY_DELAY
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError as e:
+            if not is_lock_error(e) or attempt == attempts - 1:
+                raise
+        with _lock:
+            _retries += 1
+        time.sleep(random.uniform(0, delay * 2 ** attempt))
@@ -16,8 +16,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from .pool_stats import pool_stats_view
+
 urlpatterns = [
     path('', include("authors.urls")),
     path('', include("questions.urls")),
+    path('api/v1/', include("questions.api_urls")),
     path('admin/', admin.site.urls),
+    path('_stats/connections/', pool_stats_view, name='pool-stats'),
 ]
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def disable_page_caches(settings):
+    # Most tests change rows between requests in ways that don't purge
+    # cached pages, threads or counts (bulk_create, no commits). The cache
+    # tests turn them back on.
+    settings.PAGE_CACHE_ENABLED = False
+    settings.COMMENT_THREAD_CACHE_TIMEOUT = 0
+    settings.PAGINATION_COUNT_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture(autouse=True)
+def run_tasks_eagerly(settings):
+    # Tests see the effects of background tasks right away; the tasks tests
+    # queue them instead.
+    settings.TASKS_ALWAYS_EAGER = True
@@ -1,31 +1,177 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
-from . models import Question, Comment
+from . import moderation
+from . models import ModerationJob, Question, Comment
+from .pagination import CachedCountPaginator
+from .search import get_search_backend
 # Register your models here.
 
+COMMENT_PAGE_VAR = "comments_page"
+# Most questions a changelist search through the search index returns.
+ADMIN_SEARCH_LIMIT = 1000
+
 
 @admin.action(description="Mark questions as published")
 def make_published(modeladmin, request, queryset):
-    queryset.update(is_published=True)
+    set_published(modeladmin, request, queryset, True)
 
 
 @admin.action(description="Mark questions as not published")
 def make_not_published(modeladmin, request, queryset):
-    queryset.update(is_published=False)
+    set_published(modeladmin, request, queryset, False)
+
+
+def set_published(modeladmin, request, queryset, is_published):
+    job = moderation.start_job(queryset, is_published, request.user)
+    if job.finished_at is not None:
+        modeladmin.message_user(
+            request, f"{job.changed} of {job.total} questions updated.",
+            messages.SUCCESS)
+    else:
+        url = reverse("admin:questions_moderationjob_change", args=[job.pk])
+        modeladmin.message_user(request, format_html(
+            '{} questions queued as <a href="{}">job {}</a>; '
+            "run_tasks applies it in chunks.",
+            job.total, url, job.pk), messages.INFO)
+
+
+class CommentInlineFormSet(BaseInlineFormSet):
+    # Set by CommentInline.get_formset in ADMIN_SCALING_MODE.
+    per_page = None
+    page_number = None
+    query_params = None
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            queryset = super().get_queryset()
+            if self.per_page:
+                self.page = Paginator(queryset, self.per_page).get_page(
+                    self.page_number)
+                self._queryset = self.page.object_list
+        return self._queryset
+
+    def page_links(self):
+        """``(number, url)`` for each page link, ``(None, None)`` for gaps."""
+        paginator = self.page.paginator
+        params = self.query_params.copy()
+        links = []
+        for number in paginator.get_elided_page_range(self.page.number):
+            if number == paginator.ELLIPSIS:
+                links.append((None, None))
+            else:
+                params[COMMENT_PAGE_VAR] = number
+                links.append((number, f"?{params.urlencode()}"))
+        return links
+
+    def save_new(self, form, commit=True):
+        comment = super().save_new(form, commit=commit)
+        if commit:
+            Question.objects.filter(pk=comment.question_id).comment_added(
+                comment.pub_date)
+        return comment
+
+    def delete_existing(self, obj, commit=True):
+        question_id = obj.question_id
+        with transaction.atomic():
+            super().delete_existing(obj, commit=commit)
+            if commit:
+                Question.objects.filter(pk=question_id).comments_removed()
+
+
+def author_autocomplete_fields():
+    # A <select> of every user per author field doesn't scale.
+    return ("author",) if settings.ADMIN_SCALING_MODE else ()
 
 
 class CommentInline(admin.StackedInline):
     model = Comment
+    formset = CommentInlineFormSet
     extra = 0
+    template = "admin/questions/comment_inline.html"
+    per_page = 20
+
+    def get_autocomplete_fields(self, request):
+        return author_autocomplete_fields()
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        if settings.ADMIN_SCALING_MODE:
+            formset.per_page = self.per_page
+            formset.page_number = request.GET.get(COMMENT_PAGE_VAR)
+            formset.query_params = request.GET
+        return formset
 
 
 class QuestionInline(admin.ModelAdmin):
     inlines = [CommentInline, ]
-    list_display = ("question_text", "author", "pub_date", "is_published")
+    list_display = ("question_text", "author", "pub_date", "is_published",
+                    "comment_count")
+    list_select_related = ("author",)
     search_fields = ["question_text"]
     list_filter = ["pub_date", "is_published", ]
     actions = [make_published, make_not_published]
     list_per_page = 20
 
+    @property
+    def show_full_result_count(self):
+        return not settings.ADMIN_SCALING_MODE
+
+    @property
+    def search_help_text(self):
+        if settings.ADMIN_SCALING_MODE:
+            return (f"Matches whole words of the question text, showing at "
+                    f"most {ADMIN_SEARCH_LIMIT} questions.")
+        return None
+
+    def get_autocomplete_fields(self, request):
+        return author_autocomplete_fields()
+
+    def get_paginator(self, request, queryset, per_page, **kwargs):
+        if settings.ADMIN_SCALING_MODE:
+            return CachedCountPaginator(queryset, per_page, **kwargs)
+        return super().get_paginator(request, queryset, per_page, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not settings.ADMIN_SCALING_MODE or not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        # Matches words of question_text through the search index, instead
+        # of scanning every question_text with icontains.
+        rows = get_search_backend(queryset.db).search(
+            search_term, ADMIN_SEARCH_LIMIT + 1, published_only=False,
+            comments=False)
+        if len(rows) > ADMIN_SEARCH_LIMIT:
+            self.message_user(
+                request,
+                f"Only the best {ADMIN_SEARCH_LIMIT} matches are shown; "
+                "refine the search to see the others.", messages.WARNING)
+        return queryset.filter(
+            pk__in=[pk for pk, _ in rows[:ADMIN_SEARCH_LIMIT]]), False
+
+
+class ModerationJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "progress_display", "changed", "created_by",
+                    "created_at", "finished_at")
+    list_select_related = ("created_by",)
+    fields = readonly_fields = ("is_published", "total", "processed",
+                                "changed", "created_by", "created_at",
+                                "finished_at")
+
+    @admin.display(description="progress")
+    def progress_display(self, obj):
+        return f"{obj.progress}%"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 admin.site.register(Question, QuestionInline)
+admin.site.register(ModerationJob, ModerationJobAdmin)
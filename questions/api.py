@@ -0,0 +1,151 @@
+import hashlib
+
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition, require_safe
+
+from .models import Comment, Question
+from .pagination import InvalidCursor, KeysetPaginator
+
+PAGE_SIZE = 20
+COMMENTS_PAGE_SIZE = 50
+
+# Cheap projection used to compute validators before the full query runs.
+STATE_FIELDS = ("pk", "pub_date", "comment_count", "last_comment_at",
+                "updated_at")
+QUESTION_FIELDS = ("pk", "author__username", "question_text", "pub_date",
+                   "comment_count", "last_comment_at")
+COMMENT_FIELDS = ("pk", "author__username", "comment_text", "pub_date")
+
+
+def last_modified(state):
+    return max(filter(None, (state["pub_date"], state["last_comment_at"],
+                             state["updated_at"])))
+
+
+def make_etag(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def question_json(row):
+    return {
+        "id": row["pk"],
+        "author": row["author__username"],
+        "question_text": row["question_text"],
+        "pub_date": row["pub_date"],
+        "comment_count": row["comment_count"],
+        "last_comment_at": row["last_comment_at"],
+    }
+
+
+def comment_json(row):
+    return {
+        "id": row["pk"],
+        "author": row["author__username"],
+        "comment_text": row["comment_text"],
+        "pub_date": row["pub_date"],
+    }
+
+
+def page_links(request, page):
+    return {
+        "next": f"{request.path}?cursor={page.next_cursor}"
+        if page.has_next() else None,
+        "previous": f"{request.path}?cursor={page.previous_cursor}"
+        if page.has_previous() else None,
+    }
+
+
+def invalid_cursor():
+    return JsonResponse({"detail": "Invalid cursor."}, status=400)
+
+
+# Question list
+
+def list_state(request):
+    if not hasattr(request, "_api_state"):
+        keys = Question.objects.filter(is_published=True).values(*STATE_FIELDS)
+        try:
+            request._api_state = KeysetPaginator(keys, PAGE_SIZE).page(
+                request.GET.get("cursor"))
+        except InvalidCursor:
+            request._api_state = None
+    return request._api_state
+
+
+def list_etag(request):
+    page = list_state(request)
+    if page is None:
+        return None
+    return make_etag(request.GET.get("cursor"), [
+        (row["pk"], row["comment_count"], row["updated_at"],
+         last_modified(row)) for row in page])
+
+
+def list_last_modified(request):
+    page = list_state(request)
+    if not page:
+        return None
+    return max(last_modified(row) for row in page)
+
+
+@require_safe
+@condition(etag_func=list_etag, last_modified_func=list_last_modified)
+def question_list(request):
+    page = list_state(request)
+    if page is None:
+        return invalid_cursor()
+
+    rows = Question.objects.filter(
+        pk__in=[row["pk"] for row in page]).values(*QUESTION_FIELDS)
+    by_pk = {row["pk"]: row for row in rows}
+
+    return JsonResponse({
+        "results": [question_json(by_pk[row["pk"]])
+                    for row in page if row["pk"] in by_pk],
+        **page_links(request, page),
+    })
+
+
+# Question detail and comment thread
+
+def question_state(request, pk):
+    if not hasattr(request, "_api_state"):
+        request._api_state = Question.objects.filter(
+            pk=pk, is_published=True).values(*STATE_FIELDS).first()
+    if request._api_state is None:
+        raise Http404("Question not found.")
+    return request._api_state
+
+
+def question_etag(request, pk):
+    state = question_state(request, pk)
+    return make_etag(pk, state["comment_count"], state["updated_at"],
+                     last_modified(state), request.GET.get("cursor"))
+
+
+def question_last_modified(request, pk):
+    return last_modified(question_state(request, pk))
+
+
+@require_safe
+@condition(etag_func=question_etag, last_modified_func=question_last_modified)
+def question_detail(request, pk):
+    row = Question.objects.filter(pk=pk).values(*QUESTION_FIELDS).get()
+    return JsonResponse(question_json(row))
+
+
+@require_safe
+@condition(etag_func=question_etag, last_modified_func=question_last_modified)
+def question_comments(request, pk):
+    question_state(request, pk)
+    comments = Comment.objects.filter(question_id=pk).values(*COMMENT_FIELDS)
+    try:
+        page = KeysetPaginator(comments, COMMENTS_PAGE_SIZE).page(
+            request.GET.get("cursor"))
+    except InvalidCursor:
+        return invalid_cursor()
+
+    return JsonResponse({
+        "results": [comment_json(row) for row in page],
+        **page_links(request, page),
+    })
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import api
+
+app_name = "questions-api"
+
+urlpatterns = [
+    path("questions/", api.question_list, name="list"),
+    path("questions/<int:pk>/", api.question_detail, name="detail"),
+    path("questions/<int:pk>/comments/", api.question_comments,
+         name="comments"),
+]
@@ -0,0 +1,733 @@
+import asyncio
+import json
+import queue
+import statistics
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from importlib import import_module
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, Client, RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from authors.forms import AuthorRegisterForm
+from config import pool_stats, sqlite
+
+from .models import Question
+from .search import SEARCH_TABLE, search_questions
+
+URLCONFS = ("questions.urls", "questions.api_urls", "authors.urls")
+
+# POST-only or session-destroying routes that a GET load test can't replay,
+# and the staff-only full export.
+DEFAULT_EXCLUDE = ("authors:login-create", "authors:logout", "questions:export")
+
+LOGIN_REQUIRED = (
+    "questions:author-questions",
+    "questions:create",
+    "questions:update",
+    "questions:delete",
+)
+
+# Routes whose <pk> should point at an unpublished question of the
+# benchmark user instead of the busiest published question.
+DRAFT_ROUTES = ("questions:update", "questions:delete")
+
+QUERY_STRINGS = {
+    "questions:search": "?q=django+query",
+}
+
+# SQLite's own defaults, to compare the tuned pragmas against.
+BASELINE_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+class Endpoint:
+    def __init__(self, name, path, login=False, data=None):
+        self.name = name
+        self.path = path
+        self.login = login
+        # POST this form data instead of issuing a GET.
+        self.data = data
+
+    def __repr__(self):
+        return f"<Endpoint {self.name} {self.path}>"
+
+
+def pick_questions():
+    published = (Question.objects.filter(is_published=True)
+                 .order_by("-comment_count", "-pk").first())
+    draft = (Question.objects.filter(is_published=False, author__isnull=False)
+             .select_related("author").order_by("-pk").first())
+    return published, draft
+
+
+def discover_endpoints(urlconfs=URLCONFS, exclude=DEFAULT_EXCLUDE):
+    published, draft = pick_questions()
+    endpoints = []
+
+    for urlconf in urlconfs:
+        module = import_module(urlconf)
+        for pattern in module.urlpatterns:
+            name = f"{module.app_name}:{pattern.name}"
+            if name in exclude:
+                continue
+
+            kwargs = {}
+            if "pk" in pattern.pattern.converters:
+                question = draft if name in DRAFT_ROUTES else published
+                if question is None:
+                    continue
+                kwargs["pk"] = question.pk
+
+            path = reverse(name, kwargs=kwargs) + QUERY_STRINGS.get(name, "")
+            endpoints.append(Endpoint(
+                name, path, login=name in LOGIN_REQUIRED))
+    return endpoints
+
+
+def summarize(latencies, queries, errors, elapsed):
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+        "queries_per_request": round(
+            statistics.fmean(queries), 2) if queries else 0,
+    }
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def make_client(user=None):
+    # Count unhandled exceptions as errors instead of stopping the worker.
+    client = Client(HTTP_HOST="localhost", raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+class HandlerResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class HandlerClient:
+    """
+    Call the WSGI handler the way a server does. Unlike the test Client,
+    this keeps Django's per-request connection handling (CONN_MAX_AGE and
+    health checks) in place.
+    """
+
+    def __init__(self):
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory(HTTP_HOST="localhost")
+
+    def get(self, path):
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(status)
+
+        response = self.handler(self.factory.get(path).environ,
+                                start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        return HandlerResponse(int(statuses[0].split()[0]))
+
+
+def make_handler_client(user=None):
+    if user is not None:
+        raise ValueError("HandlerClient only issues anonymous requests.")
+    return HandlerClient()
+
+
+request_queries = ContextVar("benchmark_request_queries", default=None)
+
+
+def count_request_query(execute, sql, params, many, context):
+    # Each task has its own context, which sync_to_async carries into the
+    # thread running the ORM, so concurrent requests are counted separately.
+    counter = request_queries.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+class HostAsyncClient(AsyncClient):
+    """
+    AsyncClient that sends ``host`` as the Host header. Django's async
+    client always sends "testserver", which only the test runner allows.
+    """
+
+    def __init__(self, host, **defaults):
+        super().__init__(**defaults)
+        self.host = host.encode("ascii")
+
+    def _base_scope(self, **request):
+        scope = super()._base_scope(**request)
+        scope["headers"] = [
+            (name, self.host if name == b"host" else value)
+            for name, value in scope["headers"]
+        ]
+        return scope
+
+
+def make_async_client(user=None):
+    client = HostAsyncClient("localhost", raise_request_exception=False)
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def run_endpoint(endpoint, total_requests, workers, user=None,
+                 client_factory=make_client):
+    """
+    Issue ``total_requests`` GETs to ``endpoint`` from ``workers`` threads,
+    each with its own client and database connection.
+    """
+    jobs = queue.Queue()
+    for _ in range(total_requests):
+        jobs.put(None)
+
+    latencies, queries = [], []
+    errors = [0]
+    lock = threading.Lock()
+
+    def work():
+        client = client_factory(user if endpoint.login else None)
+        counter = QueryCounter()
+        local_latencies, local_queries, local_errors = [], [], 0
+        with connection.execute_wrapper(counter):
+            while True:
+                try:
+                    jobs.get_nowait()
+                except queue.Empty:
+                    break
+                counter.count = 0
+                start = time.perf_counter()
+                if endpoint.data is None:
+                    response = client.get(endpoint.path)
+                else:
+                    response = client.post(endpoint.path, endpoint.data)
+                local_latencies.append(time.perf_counter() - start)
+                local_queries.append(counter.count)
+                if response.status_code >= 400:
+                    local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors[0] += local_errors
+
+    def work_in_thread():
+        try:
+            work()
+        finally:
+            connections.close_all()
+
+    start = time.perf_counter()
+    if workers <= 1:
+        work()
+    else:
+        threads = [threading.Thread(target=work_in_thread)
+                   for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    return summarize(latencies, queries, errors[0], elapsed)
+
+
+def run_endpoint_asgi(endpoint, total_requests, workers, user=None):
+    """
+    Issue ``total_requests`` GETs to ``endpoint`` through the ASGI handler
+    from ``workers`` concurrent tasks on one event loop.
+
+    Thread-sensitive sync code (the ORM included) runs back on this thread,
+    as it would on the single sync thread of an ASGI server.
+    """
+    clients = [make_async_client(user if endpoint.login else None)
+               for _ in range(max(workers, 1))]
+    remaining = [total_requests]
+    latencies, queries = [], []
+    errors = [0]
+
+    async def work(client):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            counter = QueryCounter()
+            request_queries.set(counter)
+            start = time.perf_counter()
+            response = await client.get(endpoint.path)
+            latencies.append(time.perf_counter() - start)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                errors[0] += 1
+
+    async def main():
+        await asyncio.gather(*(work(client) for client in clients))
+
+    with connection.execute_wrapper(count_request_query):
+        start = time.perf_counter()
+        async_to_sync(main)()
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, queries, errors[0], elapsed)
+
+
+def run_benchmark(endpoints, total_requests, workers, user=None,
+                  warmup=0, client_factory=make_client, asgi=False):
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "workers": workers,
+        "handler": "asgi" if asgi else "wsgi",
+        "requests_per_endpoint": total_requests,
+        "endpoints": {},
+    }
+    for endpoint in endpoints:
+        if asgi:
+            if warmup:
+                run_endpoint_asgi(endpoint, warmup, 1, user)
+            summary = run_endpoint_asgi(
+                endpoint, total_requests, workers, user)
+        else:
+            if warmup:
+                run_endpoint(endpoint, warmup, 1, user, client_factory)
+            summary = run_endpoint(
+                endpoint, total_requests, workers, user, client_factory)
+        results["endpoints"][endpoint.name] = {"path": endpoint.path,
+                                               **summary}
+    return results
+
+
+def set_conn_max_age(max_age):
+    previous = {}
+    for alias in connections:
+        # Wrappers share their settings dict with the connection handler.
+        previous[alias] = connections.settings[alias]["CONN_MAX_AGE"]
+        connections.settings[alias]["CONN_MAX_AGE"] = max_age
+    return previous
+
+
+def run_connection_benchmark(endpoint, total_requests, workers, max_ages,
+                             warmup=0):
+    """
+    Run ``endpoint`` once per CONN_MAX_AGE in ``max_ages`` through the WSGI
+    handler and report latencies along with connections opened, reused
+    and discarded.
+    """
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "endpoint": endpoint.name,
+        "path": endpoint.path,
+        "workers": workers,
+        "requests": total_requests,
+        "conn_max_age": {},
+    }
+    for max_age in max_ages:
+        previous = set_conn_max_age(max_age)
+        try:
+            connections.close_all()
+            if warmup:
+                run_endpoint(endpoint, warmup, 1,
+                             client_factory=make_handler_client)
+            pool_stats.reset()
+            summary = run_endpoint(endpoint, total_requests, workers,
+                                   client_factory=make_handler_client)
+            counts = pool_stats.snapshot()["databases"].get(
+                connection.alias, {})
+        finally:
+            for alias, value in previous.items():
+                connections.settings[alias]["CONN_MAX_AGE"] = value
+        results["conn_max_age"][str(max_age)] = {**summary, **counts}
+    return results
+
+
+def run_write_benchmark(question, user, total_comments, writers, modes):
+    """
+    Post ``total_comments`` comments to ``question`` through the detail view
+    from ``writers`` threads, once per ``(name, pragmas)`` in ``modes``.
+    On SQLite, the database file's journal mode, which WAL changes for good,
+    is set back to what it was.
+    """
+    endpoint = Endpoint(
+        "questions:detail", reverse("questions:detail",
+                                    kwargs={"pk": question.pk}),
+        login=True, data={"comment_text": "Benchmark answer"})
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "writers": writers,
+        "comments": total_comments,
+        "journal_mode": journal_mode(),
+        "modes": {},
+    }
+    try:
+        for name, pragmas in modes:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                # Writer threads open new connections with these pragmas.
+                connections.close_all()
+                retries = sqlite.lock_retries()
+                summary = run_endpoint(endpoint, total_comments, writers, user)
+            results["modes"][name] = {
+                "pragmas": pragmas,
+                **summary,
+                "lock_retries": sqlite.lock_retries() - retries,
+            }
+    finally:
+        if results["journal_mode"] is not None:
+            # Leaving WAL needs the only connection to the file.
+            connections.close_all()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"PRAGMA journal_mode = {results['journal_mode']}")
+    return results
+
+
+def journal_mode():
+    if connection.vendor != "sqlite":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        return cursor.fetchone()[0]
+
+
+def legitimate_ip(index):
+    """Addresses 10.1.0.1 onwards, one per legitimate login."""
+    return f"10.1.{index // 250}.{index % 250 + 1}"
+
+
+class LegitimateClient(Client):
+    """
+    Log in from a new client IP every time, as different users would, so
+    the legitimate logins never use up an IP allowance themselves. Counts
+    the attempts that were throttled anyway.
+    """
+
+    def __init__(self, **defaults):
+        super().__init__(HTTP_HOST="localhost", raise_request_exception=False,
+                         **defaults)
+        self.logins = self.throttled = 0
+
+    def post(self, path, data=None, **extra):
+        response = super().post(
+            path, data, REMOTE_ADDR=legitimate_ip(self.logins), **extra)
+        self.logins += 1
+        if response.status_code == 429:
+            self.throttled += 1
+        return response
+
+
+class LoginAttacker(threading.Thread):
+    """
+    Guess passwords for a few usernames from one client IP at a steady
+    ``rate`` per second, like an external client would. ``ready`` is set
+    once the attack is in its steady state: after the first throttled
+    attempt, or the first attempt at all when nothing throttles it.
+    """
+
+    def __init__(self, path, ip, usernames, rate, throttled_expected):
+        super().__init__()
+        self.path = path
+        self.ip = ip
+        self.usernames = usernames
+        self.interval = 1 / rate
+        self.throttled_expected = throttled_expected
+        self.ready = threading.Event()
+        self.stop = threading.Event()
+        self.attempts = self.throttled = 0
+
+    def run(self):
+        client = Client(HTTP_HOST="localhost", REMOTE_ADDR=self.ip,
+                        raise_request_exception=False)
+        try:
+            while not self.stop.is_set():
+                start = time.perf_counter()
+                response = client.post(self.path, {
+                    "username": self.usernames[
+                        self.attempts % len(self.usernames)],
+                    "password": "not-the-password",
+                })
+                self.attempts += 1
+                if response.status_code == 429:
+                    self.throttled += 1
+                if self.throttled or not self.throttled_expected:
+                    self.ready.set()
+                self.stop.wait(self.interval - (time.perf_counter() - start))
+        finally:
+            self.ready.set()
+            connections.close_all()
+
+
+def run_login_benchmark(username, password, total_logins, attackers,
+                        attack_rate, throttle_cache):
+    """
+    Measure ``total_logins`` sequential logins of a legitimate user, each
+    from its own IP, with no attack, then while ``attackers`` clients (one
+    IP each) guess passwords for other usernames at ``attack_rate``
+    attempts per second each, with login throttling off and on. Latencies
+    are measured once every attacker has used up its burst allowance.
+    """
+    path = reverse("authors:login-create")
+    endpoint = Endpoint("authors:login-create", path,
+                        data={"username": username, "password": password})
+
+    clients = []
+
+    def legitimate_client(user=None):
+        clients.append(LegitimateClient())
+        return clients[-1]
+
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "logins": total_logins,
+        "attackers": attackers,
+        "attack_rate": attack_rate,
+        "modes": {},
+    }
+    modes = [("no attack", 0, True), ("attack, throttle off", attackers, False),
+             ("attack, throttle on", attackers, True)]
+    for name, attack_clients, enabled in modes:
+        throttle_cache.clear()
+        clients.clear()
+        threads = [
+            LoginAttacker(path, f"10.2.0.{index + 1}",
+                          [f"victim{index}-{n}" for n in range(3)],
+                          attack_rate, throttled_expected=enabled)
+            for index in range(attack_clients)
+        ]
+        with override_settings(LOGIN_THROTTLE_ENABLED=enabled):
+            for thread in threads:
+                thread.start()
+            try:
+                for thread in threads:
+                    thread.ready.wait()
+                attempts = sum(thread.attempts for thread in threads)
+                throttled = sum(thread.throttled for thread in threads)
+                summary = run_endpoint(endpoint, total_logins, 1,
+                                       client_factory=legitimate_client)
+            finally:
+                for thread in threads:
+                    thread.stop.set()
+                for thread in threads:
+                    thread.join()
+        results["modes"][name] = {
+            **summary,
+            # Also counted in errors; any throttled legitimate login skews
+            # the latencies with fast 429 responses.
+            "throttled": sum(client.throttled for client in clients),
+            "attack_attempts": sum(t.attempts for t in threads) - attempts,
+            "attack_throttled": sum(t.throttled for t in threads) - throttled,
+        }
+    return results
+
+
+def run_search_benchmark(queries, repeat, per_page=10):
+    """
+    Time ``repeat`` loads of the first and the second page of
+    ``search_questions()`` for each query.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        documents = cursor.fetchone()[0]
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "documents": documents,
+        "candidates": settings.SEARCH_CANDIDATES,
+        "queries": {},
+    }
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for query in queries:
+            pages = {"first page": ([], [], []), "next page": ([], [], [])}
+            for _ in range(repeat):
+                cursor = None
+                for latencies, queries_made, found in pages.values():
+                    counter.count = 0
+                    start = time.perf_counter()
+                    page = search_questions(query, per_page, cursor)
+                    latencies.append(time.perf_counter() - start)
+                    queries_made.append(counter.count)
+                    found.append(len(page))
+                    cursor = page.next_cursor
+                    if cursor is None:
+                        break
+            results["queries"][query] = {
+                name: {**summarize(latencies, queries_made, 0,
+                                   sum(latencies)), "results": found[-1]}
+                for name, (latencies, queries_made, found) in pages.items()
+                if latencies
+            }
+    return results
+
+
+# Same statements as authors/migrations/0001_user_email_lower_unique.py.
+CREATE_EMAIL_INDEX = ("CREATE UNIQUE INDEX auth_user_email_lower_uniq "
+                      "ON auth_user (LOWER(email)) WHERE email > ''")
+DROP_EMAIL_INDEX = "DROP INDEX auth_user_email_lower_uniq"
+
+
+def time_registration_forms(total):
+    latencies, queries, errors = [], [], 0
+    counter = QueryCounter()
+    start = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        for _ in range(total):
+            name = f"reg{uuid.uuid4().hex[:12]}"
+            form = AuthorRegisterForm(data={
+                "username": name,
+                "email": f"{name}@example.com",
+                "password": "passwords1",
+                "password2": "passwords1",
+            })
+            counter.count = 0
+            form_start = time.perf_counter()
+            errors += not form.is_valid()
+            latencies.append(time.perf_counter() - form_start)
+            queries.append(counter.count)
+    return summarize(latencies, queries, errors, time.perf_counter() - start)
+
+
+def run_registration_benchmark(total, without_index=False):
+    """
+    Time ``AuthorRegisterForm`` validation, the part of a sign-up that
+    grows with the user table, for ``total`` new users. With
+    ``without_index`` it's timed again after dropping the e-mail index,
+    which is recreated afterwards.
+    """
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "users": User.objects.count(),
+        "modes": {"indexed": time_registration_forms(total)},
+    }
+    if without_index:
+        # Validation doesn't write, so nothing is lost by rolling back.
+        # Where DDL is transactional, that also means the drop is never
+        # committed, even if the process dies mid-run.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(DROP_EMAIL_INDEX)
+            try:
+                results["modes"]["without e-mail index"] = (
+                    time_registration_forms(total))
+            finally:
+                if connection.features.can_rollback_ddl:
+                    transaction.set_rollback(True)
+                else:
+                    cursor.execute(CREATE_EMAIL_INDEX)
+    return results
+
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class StatementRecorder:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+
+def session_flow(user, password, draft):
+    """Requests of a visit that logs in and flashes two messages."""
+    login = reverse("authors:login-create")
+    return [
+        ("anonymous list", "get", reverse("questions:list"), {}),
+        ("failed login", "post", login,
+         {"username": user.username, "password": f"not-{password}"}),
+        ("login page with message", "get", reverse("authors:login"), {}),
+        ("login", "post", login,
+         {"username": user.username, "password": password}),
+        ("authenticated list", "get", reverse("questions:list"), {}),
+        ("delete question", "post",
+         reverse("questions:delete", kwargs={"pk": draft.pk}), {}),
+        ("page with message", "get",
+         reverse("questions:author-questions"), {}),
+    ]
+
+
+def run_session_benchmark(user, password, profiles):
+    """
+    Replay ``session_flow`` once per profile in ``SESSION_PROFILES`` and
+    count queries, writes and session table queries per request.
+    """
+    results = {
+        "started_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "profiles": {},
+    }
+    for index, name in enumerate(profiles, start=1):
+        engine, message_storage = settings.SESSION_PROFILES[name]
+        draft = Question.objects.create(
+            author=user, question_text="Session benchmark draft")
+        # Sessions are read by the middleware, which the client loads on
+        # its first request, so each profile gets a new client.
+        client = Client(HTTP_HOST="localhost", REMOTE_ADDR=f"10.3.0.{index}",
+                        raise_request_exception=False)
+        recorder = StatementRecorder()
+        steps = []
+        with override_settings(SESSION_ENGINE=engine,
+                               MESSAGE_STORAGE=message_storage), \
+                connection.execute_wrapper(recorder):
+            for label, method, path, data in session_flow(
+                    user, password, draft):
+                start = len(recorder.statements)
+                response = getattr(client, method)(path, data)
+                statements = recorder.statements[start:]
+                steps.append({
+                    "request": label,
+                    "status": response.status_code,
+                    "queries": len(statements),
+                    "writes": sum(sql.lstrip().upper().startswith(
+                        WRITE_STATEMENTS) for sql in statements),
+                    "session_queries": sum(
+                        "django_session" in sql for sql in statements),
+                })
+        results["profiles"][name] = {
+            "session_engine": engine,
+            "message_storage": message_storage,
+            "requests": len(steps),
+            **{f"{key}_per_request": round(
+                statistics.fmean(step[key] for step in steps), 2)
+               for key in ("queries", "writes", "session_queries")},
+            "steps": steps,
+        }
+    return results
+
+
+def write_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
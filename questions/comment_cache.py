@@ -0,0 +1,37 @@
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+# Rendered comment threads are cached in question_detail.html under a key
+# that includes a per-question version. Bumping the version when a comment
+# is created, edited or deleted makes the old fragment unreachable; it just
+# expires.
+CACHE_ALIAS = "fragments"
+
+
+def version_key(question_id):
+    return f"comment-thread:version:{question_id}"
+
+
+def get_version(question_id):
+    cache = caches[CACHE_ALIAS]
+    key = version_key(question_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump(question_id):
+    caches[CACHE_ALIAS].delete(version_key(question_id))
+
+
+def bump_on_commit(question_id):
+    """
+    ``bump`` now and again once the transaction commits, so a thread
+    rendered in between from the data before the commit isn't kept.
+    """
+    bump(question_id)
+    transaction.on_commit(lambda: bump(question_id))
@@ -0,0 +1,88 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Question
+
+# Field names match what the import_questions command reads back.
+CSV_HEADER = (
+    "question_ref", "author", "question_text", "pub_date", "is_published",
+    "comment_author", "comment_text", "comment_pub_date",
+)
+
+
+def iter_published_threads(chunk_size=2000):
+    """
+    Yield ``(question, comments)`` for every published question, as dicts.
+
+    Questions and comments are read with two ordered ``.iterator()`` scans
+    and merged on question id, so the export runs two queries in total and
+    holds at most one thread in memory.
+    """
+    questions = (Question.objects
+                 .filter(is_published=True)
+                 .order_by("pk")
+                 .values("pk", "author__username", "question_text",
+                         "pub_date")
+                 .iterator(chunk_size=chunk_size))
+    comments = (Comment.objects
+                .filter(question__is_published=True)
+                .order_by("question_id", "-pub_date", "-pk")
+                .values("question_id", "author__username", "comment_text",
+                        "pub_date")
+                .iterator(chunk_size=chunk_size))
+
+    pending = next(comments, None)
+    for question in questions:
+        thread = []
+        while pending is not None and pending["question_id"] <= question["pk"]:
+            if pending["question_id"] == question["pk"]:
+                thread.append(pending)
+            pending = next(comments, None)
+        yield question, thread
+
+
+def jsonl_lines(threads):
+    for question, comments in threads:
+        yield json.dumps({
+            "id": question["pk"],
+            "author": question["author__username"],
+            "question_text": question["question_text"],
+            "pub_date": question["pub_date"],
+            "is_published": True,
+            "comments": [{
+                "author": comment["author__username"],
+                "comment_text": comment["comment_text"],
+                "pub_date": comment["pub_date"],
+            } for comment in comments],
+        }, cls=DjangoJSONEncoder) + "\n"
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(threads):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for question, comments in threads:
+        row = [question["pk"], question["author__username"] or "",
+               question["question_text"], question["pub_date"].isoformat(),
+               "true"]
+        if not comments:
+            yield writer.writerow(row + ["", "", ""])
+        for comment in comments:
+            yield writer.writerow(row + [
+                comment["author__username"] or "",
+                comment["comment_text"],
+                comment["pub_date"].isoformat(),
+            ])
+
+
+FORMATS = {
+    "jsonl": (jsonl_lines, "application/x-ndjson"),
+    "csv": (csv_lines, "text/csv"),
+}
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from questions.export import FORMATS, iter_published_threads
+
+
+class Command(BaseCommand):
+    help = "Stream published questions and their comments as JSONL or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS),
+                            default="jsonl")
+        parser.add_argument("--output", default=None,
+                            help="File to write to. Defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Rows fetched from the database at a time.")
+
+    def handle(self, *args, **options):
+        lines, _ = FORMATS[options["format"]]
+        threads = iter_published_threads(options["chunk_size"])
+
+        if options["output"] is None:
+            for line in lines(threads):
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "w", newline="",
+                  encoding="utf-8") as f:
+            f.writelines(lines(threads))
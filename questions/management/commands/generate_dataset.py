@@ -0,0 +1,144 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from questions.models import Comment, Question
+
+WORDS = (
+    "python django query index cache database page answer question model "
+    "view template server request latency thread async worker table row "
+    "column join sort filter count search token session cookie user admin"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset of users, questions and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--questions", type=int, default=10000)
+        parser.add_argument("--comments", type=int, default=100000)
+        parser.add_argument(
+            "--published-ratio", type=float, default=0.9,
+            help="Fraction of questions created as published.")
+        parser.add_argument(
+            "--skew", type=float, default=1.1,
+            help="Zipf exponent of the comments-per-question distribution.")
+        parser.add_argument("--days", type=int, default=365,
+                            help="Spread pub_date over this many past days.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--username-prefix", default="user")
+        parser.add_argument(
+            "--inactive-users", action="store_true",
+            help="Create the users inactive and with unusable passwords, so "
+                 "nobody can log in as them.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.span = timedelta(days=options["days"]).total_seconds()
+        start = time.perf_counter()
+
+        user_ids = self.create_users(
+            options["users"], options["username_prefix"],
+            options["inactive_users"])
+        question_dates = self.create_questions(
+            options["questions"], user_ids, options["published_ratio"])
+        self.create_comments(
+            options["comments"], user_ids, question_dates, options["skew"])
+
+        call_command("recount_comments", stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(user_ids)} users, {len(question_dates)} "
+            f"questions and {options['comments']} comments in "
+            f"{time.perf_counter() - start:.1f}s."))
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def random_date(self, since=None):
+        span = self.span if since is None else (
+            self.now - since).total_seconds()
+        return self.now - timedelta(seconds=self.rng.random() * span)
+
+    def sentence(self, low, high):
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def created_ids(self, model, since):
+        return list(model.objects.filter(pk__gt=since)
+                    .order_by("pk").values_list("pk", flat=True))
+
+    def last_id(self, model):
+        return model.objects.order_by("-pk").values_list(
+            "pk", flat=True).first() or 0
+
+    def create_users(self, total, prefix, inactive=False):
+        # Hashing once keeps generation fast; every user shares "password".
+        password = make_password(None if inactive else "password")
+        offset = User.objects.count()
+        since = self.last_id(User)
+
+        for batch in self.batches(total):
+            with transaction.atomic():
+                User.objects.bulk_create(
+                    User(username=f"{prefix}{offset + i}",
+                         email=f"{prefix}{offset + i}@example.com",
+                         password=password, is_active=not inactive)
+                    for i in batch)
+        return self.created_ids(User, since)
+
+    def create_questions(self, total, user_ids, published_ratio):
+        since = self.last_id(Question)
+
+        for batch in self.batches(total):
+            with transaction.atomic():
+                Question.objects.bulk_create(
+                    Question(
+                        author_id=self.rng.choice(user_ids),
+                        question_text=self.sentence(4, 20)[:150],
+                        pub_date=self.random_date(),
+                        is_published=self.rng.random() < published_ratio)
+                    for _ in batch)
+        return dict(Question.objects.filter(pk__gt=since).order_by("pk")
+                    .values_list("pk", "pub_date"))
+
+    def create_comments(self, total, user_ids, question_dates, skew):
+        if not question_dates:
+            return
+
+        # A few questions get most of the answers, like a real forum.
+        ranked = list(question_dates)
+        self.rng.shuffle(ranked)
+        cum_weights = list(accumulate(
+            1 / (rank ** skew) for rank in range(1, len(ranked) + 1)))
+
+        for batch in self.batches(total):
+            question_for = self.rng.choices(
+                ranked, cum_weights=cum_weights, k=len(batch))
+            with transaction.atomic():
+                Comment.objects.bulk_create(
+                    Comment(
+                        author_id=self.rng.choice(user_ids),
+                        question_id=question_id,
+                        comment_text=self.sentence(3, 60)[:500],
+                        # Between the question and now; recount_comments
+                        # sets last_comment_at from the latest one.
+                        pub_date=self.random_date(
+                            since=question_dates[question_id]))
+                    for question_id in question_for)
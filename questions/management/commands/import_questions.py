@@ -0,0 +1,196 @@
+import csv
+import json
+import time
+from collections import OrderedDict
+from itertools import groupby, islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from questions import page_cache
+from questions.models import Comment, Question
+from questions.pagination import invalidate_counts_on_commit
+from questions.search import get_search_backend
+
+CSV_QUESTION_FIELDS = ("author", "question_text", "pub_date", "is_published")
+CSV_COMMENT_FIELDS = {
+    "comment_author": "author",
+    "comment_text": "comment_text",
+    "comment_pub_date": "pub_date",
+}
+
+
+class AuthorCache:
+    """Username -> user id lookups with a bounded LRU memory footprint."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.ids = OrderedDict()
+
+    def resolve(self, usernames):
+        missing = {name for name in usernames
+                   if name and name not in self.ids}
+        if missing:
+            found = dict(User.objects.filter(username__in=missing)
+                         .values_list("username", "pk"))
+            for name in missing:
+                self.ids[name] = found.get(name)
+
+        resolved = {}
+        for name in usernames:
+            if name:
+                self.ids.move_to_end(name)
+                resolved[name] = self.ids[name]
+
+        while len(self.ids) > self.max_size:
+            self.ids.popitem(last=False)
+        return resolved
+
+
+def parse_bool(value):
+    """JSON booleans as they are; "1", "true" and "yes" for strings."""
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes")
+
+
+def read_jsonl(stream):
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Line {line_number}: {e}")
+
+
+def read_csv(stream):
+    """
+    One row per comment with the question columns repeated. Rows of the same
+    question must be contiguous and share ``question_ref``; a question
+    without comments has a single row with empty comment columns.
+    """
+    rows = enumerate(csv.DictReader(stream), 2)
+    for _, group in groupby(rows, key=lambda row: row[1]["question_ref"]):
+        group = list(group)
+        line_number, first = group[0]
+        record = {field: first.get(field) for field in CSV_QUESTION_FIELDS}
+        record["is_published"] = parse_bool(first.get("is_published"))
+        record["comments"] = [
+            {target: row.get(source)
+             for source, target in CSV_COMMENT_FIELDS.items()}
+            for _, row in group if row.get("comment_text")
+        ]
+        yield line_number, record
+
+
+class Command(BaseCommand):
+    help = ("Stream questions with nested comments from a JSONL or CSV file "
+            "and insert them with bulk_create in batches.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                            help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Questions inserted per transaction.")
+        parser.add_argument("--author-cache-size", type=int, default=10000)
+
+    def handle(self, *args, path, batch_size, author_cache_size, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                "This database can't return ids from bulk_create().")
+
+        file_format = options["format"] or (
+            "csv" if path.endswith(".csv") else "jsonl")
+        reader = read_csv if file_format == "csv" else read_jsonl
+        self.authors = AuthorCache(author_cache_size)
+        self.search = get_search_backend()
+
+        start = time.perf_counter()
+        questions = comments = 0
+        with open(path, newline="", encoding="utf-8") as stream:
+            records = reader(stream)
+            while batch := list(islice(records, batch_size)):
+                created = self.import_batch(batch)
+                questions += created[0]
+                comments += created[1]
+                self.report(questions, comments, start)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {questions} questions and {comments} comments."))
+
+    def report(self, questions, comments, start):
+        elapsed = time.perf_counter() - start
+        rate = (questions + comments) / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{questions} questions, {comments} comments "
+            f"({rate:.0f} rows/s)")
+
+    def parse_date(self, value, line_number):
+        if not value:
+            return timezone.now()
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"Line {line_number}: invalid date {value!r}.")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def import_batch(self, batch):
+        usernames = set()
+        for _, record in batch:
+            usernames.add(record.get("author"))
+            usernames.update(c.get("author") for c in record.get("comments", []))
+        author_ids = self.authors.resolve(usernames)
+
+        questions, comments_per_question = [], []
+        for line_number, record in batch:
+            text = (record.get("question_text") or "").strip()
+            if not text or len(text) > 150:
+                raise CommandError(
+                    f"Line {line_number}: question_text must have between "
+                    "1 and 150 characters.")
+
+            comments = []
+            for c in record.get("comments", []):
+                comment_text = (c.get("comment_text") or "").strip()
+                if not comment_text or len(comment_text) > 500:
+                    raise CommandError(
+                        f"Line {line_number}: comment_text must have between "
+                        "1 and 500 characters.")
+                comments.append(Comment(
+                    author_id=author_ids.get(c.get("author")),
+                    comment_text=comment_text,
+                    pub_date=self.parse_date(c.get("pub_date"), line_number)))
+            # Counters are known up front, so no per-row UPDATE is needed.
+            questions.append(Question(
+                author_id=author_ids.get(record.get("author")),
+                question_text=text,
+                pub_date=self.parse_date(record.get("pub_date"), line_number),
+                is_published=parse_bool(record.get("is_published")),
+                comment_count=len(comments),
+                last_comment_at=max((c.pub_date for c in comments),
+                                    default=None),
+            ))
+            comments_per_question.append(comments)
+
+        with transaction.atomic():
+            Question.objects.bulk_create(questions)
+            new_comments = []
+            for question, comments in zip(questions, comments_per_question):
+                for comment in comments:
+                    comment.question_id = question.pk
+                    new_comments.append(comment)
+            Comment.objects.bulk_create(new_comments)
+
+            self.search.index_pks(Question, [q.pk for q in questions])
+            self.search.index_pks(Comment, [c.pk for c in new_comments])
+            # bulk_create doesn't send post_save.
+            page_cache.invalidate_on_commit(lists=True)
+            invalidate_counts_on_commit(Question)
+
+        return len(questions), len(new_comments)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from questions.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from questions and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=10000,
+            help="Number of rows indexed per INSERT ... SELECT statement.")
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index on.")
+
+    def handle(self, *args, batch_size, database, **options):
+        start = time.perf_counter()
+        with transaction.atomic(using=database):
+            indexed = get_search_backend(database).rebuild(batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} documents in "
+            f"{time.perf_counter() - start:.2f}s."))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from questions import page_cache
+from questions.models import Question
+
+
+class Command(BaseCommand):
+    help = "Recompute Question.comment_count and last_comment_at in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Number of question ids updated per transaction.")
+
+    def handle(self, *args, batch_size, **options):
+        bounds = Question.objects.aggregate(low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            self.stdout.write("No questions to recount.")
+            return
+
+        updated = 0
+        for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+            with transaction.atomic():
+                updated += Question.objects.filter(
+                    pk__gte=start, pk__lt=start + batch_size,
+                ).recount_comments()
+
+        page_cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted comments for {updated} questions."))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import (
+    DEFAULT_EXCLUDE, discover_endpoints, pick_questions, run_benchmark,
+    write_results,
+)
+
+
+class Command(BaseCommand):
+    help = ("Load test every questions and authors URL with concurrent "
+            "workers and report latency percentiles, throughput and "
+            "queries per request.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests issued per endpoint.")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--warmup", type=int, default=10,
+                            help="Unmeasured requests per endpoint.")
+        parser.add_argument("--exclude", nargs="*", default=DEFAULT_EXCLUDE,
+                            help="URL names to skip, e.g. questions:search.")
+        parser.add_argument("--asgi", action="store_true",
+                            help="Drive the ASGI handler with concurrent "
+                                 "tasks instead of WSGI worker threads. "
+                                 "Combine with ASYNC_READ_VIEWS=1 to "
+                                 "measure the async views.")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        endpoints = discover_endpoints(exclude=options["exclude"])
+        if not endpoints:
+            raise CommandError("No endpoints to benchmark.")
+
+        _, draft = pick_questions()
+        user = draft.author if draft is not None else None
+
+        results = run_benchmark(
+            endpoints, options["requests"], options["workers"], user=user,
+            warmup=options["warmup"], asgi=options["asgi"])
+
+        self.stdout.write(
+            f"{'endpoint':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'req/s':>9}{'queries':>9}{'errors':>8}")
+        for name, row in results["endpoints"].items():
+            self.stdout.write(
+                f"{name:<28}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['throughput_rps']:>9.1f}"
+                f"{row['queries_per_request']:>9.1f}{row['errors']:>8}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import (
+    discover_endpoints, run_connection_benchmark, write_results,
+)
+
+
+class Command(BaseCommand):
+    help = ("Compare latency and connection reuse of an endpoint under "
+            "different CONN_MAX_AGE values, through the WSGI handler.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoint", default="questions:list",
+                            help="URL name of an anonymous GET endpoint.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--max-age", type=int, nargs="+", default=[0, 60],
+                            dest="max_ages",
+                            help="CONN_MAX_AGE values to compare.")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        endpoints = {endpoint.name: endpoint
+                     for endpoint in discover_endpoints(exclude=())}
+        endpoint = endpoints.get(options["endpoint"])
+        if endpoint is None or endpoint.login:
+            raise CommandError(
+                f"{options['endpoint']} isn't an anonymous GET endpoint.")
+
+        results = run_connection_benchmark(
+            endpoint, options["requests"], options["workers"],
+            options["max_ages"], warmup=options["warmup"])
+
+        self.stdout.write(
+            f"{'max age':<10}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>9}"
+            f"{'opened':>9}{'reused':>9}{'discarded':>11}")
+        for max_age, row in results["conn_max_age"].items():
+            self.stdout.write(
+                f"{max_age:<10}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['throughput_rps']:>9.1f}{row.get('opened', 0):>9}"
+                f"{row.get('reused', 0):>9}{row.get('discarded', 0):>11}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
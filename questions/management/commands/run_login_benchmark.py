@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import run_login_benchmark, write_results
+
+
+class Command(BaseCommand):
+    help = ("Measure legitimate login latency with no attack, then during a "
+            "password guessing attack with login throttling off and on.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=30,
+                            help="Legitimate logins measured per mode.")
+        parser.add_argument("--attackers", type=int, default=8,
+                            help="Attacking clients, one IP each.")
+        parser.add_argument("--attack-rate", type=float, default=10,
+                            help="Attempts per second of each attacker.")
+        parser.add_argument("--username", default="login-benchmark")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        password = "login-benchmark-password"
+        user, _ = User.objects.get_or_create(username=options["username"])
+        user.set_password(password)
+        user.save()
+
+        results = run_login_benchmark(
+            user.username, password, options["logins"], options["attackers"],
+            options["attack_rate"], caches[settings.LOGIN_THROTTLE_CACHE])
+
+        self.stdout.write(
+            f"{'mode':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'errors':>8}{'legit 429':>11}{'attempts':>10}"
+            f"{'throttled':>11}")
+        for mode, row in results["modes"].items():
+            self.stdout.write(
+                f"{mode:<24}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['errors']:>8}"
+                f"{row['throttled']:>11}{row['attack_attempts']:>10}"
+                f"{row['attack_throttled']:>11}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
+
+        throttled = sum(row["throttled"] for row in results["modes"].values())
+        if throttled:
+            raise CommandError(
+                f"{throttled} legitimate logins were throttled, so the "
+                "latencies above include fast 429 responses.")
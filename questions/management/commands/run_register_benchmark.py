@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import run_registration_benchmark, write_results
+
+
+class Command(BaseCommand):
+    help = ("Time registration form validation against a large user table, "
+            "with and without the case-insensitive e-mail index. It adds "
+            "users to the configured database and can drop one of its "
+            "indexes, so it only runs on a benchmark database, with --yes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=1_000_000,
+            help="Top the user table up to this many rows. The users added "
+                 "are inactive, with unusable passwords, and are kept.")
+        parser.add_argument("--registrations", type=int, default=200)
+        parser.add_argument(
+            "--without-index", action="store_true",
+            help="Also time it with the e-mail index dropped. The drop is "
+                 "rolled back (or the index recreated) when the run ends.")
+        parser.add_argument(
+            "--yes", action="store_true",
+            help="Confirm that the configured database is a benchmark "
+                 "database.")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        if not options["yes"]:
+            raise CommandError(
+                "This adds users to the configured database and can drop an "
+                "index; run it with --yes on a benchmark database.")
+
+        missing = options["users"] - User.objects.count()
+        if missing > 0:
+            call_command("generate_dataset", stdout=self.stdout,
+                         users=missing, questions=0, comments=0,
+                         username_prefix="registered", batch_size=10000,
+                         inactive_users=True)
+
+        results = run_registration_benchmark(
+            options["registrations"], options["without_index"])
+
+        self.stdout.write(f"{results['users']} users")
+        self.stdout.write(
+            f"{'mode':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'errors':>8}")
+        for mode, row in results["modes"].items():
+            self.stdout.write(
+                f"{mode:<24}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}"
+                f"{row['p99_ms']:>9.3f}{row['queries_per_request']:>9.1f}"
+                f"{row['errors']:>8}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
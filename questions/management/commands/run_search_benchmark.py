@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import run_search_benchmark, write_results
+from questions.models import Question
+
+
+class Command(BaseCommand):
+    help = ("Time the first and the next page of search results for common "
+            "and rare terms. Run it on a dataset of realistic size, e.g. "
+            "generate_dataset --questions 20000 --comments 300000.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query", nargs="+", dest="queries",
+            default=["django", "python query", "cache index token"],
+            help="Search terms; the defaults are generate_dataset words, "
+                 "which match a large share of the documents.")
+        parser.add_argument("--repeat", type=int, default=20,
+                            help="Times each page is loaded.")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        if not Question.objects.exists():
+            raise CommandError("Needs questions, see generate_dataset.")
+
+        results = run_search_benchmark(options["queries"], options["repeat"])
+
+        self.stdout.write(
+            f"{results['documents']} documents, "
+            f"{results['candidates']} candidates ranked per search")
+        self.stdout.write(
+            f"{'query':<24}{'page':<12}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'results':>9}")
+        for query, pages in results["queries"].items():
+            for page, row in pages.items():
+                self.stdout.write(
+                    f"{query:<24}{page:<12}{row['p50_ms']:>9.2f}"
+                    f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                    f"{row['results']:>9}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from questions.benchmark import run_session_benchmark, write_results
+
+
+class Command(BaseCommand):
+    help = ("Replay a visit that browses, logs in and flashes messages under "
+            "each session profile and report queries, writes and session "
+            "table queries per request.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", nargs="+",
+                            choices=sorted(settings.SESSION_PROFILES),
+                            default=["db", "cached_db", "signed_cookies"])
+        parser.add_argument("--username", default="session-benchmark")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        password = "session-benchmark-password"
+        user, _ = User.objects.get_or_create(username=options["username"])
+        user.set_password(password)
+        user.save()
+
+        results = run_session_benchmark(user, password, options["profiles"])
+
+        self.stdout.write(
+            f"{'profile':<16}{'queries':>9}{'writes':>9}{'session':>9}"
+            "  (per request)")
+        for name, row in results["profiles"].items():
+            self.stdout.write(
+                f"{name:<16}{row['queries_per_request']:>9.2f}"
+                f"{row['writes_per_request']:>9.2f}"
+                f"{row['session_queries_per_request']:>9.2f}")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.benchmark import (
+    BASELINE_PRAGMAS, pick_questions, run_write_benchmark, write_results,
+)
+
+
+class Command(BaseCommand):
+    help = ("Post comments from many writer threads through the question "
+            "detail view and report write throughput, latency percentiles, "
+            "errors and lock retries. The comments are kept, so run it on "
+            "a benchmark database. On SQLite, the journal mode is set back "
+            "to the database's own when the run ends, also after the tuned "
+            "mode's WAL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comments", type=int, default=500,
+                            help="Comments posted per mode.")
+        parser.add_argument("--writers", type=int, default=16)
+        parser.add_argument("--mode", nargs="+", dest="modes",
+                            choices=["current", "baseline", "tuned"],
+                            default=["baseline", "tuned"],
+                            help="current uses SQLITE_PRAGMAS, baseline "
+                                 "SQLite's defaults and tuned "
+                                 "SQLITE_TUNED_PRAGMAS.")
+        parser.add_argument("--output", default=None,
+                            help="Write JSON results to this file.")
+
+    def handle(self, *args, **options):
+        question, _ = pick_questions()
+        user = User.objects.filter(is_active=True).order_by("pk").first()
+        if question is None or user is None:
+            raise CommandError(
+                "Needs a published question and a user, see generate_dataset.")
+
+        pragmas = {
+            "current": settings.SQLITE_PRAGMAS,
+            "baseline": BASELINE_PRAGMAS,
+            "tuned": settings.SQLITE_TUNED_PRAGMAS,
+        }
+        results = run_write_benchmark(
+            question, user, options["comments"], options["writers"],
+            [(mode, pragmas[mode]) for mode in options["modes"]])
+
+        self.stdout.write(
+            f"{'mode':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'writes/s':>10}{'errors':>8}{'retries':>9}")
+        for mode, row in results["modes"].items():
+            self.stdout.write(
+                f"{mode:<10}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['throughput_rps']:>10.1f}"
+                f"{row['errors']:>8}{row['lock_retries']:>9}")
+        if results["journal_mode"] is not None:
+            self.stdout.write(
+                f"Journal mode restored to {results['journal_mode']}.")
+
+        if options["output"]:
+            write_results(results, options["output"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0003_alter_question_options_alter_comment_author_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['question', '-pub_date', '-id'], name='comment_question_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-pub_date', '-id'], name='question_published_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('is_published', False)), fields=['author', '-pub_date', '-id'], name='question_author_draft_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.3 on 2026-10-18 20:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_stats(apps, schema_editor):
+    Question = apps.get_model("questions", "Question")
+    Comment = apps.get_model("questions", "Comment")
+    comments = Comment.objects.filter(question=OuterRef("pk")).order_by()
+
+    Question.objects.update(
+        comment_count=Coalesce(Subquery(
+            comments.values("question").annotate(total=Count("pk"))
+            .values("total")), Value(0)),
+        last_comment_at=Subquery(
+            comments.order_by("-pub_date").values("pub_date")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_question_comment_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_comment_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+from django.db.models import Max, Min
+
+# The index as it was created at this point. The SQL is frozen here rather
+# than taken from questions.search, so later changes to the backends don't
+# change what this migration does.
+SEARCH_TABLE = "questions_search"
+
+CREATE_INDEX = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "body, question_id UNINDEXED, tokenize='porter unicode61')",
+    ],
+    "postgresql": [
+        f"CREATE TABLE {SEARCH_TABLE} ("
+        "id bigint PRIMARY KEY, question_id bigint NOT NULL, "
+        "document tsvector NOT NULL)",
+        f"CREATE INDEX {SEARCH_TABLE}_document_idx "
+        f"ON {SEARCH_TABLE} USING GIN (document)",
+        f"CREATE INDEX {SEARCH_TABLE}_question_idx "
+        f"ON {SEARCH_TABLE} (question_id)",
+    ],
+}
+
+# Question -> document 2 * id, comment -> 2 * id + 1.
+INDEX_ROWS = {
+    "sqlite": (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, body, question_id) "
+        "SELECT id * 2 + %s, {text}, {question} FROM {table} "
+        "WHERE id >= %s AND id < %s AND {question} IS NOT NULL"
+    ),
+    "postgresql": (
+        f"INSERT INTO {SEARCH_TABLE} (id, question_id, document) "
+        "SELECT id * 2 + %s, {question}, "
+        "to_tsvector('english'::regconfig, {text}) FROM {table} "
+        "WHERE id >= %s AND id < %s AND {question} IS NOT NULL"
+    ),
+}
+
+SOURCES = (
+    ("Question", 0, "question_text", "id"),
+    ("Comment", 1, "comment_text", "question_id"),
+)
+
+BATCH_SIZE = 10000
+
+
+def create_search_index(apps, schema_editor):
+    for sql in CREATE_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_INDEX:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def index_existing_rows(apps, schema_editor):
+    sql = INDEX_ROWS.get(schema_editor.connection.vendor)
+    if sql is None:
+        return
+    using = schema_editor.connection.alias
+    for model_name, kind, text_column, question_column in SOURCES:
+        model = apps.get_model("questions", model_name)
+        bounds = model.objects.using(using).aggregate(
+            low=Min("pk"), high=Max("pk"))
+        if bounds["low"] is None:
+            continue
+        insert = sql.format(text=text_column, question=question_column,
+                            table=model._meta.db_table)
+        with schema_editor.connection.cursor() as cursor:
+            for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+                cursor.execute(insert, [kind, start, start + BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0005_question_comment_count_last_comment_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
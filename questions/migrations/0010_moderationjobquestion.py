@@ -0,0 +1,43 @@
+# Generated by Django 4.1.3 on 2026-10-19 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_pending_ids(apps, schema_editor):
+    ModerationJob = apps.get_model("questions", "ModerationJob")
+    ModerationJobQuestion = apps.get_model(
+        "questions", "ModerationJobQuestion")
+    using = schema_editor.connection.alias
+    for job in ModerationJob.objects.using(using).filter(finished_at=None):
+        ModerationJobQuestion.objects.using(using).bulk_create(
+            (ModerationJobQuestion(job=job, question_id=question_id)
+             for question_id in job.question_ids[job.processed:]),
+            batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0009_question_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationJobQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.BigIntegerField()),
+                ('job', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='questions.moderationjob')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='moderationjobquestion',
+            constraint=models.UniqueConstraint(fields=('job', 'question_id'), name='moderation_job_question_uniq'),
+        ),
+        migrations.RunPython(copy_pending_ids, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='moderationjob',
+            name='question_ids',
+        ),
+    ]
@@ -1,19 +1,76 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 from django.urls import reverse
 
 # Create your models here.
 
 
+class QuestionQuerySet(models.QuerySet):
+    def for_listing(self):
+        # Only what the question lists render, with the author's username
+        # joined rather than a full User row fetched for every question.
+        return self.select_related("author").only(
+            "question_text", "pub_date", "comment_count", "author__username")
+
+    def comment_added(self, pub_date):
+        return self.update(
+            comment_count=F("comment_count") + 1,
+            last_comment_at=Greatest(
+                Coalesce("last_comment_at", Value(pub_date)), Value(pub_date)),
+        )
+
+    def comments_removed(self, count=1):
+        return self.update(
+            comment_count=Greatest(F("comment_count") - count, Value(0)),
+            last_comment_at=self._latest_comment_subquery(),
+        )
+
+    def recount_comments(self):
+        counts = (Comment.objects
+                  .filter(question=OuterRef("pk"))
+                  .order_by()
+                  .values("question")
+                  .annotate(total=Count("pk"))
+                  .values("total"))
+        return self.update(
+            comment_count=Coalesce(Subquery(counts), Value(0)),
+            last_comment_at=self._latest_comment_subquery(),
+        )
+
+    def _latest_comment_subquery(self):
+        return Subquery(Comment.objects
+                        .filter(question=OuterRef("pk"))
+                        .order_by("-pub_date")
+                        .values("pub_date")[:1])
+
+
 class Question(models.Model):
     author = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
     question_text = models.CharField(max_length=150)
     pub_date = models.DateTimeField(default=timezone.now)
     is_published = models.BooleanField(default=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(
+        null=True, blank=True, editable=False)
+    # Bumped by every save, and when one of its comments changes (see
+    # signals), so validators notice edits.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = QuestionQuerySet.as_manager()
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=["-pub_date", "-id"],
+                         condition=models.Q(is_published=True),
+                         name="question_published_date_idx"),
+            models.Index(fields=["author", "-pub_date", "-id"],
+                         condition=models.Q(is_published=False),
+                         name="question_author_draft_idx"),
+        ]
 
     def __str__(self):
         return self.question_text
@@ -27,10 +84,64 @@ class Comment(models.Model):
     question = models.ForeignKey(
         Question, null=True, on_delete=models.SET_NULL, related_name="comment")
     comment_text = models.TextField("", max_length=500)
-    pub_date = models.DateTimeField(auto_now_add=True)
+    pub_date = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=["question", "-pub_date", "-id"],
+                         name="comment_question_date_idx"),
+        ]
 
     def __str__(self):
         return self.comment_text[:20]
+
+
+class ModerationJob(models.Model):
+    """
+    A bulk publish/unpublish from the admin, applied in chunks by the
+    run_tasks worker (see questions.moderation). ``processed``
+    is only advanced with the chunk it covers, so a stopped worker resumes
+    where the last committed chunk ended.
+    """
+    is_published = models.BooleanField()
+    total = models.PositiveIntegerField()
+    processed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "pk"]
+        indexes = [
+            models.Index(fields=["created_at", "id"],
+                         condition=models.Q(finished_at=None),
+                         name="moderation_job_pending_idx"),
+        ]
+
+    def __str__(self):
+        action = "Publish" if self.is_published else "Unpublish"
+        return f"{action} {self.total} questions"
+
+    @property
+    def progress(self):
+        return 100 if not self.total else self.processed * 100 // self.total
+
+
+class ModerationJobQuestion(models.Model):
+    """
+    A question a ModerationJob has yet to apply. Each chunk takes the
+    lowest ids and deletes their rows.
+    """
+    # The unique constraint's index serves the lookups by job.
+    job = models.ForeignKey(ModerationJob, on_delete=models.CASCADE,
+                            related_name="+", db_index=False)
+    # Not a foreign key: deleting questions shouldn't have to look here.
+    question_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "question_id"],
+                                    name="moderation_job_question_uniq"),
+        ]
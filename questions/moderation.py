@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.sqlite import run_with_lock_retry
+from tasks.queue import enqueue
+
+from . import page_cache, tasks
+from .models import ModerationJob, ModerationJobQuestion, Question
+from .pagination import invalidate_counts_on_commit
+
+
+def start_job(queryset, is_published, user=None):
+    """
+    Snapshot the ids of ``queryset`` into a ModerationJob. A selection that
+    fits in one chunk is applied right away; larger ones are applied a
+    chunk per background task, so no request holds a long write lock.
+    """
+    using = router.db_for_write(ModerationJob)
+    with transaction.atomic(using=using):
+        job = ModerationJob.objects.using(using).create(
+            is_published=is_published, total=0,
+            created_by=user if user and user.is_authenticated else None)
+        # The database copies the ids, so the request never loads them.
+        sql, params = queryset.values("pk").query.get_compiler(
+            using).as_sql()
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {ModerationJobQuestion._meta.db_table} "
+                f"(job_id, question_id) SELECT %s, id FROM ({sql}) selection",
+                [job.pk, *params])
+            job.total = cursor.rowcount
+        job.save(update_fields=["total"])
+    if job.total <= settings.MODERATION_CHUNK_SIZE:
+        run_job(job)
+    else:
+        queue_next_chunk(job)
+    return job
+
+
+def queue_next_chunk(job):
+    # Each chunk is its own task, so other tasks and writers get the
+    # database between chunks, and a job resumes with the queue.
+    enqueue(tasks.run_moderation_chunk, job_id=job.pk,
+            idempotency_key=f"moderation:{job.pk}:{job.processed}")
+
+
+def run_chunk(job):
+    """
+    Apply the next chunk of ``job`` in its own transaction. Returns False
+    once the job is finished.
+    """
+    @transaction.atomic
+    def apply():
+        # Every chunk deletes the ids it applied, so the next chunk is the
+        # lowest remaining ids and only total - processed are left.
+        processed = min(job.processed + settings.MODERATION_CHUNK_SIZE,
+                        job.total)
+        # Claiming the chunk comes first so the transaction takes the write
+        # lock up front (SQLite fails at once, instead of waiting, when it
+        # can't upgrade a read transaction), and so a worker that lost the
+        # chunk to another one leaves it alone.
+        claimed = ModerationJob.objects.filter(
+            pk=job.pk, processed=job.processed, finished_at=None,
+        ).update(processed=processed)
+        if not claimed:
+            return
+
+        remaining = ModerationJobQuestion.objects.filter(job=job)
+        chunk = list(remaining.order_by("question_id").values_list(
+            "question_id", flat=True)[:processed - job.processed])
+        changed = []
+        if chunk:
+            # The range bounds the rows each chunk reads; only rows whose
+            # state changes are written and purged.
+            changed = list(Question.objects
+                           .filter(pk__gte=chunk[0], pk__lte=chunk[-1],
+                                   pk__in=chunk)
+                           .exclude(is_published=job.is_published)
+                           .values_list("pk", flat=True))
+            remaining.filter(question_id__lte=chunk[-1]).delete()
+        if changed:
+            Question.objects.filter(pk__in=changed).update(
+                is_published=job.is_published)
+            page_cache.invalidate_on_commit(changed, lists=True)
+            invalidate_counts_on_commit(Question)
+
+        ModerationJob.objects.filter(pk=job.pk).update(
+            changed=F("changed") + len(changed),
+            finished_at=timezone.now() if processed >= job.total else None)
+
+    run_with_lock_retry(apply)
+    job.refresh_from_db(fields=["processed", "changed", "finished_at"])
+    return job.finished_at is None
+
+
+def run_job(job):
+    while run_chunk(job):
+        pass
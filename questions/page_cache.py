@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+# Every cached page is stored with the versions of the tags it depends on:
+# ``question:<pk>`` for each question it shows and ``list`` for list pages.
+# Invalidating a tag deletes its version, so every page stored with the old
+# one becomes a miss, without having to know which URLs those pages had.
+LIST_TAG = "list"
+SEQUENCE_KEY = "page-cache:sequence"
+LOCK_POLL_INTERVAL = 0.05
+
+
+def question_tag(pk):
+    return f"question:{pk}"
+
+
+def list_page_tags(context):
+    return [LIST_TAG] + [question_tag(question.pk)
+                         for question in context["question_list"]]
+
+
+def question_page_tags(context):
+    return [question_tag(context["question"].pk)]
+
+
+# Views whose anonymous GET responses are cached, and their pages' tags.
+CACHED_VIEWS = {
+    "questions:list": list_page_tags,
+    "questions:detail": question_page_tags,
+    "questions:comments": question_page_tags,
+}
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def tag_key(tag):
+    return f"page-cache:tag:{tag}"
+
+
+def invalidate(question_ids=(), lists=False):
+    """
+    Purge cached pages showing any of ``question_ids``, and every list page
+    if ``lists``.
+    """
+    tags = [question_tag(pk) for pk in question_ids]
+    if lists:
+        tags.append(LIST_TAG)
+    if not tags:
+        return
+
+    cache = get_cache()
+    cache.delete_many([tag_key(tag) for tag in tags])
+    # Pages rendered while this ran may hold the data from before it; the
+    # middleware won't store them when the sequence has moved on.
+    cache.add(SEQUENCE_KEY, 0, None)
+    cache.incr(SEQUENCE_KEY)
+
+
+def invalidate_on_commit(question_ids=(), lists=False):
+    """
+    ``invalidate`` now, so this process stops serving the old pages, and
+    again once the transaction commits, in case another process cached one
+    in between from data that wasn't committed yet.
+    """
+    question_ids = list(question_ids)
+    invalidate(question_ids, lists)
+    transaction.on_commit(lambda: invalidate(question_ids, lists))
+
+
+def clear():
+    get_cache().clear()
+
+
+class PageCacheMiddleware(MiddlewareMixin):
+    """
+    Serve GET/HEAD requests for the views in ``CACHED_VIEWS`` from the
+    "pages" cache when the client has no session or messages cookie, i.e.
+    is anonymous and has nothing flashed to show. Pages are cached by
+    absolute URL and purged through their tags (see ``invalidate``).
+
+    On a miss only one request renders the page: the others wait for it
+    for up to ``PAGE_CACHE_LOCK_TIMEOUT`` seconds, and then render it
+    themselves.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        cacheable = self.is_cacheable(request)
+        if cacheable is None:
+            return self.get_response(request)
+        if not cacheable:
+            return self.patch_headers(self.get_response(request), False)
+
+        cache, key = get_cache(), self.cache_key(request)
+        deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+        while True:
+            response = self.cached_response(cache, key)
+            if response is not None:
+                return response
+            locked = self.acquire(cache, key)
+            if locked or time.monotonic() >= deadline:
+                break
+            time.sleep(LOCK_POLL_INTERVAL)
+
+        sequence = cache.get(SEQUENCE_KEY)
+        try:
+            response = self.get_response(request)
+            self.store(cache, key, request, response, sequence)
+        finally:
+            if locked:
+                self.release(cache, key)
+        return response
+
+    async def __acall__(self, request):
+        cacheable = self.is_cacheable(request)
+        if cacheable is None:
+            return await self.get_response(request)
+        if not cacheable:
+            return self.patch_headers(await self.get_response(request), False)
+
+        cache, key = get_cache(), self.cache_key(request)
+        deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_TIMEOUT
+        while True:
+            response = self.cached_response(cache, key)
+            if response is not None:
+                return response
+            locked = self.acquire(cache, key)
+            if locked or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+        sequence = cache.get(SEQUENCE_KEY)
+        try:
+            response = await self.get_response(request)
+            self.store(cache, key, request, response, sequence)
+        finally:
+            if locked:
+                self.release(cache, key)
+        return response
+
+    def is_cacheable(self, request):
+        """
+        None for requests to other views, otherwise whether the response
+        may be cached.
+        """
+        if not settings.PAGE_CACHE_ENABLED:
+            return None
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return None
+        if view_name not in CACHED_VIEWS:
+            return None
+        return (request.method in ("GET", "HEAD")
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES
+                and CookieStorage.cookie_name not in request.COOKIES)
+
+    def cache_key(self, request):
+        url = request.build_absolute_uri()
+        return "page-cache:page:" + hashlib.md5(url.encode()).hexdigest()
+
+    def acquire(self, cache, key):
+        return cache.add(key + ":lock", 1, settings.PAGE_CACHE_LOCK_TIMEOUT)
+
+    def release(self, cache, key):
+        cache.delete(key + ":lock")
+
+    def cached_response(self, cache, key):
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if cache.get_many(entry["tags"]) != entry["tags"]:
+            return None
+
+        response = HttpResponse(entry["content"], status=entry["status"])
+        for header, value in entry["headers"]:
+            response[header] = value
+        response["X-Page-Cache"] = "hit"
+        return response
+
+    def store(self, cache, key, request, response, sequence):
+        self.patch_headers(response, True)
+        response["X-Page-Cache"] = "miss"
+        if (response.status_code != 200 or response.streaming
+                or response.cookies
+                or getattr(response, "context_data", None) is None
+                or cache.get(SEQUENCE_KEY) != sequence):
+            return
+
+        page_tags = CACHED_VIEWS[request.resolver_match.view_name]
+        tag_keys = [tag_key(tag) for tag in page_tags(response.context_data)]
+        tags = cache.get_many(tag_keys)
+        missing = {tag: time.time_ns() for tag in tag_keys if tag not in tags}
+        cache.set_many(missing, None)
+        tags.update(missing)
+
+        cache.set(key, {
+            "tags": tags,
+            "status": response.status_code,
+            "content": response.content,
+            "headers": [(header, value) for header, value in response.items()
+                        if header != "X-Page-Cache"],
+        }, settings.PAGE_CACHE_TIMEOUT)
+
+    def patch_headers(self, response, public):
+        patch_vary_headers(response, ("Cookie",))
+        if public:
+            patch_cache_control(response, public=True,
+                                max_age=settings.PAGE_CACHE_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True)
+        return response
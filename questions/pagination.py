@@ -0,0 +1,357 @@
+import base64
+import binascii
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT, PREVIOUS = "n", "p"
+
+# Page counts of CachedCountPaginator are cached under a per-table version,
+# bumped when rows are added, removed or moved between lists.
+COUNT_CACHE_ALIAS = "counts"
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, value=None, pk=None):
+    raw = "|".join([
+        direction,
+        value.isoformat() if value is not None else "",
+        str(pk) if pk is not None else "",
+    ])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        direction, value, pk = raw.decode().split("|")
+        if direction not in (NEXT, PREVIOUS):
+            raise ValueError(direction)
+        if not value and not pk:
+            # An empty key means "start from the oldest end" (Last page).
+            return direction, None, None
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError(token)
+        return direction, value, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(token) from e
+
+
+class WindowedPage(Page):
+    @cached_property
+    def window(self):
+        """
+        Page numbers to link around the current page, with ``None`` where
+        a run of pages is elided. Size is constant whatever ``num_pages``.
+        """
+        return [
+            None if number == self.paginator.ELLIPSIS else number
+            for number in self.paginator.get_elided_page_range(
+                self.number,
+                on_each_side=self.paginator.on_each_side,
+                on_ends=self.paginator.on_ends)
+        ]
+
+
+class WindowedPaginator(Paginator):
+    on_each_side = 2
+    on_ends = 1
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+def estimate_count(queryset):
+    """
+    The database's estimate of how many rows ``queryset`` has, read from
+    planner statistics (PostgreSQL's ``reltuples``, SQLite's
+    ``sqlite_stat1`` once ANALYZE has run), or None. Only unfiltered
+    querysets, and those filtered on exactly the condition of one of the
+    model's partial indexes (whose statistics count just the matching
+    rows), have one.
+    """
+    if not isinstance(queryset, QuerySet):
+        return None
+    query = queryset.query
+    if query.distinct or query.is_sliced or query.combinator:
+        return None
+
+    table = queryset.model._meta.db_table
+    index = None
+    if query.where:
+        index = next((
+            index.name for index in queryset.model._meta.indexes
+            if index.condition is not None and query.where == (
+                queryset.model._base_manager.filter(index.condition)
+                .query.where)
+        ), None)
+        if index is None:
+            return None
+
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(index or table)])
+            rows = [row[0] for row in cursor.fetchall()]
+        elif connection.vendor == "sqlite":
+            cursor.execute("SELECT 1 FROM sqlite_master "
+                           "WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of every stat is the row count of the table
+            # or index.
+            if index is None:
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            else:
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE idx = %s", [index])
+            rows = [int(row[0].split()[0]) for row in cursor.fetchall()]
+        else:
+            return None
+
+    # reltuples is -1 (or 0 before PostgreSQL 14) until the first ANALYZE.
+    estimate = max(rows, default=0)
+    return int(estimate) if estimate > 0 else None
+
+
+def count_version_key(model):
+    return f"count:version:{model._meta.db_table}"
+
+
+def get_count_version(model):
+    cache = caches[COUNT_CACHE_ALIAS]
+    key = count_version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_counts(model):
+    caches[COUNT_CACHE_ALIAS].delete(count_version_key(model))
+
+
+def invalidate_counts_on_commit(model):
+    """
+    ``invalidate_counts`` now and again once the transaction commits, so a
+    count taken in between from the data before the commit isn't kept.
+    """
+    invalidate_counts(model)
+    transaction.on_commit(lambda: invalidate_counts(model))
+
+
+class CachedCountPaginator(WindowedPaginator):
+    """
+    WindowedPaginator whose count is cached for
+    PAGINATION_COUNT_CACHE_TIMEOUT seconds, or until the model's counts are
+    invalidated. When the planner estimates PAGINATION_ESTIMATE_THRESHOLD
+    rows or more, the estimate is used instead of a COUNT and
+    ``approximate`` is set.
+    """
+
+    # Whether the count came from the cache, and may be behind the rows.
+    cached = False
+
+    @cached_property
+    def _count(self):
+        cache = caches[COUNT_CACHE_ALIAS]
+        key = self.count_key()
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self.cached = True
+                return cached
+
+        threshold = settings.PAGINATION_ESTIMATE_THRESHOLD
+        estimate = estimate_count(self.object_list) if threshold else None
+        if estimate is not None and estimate >= threshold:
+            result = estimate, True
+        else:
+            result = super().count, False
+        if key is not None:
+            cache.set(key, result, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return result
+
+    def count_key(self):
+        queryset = self.object_list
+        if (not isinstance(queryset, QuerySet)
+                or not settings.PAGINATION_COUNT_CACHE_TIMEOUT):
+            return None
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return None
+        digest = hashlib.md5(f"{queryset.db}:{sql}".encode()).hexdigest()
+        return (f"count:{queryset.model._meta.db_table}:"
+                f"{get_count_version(queryset.model)}:{digest}")
+
+    @property
+    def count(self):
+        return self._count[0]
+
+    @property
+    def approximate(self):
+        return self._count[1]
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if int(number) < 1:
+                raise
+            # An estimate may fall short of the real count, so pages past
+            # it are still served.
+            if self.approximate:
+                return int(number)
+            # A count cached before rows were added elsewhere: show the
+            # last page it knows of rather than a 404.
+            if self.cached:
+                return self.num_pages
+            raise
+
+    def page(self, number):
+        if not self.approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<Keyset page of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.cursor_for(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor_for(PREVIOUS, self.object_list[0])
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset on ``(field, pk)`` descending using a WHERE clause
+    instead of OFFSET, so every page costs the same and no COUNT is needed.
+    """
+    is_keyset = True
+
+    def __init__(self, queryset, per_page, field="pub_date"):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.field = field
+
+    def cursor_for(self, direction, obj):
+        if isinstance(obj, dict):
+            return encode_cursor(direction, obj[self.field], obj["pk"])
+        return encode_cursor(direction, getattr(obj, self.field), obj.pk)
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(PREVIOUS)
+
+    def _page_query(self, cursor):
+        field = self.field
+
+        if cursor is None:
+            direction, value, pk = NEXT, None, None
+        else:
+            direction, value, pk = decode_cursor(cursor)
+
+        if direction == NEXT:
+            qs = self.queryset.order_by(f"-{field}", "-pk")
+            if value is not None:
+                qs = qs.filter(
+                    Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}))
+        else:
+            qs = self.queryset.order_by(field, "pk")
+            if value is not None:
+                qs = qs.filter(
+                    Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk}))
+
+        return direction, value, qs[:self.per_page + 1]
+
+    def _make_page(self, rows, cursor, direction, value):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == NEXT:
+            return KeysetPage(rows, self, has_more, cursor is not None)
+
+        rows.reverse()
+        return KeysetPage(rows, self, value is not None, has_more)
+
+    def page(self, cursor=None):
+        direction, value, qs = self._page_query(cursor)
+        return self._make_page(list(qs), cursor, direction, value)
+
+    async def apage(self, cursor=None):
+        direction, value, qs = self._page_query(cursor)
+        return self._make_page([row async for row in qs], cursor,
+                               direction, value)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin serving ``?cursor=`` keyset pages by default while still
+    honouring legacy ``?page=N`` links through the regular paginator.
+    """
+    cursor_kwarg = "cursor"
+    keyset_field = "pub_date"
+    paginator_class = CachedCountPaginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET or self.page_kwarg in self.kwargs:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, field=self.keyset_field)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+
+        return (paginator, page, page.object_list, page.has_other_pages())
@@ -0,0 +1,363 @@
+import base64
+import binascii
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max, Min, Q
+
+from .pagination import InvalidCursor
+
+SEARCH_TABLE = "questions_search"
+
+# Each question and comment is one document. Their ids share the document
+# id space (question -> 2 * id, comment -> 2 * id + 1) so a single row can
+# be replaced or removed by primary key.
+QUESTION, COMMENT = 0, 1
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def document_id(kind, pk):
+    return pk * 2 + kind
+
+
+def encode_search_cursor(score, question_id):
+    raw = f"{score!r}|{question_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        score, question_id = raw.decode().split("|")
+        return float(score), int(question_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(token) from e
+
+
+class BaseSearchBackend:
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def create_index(self, schema_editor):
+        pass
+
+    def drop_index(self, schema_editor):
+        pass
+
+    def index_question(self, question):
+        self._replace(document_id(QUESTION, question.pk), question.pk,
+                      question.question_text)
+
+    def index_comment(self, comment):
+        if comment.question_id is None:
+            self.remove_comment(comment.pk)
+            return
+        self._replace(document_id(COMMENT, comment.pk), comment.question_id,
+                      comment.comment_text)
+
+    def remove_question(self, pk):
+        self._remove(document_id(QUESTION, pk))
+
+    def remove_comment(self, pk):
+        self._remove(document_id(COMMENT, pk))
+
+    def _replace(self, doc_id, question_id, text):
+        pass
+
+    def _remove(self, doc_id):
+        pass
+
+    def _sources(self):
+        from .models import Comment, Question
+
+        return {
+            Question: (QUESTION, "question_text", "id"),
+            Comment: (COMMENT, "comment_text", "question_id"),
+        }
+
+    def rebuild(self, batch_size=10000):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+        indexed = 0
+        for model in self._sources():
+            bounds = model.objects.using(self.using).aggregate(
+                low=Min("pk"), high=Max("pk"))
+            if bounds["low"] is None:
+                continue
+            for start in range(bounds["low"], bounds["high"] + 1, batch_size):
+                indexed += self._index_where(
+                    model, "id >= %s AND id < %s", [start, start + batch_size])
+        return indexed
+
+    def index_pks(self, model, pks, chunk_size=500):
+        """Bulk index freshly created rows, e.g. after ``bulk_create()``."""
+        pks = list(pks)
+        indexed = 0
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start:start + chunk_size]
+            indexed += self._index_where(
+                model, f"id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        return indexed
+
+    def _index_where(self, model, where, params):
+        kind, text_column, question_column = self._sources()[model]
+        return self._bulk_insert(
+            model._meta.db_table, kind, text_column, question_column,
+            where, params)
+
+    def _bulk_insert(self, table, kind, text_column, question_column,
+                     where, params):
+        return 0
+
+    def search(self, query, limit, cursor=None, published_only=True,
+               comments=True):
+        """
+        Return ``(question_id, score)`` pairs for questions whose text or
+        comments match ``query``, best match (lowest score) first. Drafts
+        are left out unless ``published_only`` is false, and comments
+        unless ``comments`` is true.
+
+        Indexed backends only rank the SEARCH_CANDIDATES (or ``limit``, if
+        more) newest matching documents, so a page costs the same however
+        many documents match; older matches of a common term aren't found.
+        """
+        raise NotImplementedError
+
+    def candidates(self, limit):
+        return max(settings.SEARCH_CANDIDATES, limit)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    def create_index(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "body, question_id UNINDEXED, tokenize='porter unicode61')")
+
+    def drop_index(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def _replace(self, doc_id, question_id, text):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [doc_id])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, body, question_id) "
+                "VALUES (%s, %s, %s)", [doc_id, text, question_id])
+
+    def _remove(self, doc_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [doc_id])
+
+    def _bulk_insert(self, table, kind, text_column, question_column,
+                     where, params):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, body, question_id) "
+                f"SELECT id * 2 + %s, {text_column}, {question_column} "
+                f"FROM {table} WHERE {where} "
+                f"AND {question_column} IS NOT NULL",
+                [kind, *params])
+            return cursor.rowcount
+
+    def match_expression(self, query):
+        # Quote every word so user input can't inject FTS5 query syntax.
+        return " ".join(f'"{word}"' for word in WORD_RE.findall(query))
+
+    def search(self, query, limit, cursor=None, published_only=True,
+               comments=True):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+
+        having, params = "", [expression, self.candidates(limit)]
+        if cursor is not None:
+            score, question_id = decode_search_cursor(cursor)
+            having = ("HAVING score > %s "
+                      "OR (score = %s AND m.question_id > %s)")
+            params += [score, score, question_id]
+
+        with self.connection.cursor() as c:
+            # Walking the matches newest first stops after the candidates,
+            # and only their rank is computed.
+            c.execute(
+                "SELECT m.question_id, MIN(m.rank) AS score FROM ("
+                f"  SELECT question_id, rank FROM {SEARCH_TABLE}"
+                f"  WHERE {SEARCH_TABLE} MATCH %s"
+                f"  {'' if comments else f'AND rowid %% 2 = {QUESTION}'}"
+                "  ORDER BY rowid DESC LIMIT %s"
+                ") m "
+                "INNER JOIN questions_question q ON q.id = m.question_id "
+                f"{'WHERE q.is_published' if published_only else ''} "
+                f"GROUP BY m.question_id {having} "
+                "ORDER BY score, m.question_id LIMIT %s",
+                params + [limit])
+            return c.fetchall()
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    config = "english"
+
+    def create_index(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE TABLE {SEARCH_TABLE} ("
+            "id bigint PRIMARY KEY, question_id bigint NOT NULL, "
+            "document tsvector NOT NULL)")
+        schema_editor.execute(
+            f"CREATE INDEX {SEARCH_TABLE}_document_idx "
+            f"ON {SEARCH_TABLE} USING GIN (document)")
+        schema_editor.execute(
+            f"CREATE INDEX {SEARCH_TABLE}_question_idx "
+            f"ON {SEARCH_TABLE} (question_id)")
+
+    def drop_index(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def _replace(self, doc_id, question_id, text):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (id, question_id, document) "
+                "VALUES (%s, %s, to_tsvector(%s::regconfig, %s)) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "question_id = EXCLUDED.question_id, "
+                "document = EXCLUDED.document",
+                [doc_id, question_id, self.config, text])
+
+    def _remove(self, doc_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE id = %s", [doc_id])
+
+    def _bulk_insert(self, table, kind, text_column, question_column,
+                     where, params):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (id, question_id, document) "
+                f"SELECT id * 2 + %s, {question_column}, "
+                f"to_tsvector(%s::regconfig, {text_column}) "
+                f"FROM {table} WHERE {where} "
+                f"AND {question_column} IS NOT NULL",
+                [kind, self.config, *params])
+            return cursor.rowcount
+
+    def search(self, query, limit, cursor=None, published_only=True,
+               comments=True):
+        if not WORD_RE.search(query):
+            return []
+
+        having = ""
+        params = [self.config, query, self.candidates(limit)]
+        if cursor is not None:
+            score, question_id = decode_search_cursor(cursor)
+            having = ("HAVING MIN(-ts_rank_cd(m.document, query.q)) > %s "
+                      "OR (MIN(-ts_rank_cd(m.document, query.q)) = %s "
+                      "AND m.question_id > %s)")
+            params += [score, score, question_id]
+
+        with self.connection.cursor() as c:
+            # Only the candidates are ranked; ts_rank_cd() reads the whole
+            # tsvector, so ranking every match is what grows with them.
+            c.execute(
+                "WITH query AS ("
+                "  SELECT websearch_to_tsquery(%s::regconfig, %s) AS q"
+                "), m AS ("
+                "  SELECT s.question_id, s.document"
+                f"  FROM {SEARCH_TABLE} s, query"
+                "  WHERE s.document @@ query.q"
+                f"  {'' if comments else f'AND s.id %% 2 = {QUESTION}'}"
+                "  ORDER BY s.id DESC LIMIT %s"
+                ") "
+                "SELECT m.question_id, "
+                "MIN(-ts_rank_cd(m.document, query.q)) AS score "
+                "FROM m, query, questions_question q "
+                "WHERE q.id = m.question_id "
+                f"{'AND q.is_published' if published_only else ''} "
+                f"GROUP BY m.question_id {having} "
+                "ORDER BY score, m.question_id LIMIT %s",
+                params + [limit])
+            return c.fetchall()
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Unindexed ``icontains`` search for databases without a backend."""
+
+    def search(self, query, limit, cursor=None, published_only=True,
+               comments=True):
+        from .models import Comment, Question
+
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+
+        questions = Question.objects.using(self.using).all()
+        if published_only:
+            questions = questions.filter(is_published=True)
+        for word in words:
+            match = Q(question_text__icontains=word)
+            if comments:
+                match |= Q(pk__in=Comment.objects.filter(
+                    comment_text__icontains=word).values("question"))
+            questions = questions.filter(match)
+        if cursor is not None:
+            _, question_id = decode_search_cursor(cursor)
+            questions = questions.filter(pk__gt=question_id)
+
+        return [(pk, 0.0) for pk in
+                questions.order_by("pk").values_list("pk", flat=True)[:limit]]
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, FallbackSearchBackend)(using)
+
+
+class SearchPage:
+    def __init__(self, object_list, has_next, next_cursor):
+        self.object_list = object_list
+        self._has_next = has_next
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+
+def search_questions(query, per_page, cursor=None, using=DEFAULT_DB_ALIAS):
+    from .models import Question
+
+    rows = get_search_backend(using).search(query, per_page + 1, cursor)
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    questions = Question.objects.using(using).for_listing().in_bulk(
+        [question_id for question_id, _ in rows])
+    results = []
+    for question_id, score in rows:
+        question = questions.get(question_id)
+        if question is not None:
+            question.search_score = score
+            results.append(question)
+
+    next_cursor = None
+    if has_next:
+        question_id, score = rows[-1]
+        next_cursor = encode_search_cursor(score, question_id)
+    return SearchPage(results, has_next, next_cursor)
@@ -0,0 +1,68 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tasks.queue import enqueue
+
+from . import comment_cache, page_cache, tasks
+from .models import Comment, Question
+from .pagination import invalidate_counts_on_commit
+
+
+# Search indexing runs in the background; the tasks are written in the
+# same transaction as the change, so they only exist if it commits.
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, using, **kwargs):
+    enqueue(tasks.index_question, pk=instance.pk, using=using)
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, using, **kwargs):
+    enqueue(tasks.remove_question, pk=instance.pk, using=using)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, using, **kwargs):
+    enqueue(tasks.index_comment, pk=instance.pk, using=using)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, using, **kwargs):
+    enqueue(tasks.remove_comment, pk=instance.pk, using=using)
+
+
+@receiver(post_save, sender=Question)
+def purge_question_pages(sender, instance, created, **kwargs):
+    # A new draft isn't on any page yet; any other save may add the question
+    # to, or remove it from, the list pages.
+    page_cache.invalidate_on_commit(
+        [instance.pk], lists=instance.is_published or not created)
+
+
+@receiver(post_delete, sender=Question)
+def purge_deleted_question_pages(sender, instance, **kwargs):
+    page_cache.invalidate_on_commit([instance.pk], lists=True)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    if instance.question_id is not None:
+        comment_cache.bump_on_commit(instance.question_id)
+        page_cache.invalidate_on_commit([instance.question_id])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def purge_question_counts(sender, **kwargs):
+    # Any save may add, remove or publish a question.
+    invalidate_counts_on_commit(Question)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_question(sender, instance, **kwargs):
+    # Comment edits change neither the count nor last_comment_at.
+    if instance.question_id is not None:
+        Question.objects.filter(pk=instance.question_id).update(
+            updated_at=timezone.now())
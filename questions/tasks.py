@@ -0,0 +1,49 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from tasks.queue import task
+
+from . import moderation, page_cache
+from .models import Comment, ModerationJob, Question
+from .search import get_search_backend
+
+# Every task reads the row when it runs, so running one twice, or after a
+# later change to the row, leaves the same result.
+
+
+@task
+def index_question(pk, using=DEFAULT_DB_ALIAS):
+    question = Question.objects.using(using).filter(pk=pk).first()
+    # A deleted question is removed by its own task.
+    if question is not None:
+        get_search_backend(using).index_question(question)
+
+
+@task
+def remove_question(pk, using=DEFAULT_DB_ALIAS):
+    get_search_backend(using).remove_question(pk)
+
+
+@task
+def index_comment(pk, using=DEFAULT_DB_ALIAS):
+    comment = Comment.objects.using(using).filter(pk=pk).first()
+    if comment is not None:
+        get_search_backend(using).index_comment(comment)
+
+
+@task
+def remove_comment(pk, using=DEFAULT_DB_ALIAS):
+    get_search_backend(using).remove_comment(pk)
+
+
+@task
+def refresh_comment_stats(question_id):
+    Question.objects.filter(pk=question_id).recount_comments()
+    # update() sends no signals; purge the pages showing the old count.
+    page_cache.invalidate_on_commit([question_id])
+
+
+@task
+def run_moderation_chunk(job_id):
+    job = ModerationJob.objects.filter(pk=job_id).first()
+    if job is not None and moderation.run_chunk(job):
+        moderation.queue_next_chunk(job)
@@ -0,0 +1,136 @@
+import re
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.admin import COMMENT_PAGE_VAR
+from questions.models import Comment, Question
+from questions.search import get_search_backend
+
+from .utils import create_question
+
+
+def total_forms(response):
+    return int(re.search(
+        r'name="comment-TOTAL_FORMS" value="(\d+)"',
+        response.content.decode("utf-8")).group(1))
+
+
+class QuestionAdminTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        self.author = self.question.author
+        User.objects.bulk_create(
+            User(username=f"reader{i}") for i in range(30))
+        Comment.objects.bulk_create(
+            Comment(question=self.question, author=self.author,
+                    comment_text=f"comment number {i}")
+            for i in range(45))
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="admin", password="password")
+        self.change_url = reverse("admin:questions_question_change",
+                                  args=[self.question.pk])
+        self.changelist_url = reverse("admin:questions_question_changelist")
+        return super().setUp()
+
+    def test_default_mode_shows_every_comment(self):
+        response = self.client.get(self.change_url)
+
+        self.assertEqual(total_forms(response), 45)
+        self.assertContains(response, "reader29")
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_paginates_the_comment_inline(self):
+        response = self.client.get(self.change_url)
+        self.assertEqual(total_forms(response), 20)
+        self.assertContains(response, f"?{COMMENT_PAGE_VAR}=3")
+        self.assertContains(response, "45 comments")
+
+        response = self.client.get(f"{self.change_url}?{COMMENT_PAGE_VAR}=3")
+        self.assertEqual(total_forms(response), 5)
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_does_not_list_every_user(self):
+        response = self.client.get(self.change_url)
+
+        self.assertNotContains(response, "reader29")
+        self.assertContains(response, "admin-autocomplete")
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_saves_the_comment_page(self):
+        url = f"{self.change_url}?{COMMENT_PAGE_VAR}=3"
+        formset = self.client.get(url).context[
+            "inline_admin_formsets"][0].formset
+        data = {
+            "author": self.author.pk,
+            "question_text": self.question.question_text,
+            "pub_date_0": self.question.pub_date.strftime("%Y-%m-%d"),
+            "pub_date_1": self.question.pub_date.strftime("%H:%M:%S"),
+            "is_published": "on",
+            "comment-TOTAL_FORMS": 5,
+            "comment-INITIAL_FORMS": 5,
+        }
+        for i, comment in enumerate(formset.get_queryset()):
+            data.update({
+                f"comment-{i}-id": comment.pk,
+                f"comment-{i}-question": self.question.pk,
+                f"comment-{i}-author": self.author.pk,
+                f"comment-{i}-comment_text": comment.comment_text,
+            })
+        data["comment-0-comment_text"] = "edited on page 3"
+
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Comment.objects.filter(
+            comment_text="edited on page 3").exists())
+        self.assertEqual(self.question.comment.count(), 45)
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_changelist_queries(self):
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.changelist_url)
+        for i in range(5):
+            create_question(username=f"author{i}")
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.changelist_url)
+
+        # Authors are joined, and only the page's count runs.
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(sum("COUNT(" in q["sql"] for q in many), 1)
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_searches_drafts_through_the_index(self):
+        draft = Question.objects.create(
+            author=self.author, question_text="A needle in the drafts")
+
+        response = self.client.get(self.changelist_url, {"q": "needle"})
+
+        self.assertEqual(list(response.context["cl"].result_list), [draft])
+        self.assertContains(response, "Matches whole words")
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_search_ignores_comments(self):
+        Comment.objects.create(question=self.question, author=self.author,
+                               comment_text="A needle in a comment")
+
+        response = self.client.get(self.changelist_url, {"q": "needle"})
+
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+    @override_settings(ADMIN_SCALING_MODE=True)
+    def test_scaling_mode_search_says_when_results_are_capped(self):
+        Question.objects.bulk_create(
+            Question(author=self.author, question_text=f"Needle {i}")
+            for i in range(4))
+        get_search_backend().rebuild()
+
+        with mock.patch("questions.admin.ADMIN_SEARCH_LIMIT", 3):
+            response = self.client.get(self.changelist_url, {"q": "needle"})
+
+        self.assertEqual(len(response.context["cl"].result_list), 3)
+        self.assertContains(response, "Only the best 3 matches are shown")
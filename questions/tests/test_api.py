@@ -0,0 +1,129 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from questions import api
+from questions.models import Comment, Question
+from .utils import create_question
+
+
+class QuestionApiTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        self.author = User.objects.get(username="username")
+        return super().setUp()
+
+    def post_comment(self, text="an answer"):
+        comment = Comment.objects.create(
+            question=self.question, author=self.author, comment_text=text)
+        Question.objects.filter(pk=self.question.pk).comment_added(
+            comment.pub_date)
+        return comment
+
+    def test_list_returns_compact_published_questions(self):
+        create_question(username="username2")
+        response = self.client.get(reverse("questions-api:list"))
+        data = response.json()
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["author"], "username")
+        self.assertEqual(set(data["results"][0]), {
+            "id", "author", "question_text", "pub_date", "comment_count",
+            "last_comment_at"})
+        self.assertIsNone(data["next"])
+
+    def test_list_is_keyset_paginated(self):
+        for i in range(api.PAGE_SIZE + 3):
+            create_question(f"Question number {i}", is_published=True,
+                            username=f"username {i}")
+        first = self.client.get(reverse("questions-api:list")).json()
+        second = self.client.get(first["next"]).json()
+
+        ids = [row["id"] for row in first["results"] + second["results"]]
+        self.assertEqual(len(ids), api.PAGE_SIZE + 4)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_list_invalid_cursor_returns_400(self):
+        response = self.client.get(reverse("questions-api:list"),
+                                   data={"cursor": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_returns_question(self):
+        response = self.client.get(
+            reverse("questions-api:detail", kwargs={"pk": self.question.pk}))
+        self.assertEqual(response.json()["question_text"], "Question number 1")
+
+    def test_detail_returns_404_for_unpublished_question(self):
+        question = create_question(username="username2")
+        response = self.client.get(
+            reverse("questions-api:detail", kwargs={"pk": question.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments_are_keyset_paginated(self):
+        for i in range(api.COMMENTS_PAGE_SIZE + 1):
+            self.post_comment(f"answer {i}")
+        url = reverse("questions-api:comments",
+                      kwargs={"pk": self.question.pk})
+        first = self.client.get(url).json()
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual(len(first["results"]), api.COMMENTS_PAGE_SIZE)
+        self.assertEqual(len(second["results"]), 1)
+
+    def test_unchanged_detail_returns_304_with_a_single_query(self):
+        url = reverse("questions-api:detail", kwargs={"pk": self.question.pk})
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_comment_changes_the_etag(self):
+        url = reverse("questions-api:comments",
+                      kwargs={"pk": self.question.pk})
+        etag = self.client.get(url)["ETag"]
+        self.post_comment()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_question_edit_changes_the_etags(self):
+        detail = reverse("questions-api:detail",
+                         kwargs={"pk": self.question.pk})
+        detail_etag = self.client.get(detail)["ETag"]
+        list_etag = self.client.get(reverse("questions-api:list"))["ETag"]
+        self.question.question_text = "Edited question"
+        self.question.save()
+
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.json()["question_text"], "Edited question")
+        response = self.client.get(reverse("questions-api:list"),
+                                   HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_edit_changes_the_etag(self):
+        comment = self.post_comment()
+        url = reverse("questions-api:comments",
+                      kwargs={"pk": self.question.pk})
+        etag = self.client.get(url)["ETag"]
+        comment.comment_text = "an edited answer"
+        comment.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()["results"][0]["comment_text"],
+                         "an edited answer")
+
+    def test_list_if_modified_since_returns_304(self):
+        url = reverse("questions-api:list")
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_api_is_read_only(self):
+        response = self.client.post(reverse("questions-api:list"))
+        self.assertEqual(response.status_code, 405)
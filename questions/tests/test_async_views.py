@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from asgiref.sync import sync_to_async
+
+from questions.models import Comment
+from questions.views import AsyncQuestionDetailView, AsyncQuestionListView
+from .utils import create_question
+
+
+class AsyncQuestionViewsTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        for i in range(15):
+            create_question(question_text=f"Question number {i}",
+                            username=f"username {i}", is_published=True)
+        self.question = create_question(
+            question_text="Detail question", username="username",
+            is_published=True)
+        self.author = User.objects.get(username="username")
+        return super().setUp()
+
+    async def get(self, view, path="/", **kwargs):
+        request = self.factory.get(path)
+        response = await view.as_view()(request, **kwargs)
+        return await sync_to_async(response.render)()
+
+    async def test_async_list_serves_keyset_pages(self):
+        response = await self.get(AsyncQuestionListView)
+        page = response.context_data["page_obj"]
+
+        self.assertEqual(len(response.context_data["question_list"]), 10)
+        self.assertTrue(page.has_next())
+        self.assertIn("Detail question", response.content.decode("utf-8"))
+
+    async def test_async_list_supports_legacy_page_links(self):
+        response = await self.get(AsyncQuestionListView, "/?page=2")
+        self.assertEqual(len(response.context_data["question_list"]), 6)
+
+    async def test_async_list_invalid_page_raises_404(self):
+        with self.assertRaises(Http404):
+            await self.get(AsyncQuestionListView, "/?page=100")
+
+    async def test_async_detail_renders_comment_thread(self):
+        await Comment.objects.acreate(question=self.question,
+                                      author=self.author,
+                                      comment_text="async answer")
+        response = await self.get(AsyncQuestionDetailView,
+                                  pk=self.question.pk)
+
+        self.assertEqual(len(response.context_data["comment_page"]), 1)
+        self.assertIn("async answer", response.content.decode("utf-8"))
+
+    async def test_async_detail_skips_comments_when_unpublished(self):
+        draft = await sync_to_async(create_question)(username="username2")
+        response = await self.get(AsyncQuestionDetailView, pk=draft.pk)
+
+        self.assertNotIn("comment_page", response.context_data)
+        self.assertIn("Question not found", response.content.decode("utf-8"))
+
+    async def test_async_detail_raises_404_for_missing_question(self):
+        with self.assertRaises(Http404):
+            await self.get(AsyncQuestionDetailView, pk=1000)
+
+    async def test_async_detail_post_is_handled_by_sync_view(self):
+        request = RequestFactory().post("/", {"comment_text": "posted answer"})
+        request.user = self.author
+        request._dont_enforce_csrf_checks = True
+        response = await AsyncQuestionDetailView.as_view()(
+            request, pk=self.question.pk)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await Comment.objects.filter(
+            comment_text="posted answer").aexists())
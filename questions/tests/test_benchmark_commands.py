@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import F, Max
+from django.test import TestCase, override_settings
+
+from questions.models import Comment, Question
+
+
+class GenerateDatasetCommandTests(TestCase):
+    def generate(self, **options):
+        call_command("generate_dataset", stdout=StringIO(), seed=1,
+                     **options)
+
+    def test_generate_dataset_creates_requested_rows(self):
+        self.generate(users=5, questions=40, comments=300, batch_size=7)
+
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Question.objects.count(), 40)
+        self.assertEqual(Comment.objects.count(), 300)
+
+    def test_generate_dataset_skews_comments_per_question(self):
+        self.generate(users=5, questions=40, comments=400)
+        busiest = Question.objects.aggregate(top=Max("comment_count"))["top"]
+
+        self.assertGreater(busiest, 400 / 40 * 3)
+
+    def test_generate_dataset_spreads_comment_dates(self):
+        self.generate(users=5, questions=20, comments=200)
+
+        self.assertFalse(Comment.objects.filter(
+            pub_date__lt=F("question__pub_date")).exists())
+        self.assertGreater(
+            Comment.objects.values("pub_date").distinct().count(), 190)
+        for question in Question.objects.filter(comment_count__gt=0):
+            latest = question.comment.aggregate(latest=Max("pub_date"))
+            self.assertEqual(question.last_comment_at, latest["latest"])
+
+    def test_generate_dataset_can_run_twice(self):
+        self.generate(users=3, questions=2, comments=2)
+        self.generate(users=3, questions=2, comments=2)
+
+        self.assertEqual(User.objects.count(), 6)
+
+
+# The test runner also allows "testserver"; the benchmark clients must get
+# through with the hosts a real deployment allows.
+@override_settings(ALLOWED_HOSTS=["localhost"])
+class RunBenchmarkCommandTests(TestCase):
+    def setUp(self):
+        call_command("generate_dataset", stdout=StringIO(), seed=1,
+                     users=3, questions=10, comments=30)
+        return super().setUp()
+
+    def test_run_benchmark_writes_results_for_every_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_benchmark", stdout=StringIO(), requests=2,
+                         workers=1, warmup=0, output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        endpoints = results["endpoints"]
+        self.assertIn("questions:list", endpoints)
+        self.assertIn("questions:detail", endpoints)
+        self.assertIn("authors:register", endpoints)
+        self.assertNotIn("authors:logout", endpoints)
+        for row in endpoints.values():
+            self.assertEqual(row["requests"], 2)
+            self.assertEqual(row["errors"], 0)
+            self.assertIn("p99_ms", row)
+        self.assertGreater(endpoints["questions:list"]["queries_per_request"], 0)
+
+    def test_run_benchmark_through_asgi_handler(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_benchmark", stdout=StringIO(), requests=3,
+                         workers=2, warmup=0, asgi=True, output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["handler"], "asgi")
+        endpoints = results["endpoints"]
+        for row in endpoints.values():
+            self.assertEqual(row["requests"], 3)
+            self.assertEqual(row["errors"], 0)
+        self.assertGreater(endpoints["questions:list"]["queries_per_request"], 0)
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from config.checks import check_comment_thread_cache
+from questions import comment_cache
+from questions.models import Comment
+
+from .utils import create_question
+
+
+def comment_queries(queries):
+    return [q["sql"] for q in queries if '"questions_comment"' in q["sql"]]
+
+
+class CommentThreadCacheTests(TestCase):
+    def setUp(self):
+        override = override_settings(COMMENT_THREAD_CACHE_TIMEOUT=300)
+        override.enable()
+        self.addCleanup(override.disable)
+        caches[comment_cache.CACHE_ALIAS].clear()
+
+        self.question = create_question(is_published=True)
+        self.author = self.question.author
+        self.comment = Comment.objects.create(
+            question=self.question, author=self.author,
+            comment_text="first comment")
+        self.url = reverse("questions:detail",
+                           kwargs={"pk": self.question.pk})
+        self.client.login(username="username", password="password")
+        return super().setUp()
+
+    def get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, comment_queries(queries)
+
+    def test_cached_thread_skips_the_comment_query(self):
+        response, queries = self.get()
+        self.assertContains(response, "first comment")
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.get()
+        self.assertContains(response, "first comment")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertEqual(queries, [])
+
+    def test_posted_comment_bumps_the_version(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, data={"comment_text": "new comment"})
+
+        self.assertContains(self.get()[0], "new comment")
+
+    def test_edited_comment_bumps_the_version(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comment.comment_text = "edited comment"
+            self.comment.save()
+
+        response = self.get()[0]
+        self.assertContains(response, "edited comment")
+        self.assertNotContains(response, "first comment")
+
+    def test_deleted_comment_bumps_the_version(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comment.delete()
+
+        response = self.get()[0]
+        self.assertNotContains(response, "first comment")
+        self.assertContains(response, "Be the first one to write an answer!")
+
+    def test_other_questions_keep_their_thread(self):
+        other = create_question(is_published=True, username="other")
+        version = comment_cache.get_version(other.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(question=self.question, author=self.author,
+                                   comment_text="new comment")
+
+        self.assertEqual(comment_cache.get_version(other.pk), version)
+
+    def test_admin_comment_inline_bumps_the_version(self):
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="admin", password="password")
+        self.get()
+
+        now = timezone.localtime()
+        data = {
+            "author": self.author.pk,
+            "question_text": self.question.question_text,
+            "pub_date_0": now.strftime("%Y-%m-%d"),
+            "pub_date_1": now.strftime("%H:%M:%S"),
+            "is_published": "on",
+            "comment-TOTAL_FORMS": 2,
+            "comment-INITIAL_FORMS": 1,
+            "comment-0-id": self.comment.pk,
+            "comment-0-question": self.question.pk,
+            "comment-0-author": self.author.pk,
+            "comment-0-comment_text": "edited in the admin",
+            "comment-1-question": self.question.pk,
+            "comment-1-author": self.author.pk,
+            "comment-1-comment_text": "added in the admin",
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("admin:questions_question_change",
+                        args=[self.question.pk]), data)
+        self.assertEqual(response.status_code, 302)
+
+        response = self.get()[0]
+        self.assertContains(response, "edited in the admin")
+        self.assertContains(response, "added in the admin")
+
+    @override_settings(COMMENT_THREAD_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_the_cache(self):
+        self.get()
+        self.assertEqual(len(self.get()[1]), 1)
+
+
+class CommentThreadCacheCheckTests(SimpleTestCase):
+    def test_enabled_thread_cache_needs_a_shared_backend(self):
+        with self.settings(COMMENT_THREAD_CACHE_TIMEOUT=300):
+            warnings = check_comment_thread_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["config.W002"])
+
+        shared = {**settings.CACHES, "fragments": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379",
+        }}
+        with self.settings(COMMENT_THREAD_CACHE_TIMEOUT=300, CACHES=shared):
+            self.assertEqual(check_comment_thread_cache(None), [])
+
+    def test_disabled_thread_cache_is_not_checked(self):
+        with self.settings(COMMENT_THREAD_CACHE_TIMEOUT=0):
+            self.assertEqual(check_comment_thread_cache(None), [])
+
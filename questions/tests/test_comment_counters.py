@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from questions.models import Comment, Question
+from .utils import create_question
+
+
+class CommentCounterTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        self.author = User.objects.get(username="username")
+        return super().setUp()
+
+    def post_comment(self, text="commenttext"):
+        return self.client.post(
+            reverse("questions:detail", kwargs={"pk": self.question.pk}),
+            data={"comment_text": text})
+
+    def test_posting_a_comment_updates_the_counters(self):
+        self.client.login(username="username", password="password")
+        self.post_comment()
+        self.post_comment("another comment")
+        self.question.refresh_from_db()
+
+        latest = Comment.objects.latest("pub_date")
+        self.assertEqual(self.question.comment_count, 2)
+        self.assertEqual(self.question.last_comment_at, latest.pub_date)
+
+    def test_invalid_comment_does_not_update_the_counters(self):
+        self.client.login(username="username", password="password")
+        self.post_comment("no")
+        self.question.refresh_from_db()
+
+        self.assertEqual(self.question.comment_count, 0)
+        self.assertIsNone(self.question.last_comment_at)
+
+    def test_admin_inline_delete_updates_the_counters(self):
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="username", password="password")
+        self.post_comment("first comment")
+        self.post_comment("second comment")
+        first, second = Comment.objects.order_by("pub_date", "pk")
+        self.client.login(username="admin", password="password")
+
+        response = self.client.post(
+            reverse("admin:questions_question_change",
+                    args=[self.question.pk]),
+            data={
+                "author": self.author.pk,
+                "question_text": self.question.question_text,
+                "pub_date_0": "2022-12-01",
+                "pub_date_1": "10:00:00",
+                "is_published": "on",
+                "comment-TOTAL_FORMS": "2",
+                "comment-INITIAL_FORMS": "2",
+                "comment-0-id": second.pk,
+                "comment-0-question": self.question.pk,
+                "comment-0-author": self.author.pk,
+                "comment-0-comment_text": second.comment_text,
+                "comment-0-DELETE": "on",
+                "comment-1-id": first.pk,
+                "comment-1-question": self.question.pk,
+                "comment-1-author": self.author.pk,
+                "comment-1-comment_text": first.comment_text,
+            })
+        self.question.refresh_from_db()
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.question.comment_count, 1)
+        self.assertEqual(self.question.last_comment_at, first.pub_date)
+
+    def test_recount_comments_repairs_drift(self):
+        Comment.objects.bulk_create(
+            Comment(question=self.question, author=self.author,
+                    comment_text=f"comment {i}") for i in range(3))
+        other = create_question(username="username2")
+        Question.objects.filter(pk=other.pk).update(comment_count=7)
+
+        out = StringIO()
+        call_command("recount_comments", batch_size=1, stdout=out)
+        self.question.refresh_from_db()
+        other.refresh_from_db()
+
+        self.assertIn("Recounted comments for 2 questions.", out.getvalue())
+        self.assertEqual(self.question.comment_count, 3)
+        self.assertIsNotNone(self.question.last_comment_at)
+        self.assertEqual(other.comment_count, 0)
+        self.assertIsNone(other.last_comment_at)
+
+    def test_question_list_shows_answer_count(self):
+        Question.objects.filter(pk=self.question.pk).update(comment_count=2)
+        response = self.client.get(reverse("questions:list"))
+
+        self.assertContains(response, "2 answers")
@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.models import Comment
+from questions.views import CommentThreadMixin
+from .utils import create_question
+
+
+class CommentThreadTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        self.author = User.objects.get(username="username")
+        return super().setUp()
+
+    def create_comments(self, amount):
+        Comment.objects.bulk_create(
+            Comment(question=self.question, author=self.author,
+                    comment_text=f"comment number {i}")
+            for i in range(amount))
+
+    def test_detail_renders_only_the_newest_comments(self):
+        self.create_comments(CommentThreadMixin.comments_paginate_by + 5)
+        response = self.client.get(
+            reverse("questions:detail", kwargs={"pk": self.question.pk}))
+
+        self.assertEqual(len(response.context["comment_page"]),
+                         CommentThreadMixin.comments_paginate_by)
+        self.assertContains(response, "Load more answers")
+
+    def test_detail_query_count_does_not_grow_with_comments(self):
+        self.create_comments(3)
+        url = reverse("questions:detail", kwargs={"pk": self.question.pk})
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+
+        self.create_comments(15)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+    def test_load_more_returns_the_older_comments(self):
+        self.create_comments(CommentThreadMixin.comments_paginate_by + 5)
+        response = self.client.get(
+            reverse("questions:detail", kwargs={"pk": self.question.pk}))
+        cursor = response.context["comment_page"].next_cursor
+
+        response = self.client.get(
+            reverse("questions:comments", kwargs={"pk": self.question.pk}),
+            data={"cursor": cursor})
+
+        self.assertTemplateUsed(response, "questions/comment_thread.html")
+        self.assertEqual(len(response.context["comment_page"]), 5)
+        self.assertNotContains(response, "Load more answers")
+        self.assertNotContains(response, "<html")
+
+    def test_load_more_returns_404_for_unpublished_question(self):
+        question = create_question(username="username2")
+        response = self.client.get(
+            reverse("questions:comments", kwargs={"pk": question.pk}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_unpublished_question_does_not_query_comments(self):
+        question = create_question(username="username2")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                reverse("questions:detail", kwargs={"pk": question.pk}))
+
+        self.assertContains(response, "Question not found")
+        self.assertFalse(any("questions_comment" in q["sql"]
+                             for q in ctx.captured_queries))
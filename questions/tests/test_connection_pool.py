@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from config import pool_stats
+
+from .utils import create_question
+
+
+class PoolStatsTests(TestCase):
+    def setUp(self):
+        create_question(is_published=True)
+        pool_stats.reset()
+        return super().setUp()
+
+    def test_requests_on_a_kept_connection_count_as_reused(self):
+        self.client.get(reverse("questions:list"))
+        self.client.get(reverse("questions:list"))
+
+        counts = pool_stats.snapshot()["databases"]["default"]
+        self.assertEqual(counts["reused"], 2)
+        self.assertEqual(counts["opened"], 0)
+        self.assertEqual(counts["discarded"], 0)
+
+    def test_stats_are_staff_only(self):
+        url = reverse("pool-stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        User.objects.create_user(
+            username="staff", password="password", is_staff=True)
+        self.client.login(username="staff", password="password")
+        response = self.client.get(url)
+
+        self.assertEqual(response.json()["pid"], os.getpid())
+        self.assertIn("default", response.json()["databases"])
+
+
+class RunConnectionBenchmarkCommandTests(TestCase):
+    def setUp(self):
+        create_question(is_published=True)
+        return super().setUp()
+
+    def test_each_max_age_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_connection_benchmark", stdout=StringIO(),
+                         requests=3, workers=1, warmup=0,
+                         max_ages=[0, 60], output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["endpoint"], "questions:list")
+        self.assertEqual(set(results["conn_max_age"]), {"0", "60"})
+        for row in results["conn_max_age"].values():
+            self.assertEqual(row["requests"], 3)
+            self.assertEqual(row["errors"], 0)
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.export import iter_published_threads
+from questions.models import Comment, Question
+from .utils import create_question
+
+
+class QuestionExportTests(TestCase):
+    def setUp(self):
+        self.first = create_question("First question", is_published=True)
+        self.second = create_question("Second question", is_published=True,
+                                      username="username2")
+        create_question("Draft question", username="username3")
+        self.author = User.objects.get(username="username")
+        for i in range(3):
+            Comment.objects.create(question=self.first, author=self.author,
+                                   comment_text=f"first answer {i}")
+        Comment.objects.create(question=self.second, author=self.author,
+                               comment_text="second answer")
+        return super().setUp()
+
+    def login_staff(self):
+        User.objects.create_user(username="staff", password="password",
+                                 is_staff=True)
+        self.client.login(username="staff", password="password")
+
+    def test_threads_are_merged_in_two_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            threads = list(iter_published_threads(chunk_size=1))
+
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual([q["question_text"] for q, _ in threads],
+                         ["First question", "Second question"])
+        self.assertEqual([len(comments) for _, comments in threads], [3, 1])
+
+    def test_export_requires_staff(self):
+        response = self.client.get(reverse("questions:export"))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.login(username="username", password="password")
+        response = self.client.get(reverse("questions:export"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_streams_jsonl(self):
+        self.login_staff()
+        response = self.client.get(reverse("questions:export"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(records), 2)
+        self.assertEqual(len(records[0]["comments"]), 3)
+        self.assertNotIn("Draft question", "\n".join(lines))
+
+    def test_export_streams_csv(self):
+        self.login_staff()
+        response = self.client.get(reverse("questions:export"),
+                                   data={"format": "csv"})
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["question_text"], "First question")
+
+    def test_export_unknown_format_returns_404(self):
+        self.login_staff()
+        response = self.client.get(reverse("questions:export"),
+                                   data={"format": "xml"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_command_round_trips_through_import(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dump.csv")
+            call_command("export_questions", format="csv", output=path)
+            Question.objects.all().delete()
+            Comment.objects.all().delete()
+            call_command("import_questions", path, stdout=StringIO())
+
+        imported = Question.objects.get(question_text="First question")
+        self.assertEqual(imported.comment_count, 3)
+        self.assertEqual(Question.objects.count(), 2)
+
+    def test_export_command_writes_jsonl_to_stdout(self):
+        out = StringIO()
+        call_command("export_questions", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
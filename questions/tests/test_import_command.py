@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from questions.management.commands.import_questions import AuthorCache
+from questions.models import Comment, Question
+
+
+class ImportQuestionsCommandTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="username", password="password")
+        self.tmp = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        return super().tearDown()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def import_file(self, path, **options):
+        out = StringIO()
+        call_command("import_questions", path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_jsonl_with_nested_comments(self):
+        path = self.write("dump.jsonl", "\n".join(json.dumps(record) for record in [
+            {"author": "username", "question_text": "How do I import data?",
+             "pub_date": "2022-01-01T10:00:00Z", "is_published": True,
+             "comments": [
+                 {"author": "username", "comment_text": "With bulk_create",
+                  "pub_date": "2022-01-02T10:00:00Z"},
+                 {"author": "ghost", "comment_text": "Row by row",
+                  "pub_date": "2022-01-03T10:00:00Z"},
+             ]},
+            {"author": "username", "question_text": "A draft question here"},
+        ]))
+        out = self.import_file(path, batch_size=1)
+
+        question = Question.objects.get(question_text="How do I import data?")
+        self.assertIn("Imported 2 questions and 2 comments.", out)
+        self.assertIn("rows/s", out)
+        self.assertTrue(question.is_published)
+        self.assertEqual(question.author, self.author)
+        self.assertEqual(question.comment_count, 2)
+        self.assertEqual(question.last_comment_at.isoformat(),
+                         "2022-01-03T10:00:00+00:00")
+        self.assertIsNone(Comment.objects.get(comment_text="Row by row").author)
+        self.assertFalse(Question.objects.get(
+            question_text="A draft question here").is_published)
+
+    def test_imported_rows_are_searchable(self):
+        path = self.write("dump.jsonl", json.dumps({
+            "author": "username", "question_text": "Question about imports",
+            "is_published": True,
+            "comments": [{"author": "username", "comment_text": "zebra"}]}))
+        self.import_file(path)
+
+        response = self.client.get(reverse("questions:search"),
+                                   data={"q": "zebra"})
+        self.assertContains(response, "Question about imports")
+
+    def test_import_csv_groups_comments_by_question_ref(self):
+        path = self.write("dump.csv", (
+            "question_ref,author,question_text,pub_date,is_published,"
+            "comment_author,comment_text,comment_pub_date\n"
+            "1,username,First csv question,2022-01-01T10:00:00Z,true,"
+            "username,first answer,2022-01-02T10:00:00Z\n"
+            "1,username,First csv question,2022-01-01T10:00:00Z,true,"
+            "username,second answer,2022-01-03T10:00:00Z\n"
+            "2,username,Second csv question,,false,,,\n"))
+        self.import_file(path)
+
+        first = Question.objects.get(question_text="First csv question")
+        second = Question.objects.get(question_text="Second csv question")
+        self.assertEqual(first.comment_count, 2)
+        self.assertEqual(second.comment_count, 0)
+        self.assertEqual(Comment.objects.filter(question=first).count(), 2)
+
+    def test_invalid_line_reports_line_number(self):
+        path = self.write("dump.jsonl", '{"question_text": ""}\n')
+        with self.assertRaisesMessage(CommandError, "Line 1"):
+            self.import_file(path)
+
+    def test_jsonl_booleans_are_parsed(self):
+        path = self.write("dump.jsonl", "\n".join(json.dumps(record) for record in [
+            {"question_text": "Published?", "is_published": True},
+            {"question_text": "String false", "is_published": "false"},
+            {"question_text": "String zero", "is_published": "0"},
+            {"question_text": "String yes", "is_published": "yes"},
+        ]))
+
+        self.import_file(path)
+
+        published = dict(
+            Question.objects.values_list("question_text", "is_published"))
+        self.assertEqual(published, {
+            "Published?": True, "String false": False, "String zero": False,
+            "String yes": True})
+
+    def test_invalid_comment_reports_line_number(self):
+        for comment_text in ["", " ", "x" * 501]:
+            with self.subTest(comment_text=comment_text):
+                path = self.write("dump.jsonl", "\n" + json.dumps({
+                    "question_text": "A question",
+                    "comments": [{"comment_text": comment_text}],
+                }))
+                with self.assertRaisesMessage(
+                        CommandError, "Line 2: comment_text"):
+                    self.import_file(path)
+                self.assertFalse(Question.objects.exists())
+
+
+class AuthorCacheTests(TestCase):
+    def test_author_cache_is_bounded(self):
+        for i in range(5):
+            User.objects.create(username=f"user{i}")
+        cache = AuthorCache(max_size=2)
+
+        resolved = cache.resolve({f"user{i}" for i in range(5)})
+
+        self.assertEqual(len(resolved), 5)
+        self.assertEqual(len(cache.ids), 2)
+
+    def test_author_cache_skips_known_usernames(self):
+        User.objects.create(username="user0")
+        cache = AuthorCache(max_size=10)
+        cache.resolve({"user0"})
+
+        with self.assertNumQueries(0):
+            cache.resolve({"user0"})
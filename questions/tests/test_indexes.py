@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.models import Comment
+from .utils import create_question
+
+
+def query_plans(captured_queries, table):
+    plans = []
+    with connection.cursor() as cursor:
+        for query in captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or f'FROM "{table}"' not in sql:
+                continue
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans.append(" ".join(row[-1] for row in cursor.fetchall()))
+    return plans
+
+
+class AccessPathIndexTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        author = User.objects.get(username="username")
+        for i in range(12):
+            create_question(question_text=f"Question number {i}",
+                            username=f"username {i}", is_published=True)
+            Comment.objects.create(question=self.question, author=author,
+                                   comment_text=f"comment {i}")
+        return super().setUp()
+
+    def assertPlanUses(self, plans, index):
+        self.assertTrue(plans)
+        for plan in plans:
+            self.assertIn(index, plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_question_list_uses_published_date_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("questions:list"))
+        cursor = response.context["page_obj"].next_cursor
+        with CaptureQueriesContext(connection) as ctx2:
+            self.client.get(reverse("questions:list") + f"?cursor={cursor}")
+
+        plans = query_plans(ctx.captured_queries + ctx2.captured_queries,
+                            "questions_question")
+        self.assertPlanUses(plans, "question_published_date_idx")
+
+    def test_author_question_list_uses_author_draft_index(self):
+        self.client.login(username="username", password="password")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("questions:author-questions"))
+
+        plans = query_plans(ctx.captured_queries, "questions_question")
+        self.assertPlanUses(plans, "question_author_draft_idx")
+
+    def test_detail_comment_thread_uses_question_date_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(
+                reverse("questions:detail", kwargs={"pk": self.question.pk}))
+
+        plans = query_plans(ctx.captured_queries, "questions_comment")
+        self.assertPlanUses(plans, "comment_question_date_idx")
@@ -0,0 +1,94 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from questions.models import Question
+from questions.pagination import COUNT_CACHE_ALIAS
+from questions.views import AsyncQuestionListView
+
+from .utils import create_question
+
+
+class ListQueryBudgetTests(TestCase):
+    """
+    Every list page costs the same number of queries however many
+    questions it shows, and never reads more of the author than the
+    username.
+    """
+
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        self.author = self.question.author
+        for i in range(20):
+            author = User.objects.create_user(username=f"author{i}")
+            Question.objects.create(author=author, is_published=i % 2 == 0,
+                                    question_text=f"Question {i}")
+        Question.objects.create(author=None, is_published=True,
+                                question_text="Question without author")
+        for i in range(12):
+            Question.objects.create(author=self.author, is_published=False,
+                                    question_text=f"Draft {i}")
+        return super().setUp()
+
+    def assertQueryBudget(self, budget, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), budget,
+                         "\n".join(q["sql"] for q in queries))
+        for query in queries:
+            if '"questions_question"' in query["sql"]:
+                self.assertNotIn('"auth_user"."password"', query["sql"])
+        return response
+
+    def test_question_list(self):
+        response = self.assertQueryBudget(1, reverse("questions:list"))
+        self.assertContains(response, "author18")
+        self.assertContains(response, "Deleted User")
+
+    def test_question_list_legacy_page(self):
+        # Planner statistics, the count, then the page.
+        self.assertQueryBudget(3, reverse("questions:list") + "?page=1")
+
+    @override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=300)
+    def test_question_list_legacy_page_cached_count(self):
+        caches[COUNT_CACHE_ALIAS].clear()
+        self.client.get(reverse("questions:list") + "?page=1")
+        self.assertQueryBudget(1, reverse("questions:list") + "?page=2")
+
+    def test_question_list_next_page(self):
+        response = self.client.get(reverse("questions:list"))
+        cursor = response.context["page_obj"].next_cursor
+        self.assertQueryBudget(
+            1, reverse("questions:list") + f"?cursor={cursor}")
+
+    def test_async_question_list(self):
+        request = AsyncRequestFactory().get(reverse("questions:list"))
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(AsyncQuestionListView.as_view())(request)
+            response.render()
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"auth_user"."password"', queries[0]["sql"])
+        self.assertIn("author18", response.content.decode("utf-8"))
+
+    def test_search(self):
+        response = self.assertQueryBudget(
+            2, reverse("questions:search") + "?q=question")
+        self.assertContains(response, "author18")
+
+    def test_author_question_list(self):
+        self.client.login(username="username", password="password")
+        # Session and user, then the page of drafts.
+        response = self.assertQueryBudget(
+            3, reverse("questions:author-questions"))
+        self.assertContains(response, "Draft 11")
+
+    def test_author_question_list_anonymous(self):
+        response = self.assertQueryBudget(
+            0, reverse("questions:author-questions"))
+        self.assertContains(response, "You need to login first")
@@ -0,0 +1,139 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions import moderation
+from questions.models import ModerationJob, ModerationJobQuestion, Question
+from tasks.models import Task
+
+from .utils import create_question
+
+
+@override_settings(MODERATION_CHUNK_SIZE=5)
+class ModerationJobTests(TestCase):
+    @pytest.fixture(autouse=True)
+    def queue_tasks(self, settings):
+        settings.TASKS_ALWAYS_EAGER = False
+
+    def setUp(self):
+        self.author = create_question().author
+        for i in range(11):
+            Question.objects.create(author=self.author,
+                                    question_text=f"Question {i}")
+        return super().setUp()
+
+    def publish_all(self):
+        return moderation.start_job(Question.objects.all(), True)
+
+    def test_small_selections_are_applied_right_away(self):
+        job = moderation.start_job(Question.objects.all()[:5], True)
+
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual((job.processed, job.changed), (5, 5))
+        self.assertEqual(Question.objects.filter(is_published=True).count(), 5)
+
+    def test_large_selections_are_left_to_the_worker(self):
+        job = self.publish_all()
+
+        self.assertIsNone(job.finished_at)
+        self.assertEqual(job.total, 12)
+        self.assertFalse(Question.objects.filter(is_published=True).exists())
+        self.assertEqual(Task.objects.filter(
+            name="questions.tasks.run_moderation_chunk").count(), 1)
+
+        call_command("run_tasks", "--once", "--workers=1", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual((job.processed, job.changed), (12, 12))
+        self.assertFalse(Question.objects.filter(is_published=False).exists())
+        # One task per chunk.
+        self.assertEqual(Task.objects.filter(
+            name="questions.tasks.run_moderation_chunk",
+            status=Task.DONE).count(), 3)
+
+    def test_eager_tasks_apply_every_chunk(self):
+        with self.settings(TASKS_ALWAYS_EAGER=True):
+            job = self.publish_all()
+
+        job.refresh_from_db()
+        self.assertEqual((job.processed, job.changed), (12, 12))
+
+    def test_jobs_resume_after_the_last_committed_chunk(self):
+        job = self.publish_all()
+        first_chunk = list(Question.objects.order_by("pk").values_list(
+            "pk", flat=True)[:5])
+        moderation.run_chunk(job)
+        # The worker stopped; a new one reads the job from the database.
+        Question.objects.filter(
+            pk__in=first_chunk).update(is_published=False)
+
+        call_command("run_tasks", "--once", "--workers=1", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.processed, job.changed), (12, 12))
+        self.assertEqual(
+            Question.objects.filter(is_published=False).count(), 5)
+
+    def test_applied_ids_are_dropped_with_their_chunk(self):
+        job = self.publish_all()
+        remaining = ModerationJobQuestion.objects.filter(job=job)
+        self.assertEqual(remaining.count(), 12)
+
+        moderation.run_chunk(job)
+
+        self.assertEqual(sorted(remaining.values_list(
+            "question_id", flat=True)), list(Question.objects.order_by(
+                "pk").values_list("pk", flat=True)[5:]))
+
+    def test_only_the_selection_is_applied(self):
+        drafts = Question.objects.filter(question_text__endswith="1")
+        job = moderation.start_job(drafts, True)
+
+        self.assertEqual(job.total, 2)
+        self.assertEqual(
+            set(Question.objects.filter(is_published=True)), set(drafts))
+
+    def test_unchanged_rows_are_not_written_or_purged(self):
+        Question.objects.filter(pk__in=Question.objects.order_by("pk")
+                                .values("pk")[:3]).update(is_published=True)
+        with mock.patch("questions.moderation.page_cache"
+                        ".invalidate_on_commit") as invalidate:
+            moderation.run_job(self.publish_all())
+
+        self.assertEqual(invalidate.call_count, 3)
+        purged = [pk for call in invalidate.call_args_list
+                  for pk in call.args[0]]
+        self.assertEqual(sorted(purged), sorted(Question.objects.order_by(
+            "pk").values_list("pk", flat=True)[3:]))
+
+    def test_finished_jobs_are_not_run_again(self):
+        job = self.publish_all()
+        moderation.run_job(job)
+
+        self.assertFalse(moderation.run_chunk(job))
+        job.refresh_from_db()
+        self.assertEqual((job.processed, job.changed), (12, 12))
+
+    def test_admin_action_queues_large_selections(self):
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="admin", password="password")
+        response = self.client.post(
+            reverse("admin:questions_question_changelist"),
+            {"action": "make_published", "select_across": "1",
+             helpers.ACTION_CHECKBOX_NAME: [Question.objects.first().pk]},
+            follow=True)
+
+        job = ModerationJob.objects.get()
+        self.assertContains(response, "12 questions queued as")
+        self.assertEqual(job.created_by.username, "admin")
+
+        response = self.client.get(
+            reverse("admin:questions_moderationjob_changelist"))
+        self.assertContains(response, "0%")
@@ -0,0 +1,203 @@
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.admin import helpers
+from django.http import HttpResponse
+from django.conf import settings
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, override_settings,
+)
+from django.urls import resolve, reverse
+
+from config.checks import check_page_cache
+from questions import page_cache
+from questions.models import Comment, Question
+
+from .utils import create_question
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        override = override_settings(PAGE_CACHE_ENABLED=True,
+                                     PAGE_CACHE_MAX_AGE=30)
+        override.enable()
+        self.addCleanup(override.disable)
+        page_cache.clear()
+
+        self.question = create_question(is_published=True)
+        self.author = self.question.author
+        return super().setUp()
+
+    def create_questions(self, amount, is_published=True):
+        return [Question.objects.create(
+            author=self.author, question_text=f"Question {i}",
+            is_published=is_published) for i in range(amount)]
+
+    def get(self, url, client=None):
+        return (client or self.client).get(url)
+
+    def test_anonymous_pages_are_cached(self):
+        url = reverse("questions:detail", kwargs={"pk": self.question.pk})
+        first = self.get(url)
+        with self.assertNumQueries(0):
+            second = self.get(url)
+
+        self.assertEqual(first["X-Page-Cache"], "miss")
+        self.assertEqual(second["X-Page-Cache"], "hit")
+        self.assertEqual(first.content, second.content)
+        for response in (first, second):
+            self.assertIn("Cookie", response["Vary"])
+            self.assertEqual(response["Cache-Control"], "public, max-age=30")
+
+    def test_logged_in_pages_are_not_cached(self):
+        self.client.login(username="username", password="password")
+        url = reverse("questions:list")
+        self.get(url)
+        response = self.get(url)
+
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertIn("Cookie", response["Vary"])
+        self.assertEqual(response["Cache-Control"], "private")
+
+    def test_other_views_are_not_cached(self):
+        response = self.get(reverse("questions:search") + "?q=question")
+
+        self.assertNotIn("X-Page-Cache", response)
+        self.assertFalse(response.has_header("Cache-Control"))
+
+    def test_comment_purges_only_pages_showing_its_question(self):
+        older = self.question
+        newest = self.create_questions(10)[-1]
+        urls = {
+            "newest": reverse("questions:detail", kwargs={"pk": newest.pk}),
+            "older": reverse("questions:detail", kwargs={"pk": older.pk}),
+            "first page": reverse("questions:list") + "?page=1",
+            "second page": reverse("questions:list") + "?page=2",
+        }
+        for url in urls.values():
+            self.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(question=newest, author=self.author,
+                                   comment_text="new comment")
+
+        expected = {"newest": "miss", "older": "hit",
+                    "first page": "miss", "second page": "hit"}
+        for name, url in urls.items():
+            self.assertEqual(self.get(url)["X-Page-Cache"], expected[name],
+                             name)
+        self.assertContains(self.get(urls["newest"]), "new comment")
+
+    def test_new_drafts_do_not_purge_list_pages(self):
+        url = reverse("questions:list")
+        self.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_questions(1, is_published=False)
+
+        self.assertEqual(self.get(url)["X-Page-Cache"], "hit")
+
+    def test_admin_publish_actions_purge_pages(self):
+        draft = self.create_questions(1, is_published=False)[0]
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="admin", password="password")
+        anonymous = Client()
+        list_url = reverse("questions:list")
+        detail_url = reverse("questions:detail", kwargs={"pk": draft.pk})
+        self.get(list_url, anonymous)
+        self.get(detail_url, anonymous)
+
+        for action, is_published in (("make_published", True),
+                                     ("make_not_published", False)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse("admin:questions_question_changelist"),
+                    {"action": action,
+                     helpers.ACTION_CHECKBOX_NAME: [draft.pk]})
+
+            response = self.get(list_url, anonymous)
+            self.assertEqual(response["X-Page-Cache"], "miss")
+            if is_published:
+                self.assertContains(response, draft.question_text)
+            else:
+                self.assertNotContains(response, draft.question_text)
+            response = self.get(detail_url, anonymous)
+            self.assertEqual(response["X-Page-Cache"], "miss")
+
+    def test_pages_rendered_during_an_invalidation_are_not_stored(self):
+        request = RequestFactory().get(reverse("questions:list"))
+        request.resolver_match = resolve(request.path_info)
+
+        def get_response(request):
+            page_cache.invalidate(lists=True)
+            response = HttpResponse("page")
+            response.context_data = {"question_list": []}
+            return response
+
+        middleware = page_cache.PageCacheMiddleware(get_response)
+        middleware(request)
+
+        self.assertEqual(middleware(request)["X-Page-Cache"], "miss")
+
+    def test_concurrent_misses_render_the_page_once(self):
+        renders = []
+
+        def get_response(request):
+            renders.append(request)
+            time.sleep(0.2)
+            response = HttpResponse("page")
+            response.context_data = {"question_list": [self.question]}
+            return response
+
+        middleware = page_cache.PageCacheMiddleware(get_response)
+        responses = []
+
+        def request_page():
+            request = RequestFactory().get(reverse("questions:list"))
+            request.resolver_match = resolve(request.path_info)
+            responses.append(middleware(request))
+
+        threads = [threading.Thread(target=request_page) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(sorted(r["X-Page-Cache"] for r in responses),
+                         ["hit"] * 4 + ["miss"])
+
+    def test_async_requests_are_cached(self):
+        async def get_response(request):
+            response = HttpResponse("page")
+            response.context_data = {"question_list": [self.question]}
+            return response
+
+        middleware = page_cache.PageCacheMiddleware(get_response)
+        request = RequestFactory().get(reverse("questions:list"))
+        request.resolver_match = resolve(request.path_info)
+
+        self.assertEqual(async_to_sync(middleware)(request)["X-Page-Cache"],
+                         "miss")
+        self.assertEqual(async_to_sync(middleware)(request)["X-Page-Cache"],
+                         "hit")
+
+
+class PageCacheCheckTests(SimpleTestCase):
+    def test_enabled_page_cache_needs_a_shared_backend(self):
+        with self.settings(PAGE_CACHE_ENABLED=True):
+            warnings = check_page_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["config.W001"])
+
+        shared = {**settings.CACHES, "pages": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379",
+        }}
+        with self.settings(PAGE_CACHE_ENABLED=True, CACHES=shared):
+            self.assertEqual(check_page_cache(None), [])
+
+    def test_disabled_page_cache_is_not_checked(self):
+        with self.settings(PAGE_CACHE_ENABLED=False):
+            self.assertEqual(check_page_cache(None), [])
+
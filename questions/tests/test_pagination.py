@@ -1,6 +1,18 @@
-from django.test import TestCase
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from config.checks import check_count_cache
+from questions.models import Question
+from questions.pagination import (
+    COUNT_CACHE_ALIAS, CachedCountPaginator, estimate_count,
+)
+
 from .utils import create_question
 
 
@@ -25,3 +37,213 @@ class PaginationTest(TestCase):
         self.assertTrue("is_paginated" in response.context)
         self.assertTrue(response.context["is_paginated"] == True)
         self.assertEqual(len(response.context["question_list"]), 5)
+
+    def test_pagination_first_page_does_not_count_questions(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("questions:list"))
+
+        self.assertFalse(
+            any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(
+            any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+
+    def test_pagination_next_cursor_shows_remaining_questions(self):
+        response = self.client.get(reverse("questions:list"))
+        cursor = response.context["page_obj"].next_cursor
+        response = self.client.get(
+            reverse("questions:list") + f"?cursor={cursor}")
+
+        self.assertEqual(len(response.context["question_list"]), 5)
+        self.assertFalse(response.context["page_obj"].has_next())
+        self.assertTrue(response.context["page_obj"].has_previous())
+
+    def test_pagination_cursor_pages_do_not_overlap(self):
+        first = self.client.get(reverse("questions:list"))
+        cursor = first.context["page_obj"].next_cursor
+        second = self.client.get(
+            reverse("questions:list") + f"?cursor={cursor}")
+        previous = second.context["page_obj"].previous_cursor
+        back = self.client.get(
+            reverse("questions:list") + f"?cursor={previous}")
+
+        seen = list(first.context["question_list"]) + \
+            list(second.context["question_list"])
+        self.assertEqual(len(set(q.pk for q in seen)), 15)
+        self.assertEqual(list(back.context["question_list"]),
+                         list(first.context["question_list"]))
+
+    def test_pagination_last_cursor_shows_oldest_questions(self):
+        response = self.client.get(reverse("questions:list"))
+        last = response.context["paginator"].last_cursor
+        response = self.client.get(
+            reverse("questions:list") + f"?cursor={last}")
+
+        self.assertEqual(len(response.context["question_list"]), 10)
+        self.assertEqual(
+            response.context["question_list"][-1].question_text,
+            "Question number 0")
+        self.assertFalse(response.context["page_obj"].has_next())
+
+    def test_pagination_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("questions:list") + "?cursor=nope")
+        self.assertEqual(response.status_code, 404)
+
+
+def drop_statistics():
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM sqlite_stat1")
+
+
+@skipUnless(connection.vendor == "sqlite", "Reads sqlite_stat1.")
+class EstimatedCountTests(TestCase):
+    def setUp(self):
+        for i in range(15):
+            create_question(question_text=f"Question number {i}",
+                            username=f"username {i}", is_published=True)
+        return super().setUp()
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.addCleanup(drop_statistics)
+
+    def test_unfiltered_querysets_use_the_statistics(self):
+        self.analyze()
+        self.assertEqual(estimate_count(Question.objects.all()), 15)
+        self.assertIsNone(
+            estimate_count(Question.objects.filter(question_text="")))
+
+    def test_partial_index_conditions_use_the_index_statistics(self):
+        Question.objects.create(question_text="A draft")
+        self.analyze()
+        self.assertEqual(
+            estimate_count(Question.objects.filter(is_published=True)), 15)
+        self.assertEqual(estimate_count(
+            Question.objects.filter(is_published=False)), 1)
+        self.assertIsNone(estimate_count(Question.objects.filter(
+            is_published=True, question_text="")))
+
+    def test_large_estimates_replace_the_count_query(self):
+        self.analyze()
+        paginator = CachedCountPaginator(Question.objects.all(), 10)
+        with self.settings(PAGINATION_ESTIMATE_THRESHOLD=10), \
+                CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 15)
+        self.assertTrue(paginator.approximate)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
+    def test_small_or_missing_estimates_count_exactly(self):
+        self.assertEqual(
+            CachedCountPaginator(Question.objects.all(), 10).count, 15)
+        self.analyze()
+        Question.objects.filter(pk__in=list(
+            Question.objects.values_list("pk", flat=True)[:5])).delete()
+
+        self.assertEqual(
+            CachedCountPaginator(Question.objects.all(), 10).count, 10)
+
+
+class CachedCountTests(TestCase):
+    def setUp(self):
+        override = override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=300)
+        override.enable()
+        self.addCleanup(override.disable)
+        caches[COUNT_CACHE_ALIAS].clear()
+        self.author = create_question(is_published=True).author
+        for i in range(14):
+            Question.objects.create(author=self.author, is_published=True,
+                                    question_text=f"Question number {i}")
+        return super().setUp()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, sum("COUNT(" in q["sql"] for q in queries)
+
+    def test_counts_are_cached(self):
+        url = reverse("questions:list") + "?page=2"
+        response, counts = self.count_queries(url)
+        self.assertEqual(counts, 1)
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+
+        response, counts = self.count_queries(url)
+        self.assertEqual(counts, 0)
+        self.assertEqual(len(response.context["question_list"]), 5)
+        self.assertNotContains(response, "pages</span>")
+
+    def test_saving_a_question_invalidates_counts(self):
+        url = reverse("questions:list") + "?page=1"
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(6):
+                Question.objects.create(author=self.author, is_published=True,
+                                        question_text=f"New question {i}")
+
+        response, counts = self.count_queries(url)
+        self.assertEqual(counts, 1)
+        self.assertEqual(response.context["paginator"].num_pages, 3)
+
+    def test_pages_past_a_stale_count_show_the_last_known_page(self):
+        self.client.get(reverse("questions:list") + "?page=1")
+        # Added by another worker, whose invalidation this one doesn't see.
+        Question.objects.bulk_create(
+            Question(author=self.author, is_published=True,
+                     question_text=f"New question {i}") for i in range(6))
+
+        response = self.client.get(reverse("questions:list") + "?page=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["page_obj"].number, 2)
+
+        caches[COUNT_CACHE_ALIAS].clear()
+        response = self.client.get(reverse("questions:list") + "?page=4")
+        self.assertEqual(response.status_code, 404)
+
+    def test_filtered_lists_are_cached_separately(self):
+        published = CachedCountPaginator(
+            Question.objects.filter(is_published=True), 10)
+        drafts = CachedCountPaginator(
+            Question.objects.filter(is_published=False), 10)
+
+        self.assertEqual((published.count, drafts.count), (15, 0))
+        self.assertIsNotNone(published.count_key())
+        self.assertNotEqual(published.count_key(), drafts.count_key())
+
+    @skipUnless(connection.vendor == "sqlite", "Reads sqlite_stat1.")
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=10)
+    def test_large_lists_show_the_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            # The statistics are behind: 12 published questions.
+            cursor.execute(
+                "UPDATE sqlite_stat1 SET stat = '12 1 1' "
+                "WHERE idx = 'question_published_date_idx'")
+        self.addCleanup(drop_statistics)
+
+        response, counts = self.count_queries(
+            reverse("questions:list") + "?page=1")
+        self.assertEqual(counts, 0)
+        self.assertContains(response, "~2 pages")
+
+        # Pages past the estimate are still served.
+        response = self.client.get(reverse("questions:list") + "?page=2")
+        self.assertEqual(len(response.context["question_list"]), 5)
+        response = self.client.get(reverse("questions:list") + "?page=3")
+        self.assertEqual(len(response.context["question_list"]), 0)
+
+
+class CountCacheCheckTests(SimpleTestCase):
+    def test_enabled_count_cache_needs_a_shared_backend(self):
+        with self.settings(PAGINATION_COUNT_CACHE_TIMEOUT=300):
+            warnings = check_count_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["config.W003"])
+
+        shared = {**settings.CACHES, "counts": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379",
+        }}
+        with self.settings(PAGINATION_COUNT_CACHE_TIMEOUT=300, CACHES=shared):
+            self.assertEqual(check_count_cache(None), [])
+
+    def test_disabled_count_cache_is_not_checked(self):
+        with self.settings(PAGINATION_COUNT_CACHE_TIMEOUT=0):
+            self.assertEqual(check_count_cache(None), [])
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase
+
+from questions.pagination import WindowedPaginator
+
+# The page loop pagination.html used to run, kept here to benchmark against.
+LEGACY_PAGINATION = Template("""
+{% for page in page_obj.paginator.page_range %}
+    {% if page_obj.number == page %}
+        <a href="?page={{ page }}">{{ page }}</a>
+    {% elif page > page_obj.number|add:'-3' and page < page_obj.number|add:'3' %}
+        <a href="?page={{ page }}">{{ page }}</a>
+    {% endif %}
+{% endfor %}
+""")
+
+
+def render_pagination(page):
+    return render_to_string("questions/pagination.html", {
+        "is_paginated": True,
+        "paginator": page.paginator,
+        "page_obj": page,
+    })
+
+
+class PaginationWindowTests(SimpleTestCase):
+    def test_window_has_neighbours_and_ends(self):
+        page = WindowedPaginator(range(500), 10).page(25)
+        self.assertEqual(page.window, [1, None, 23, 24, 25, 26, 27, None, 50])
+
+    def test_window_is_not_elided_for_few_pages(self):
+        page = WindowedPaginator(range(30), 10).page(2)
+        self.assertEqual(page.window, [1, 2, 3])
+
+    def test_template_renders_window_links(self):
+        html = render_pagination(WindowedPaginator(range(500), 10).page(25))
+
+        self.assertIn('href="?page=1"', html)
+        self.assertIn('href="?page=27"', html)
+        self.assertIn('href="?page=50"', html)
+        self.assertNotIn('href="?page=28"', html)
+        self.assertIn("&hellip;", html)
+
+
+@pytest.mark.slow
+class PaginationWindowBenchmark(SimpleTestCase):
+    def time_render(self, render, num_pages, repeat=5):
+        page = WindowedPaginator(range(num_pages * 10), 10).page(num_pages // 2)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            render(page)
+        return (time.perf_counter() - start) / repeat
+
+    def test_render_cost_does_not_grow_with_page_count(self):
+        def legacy(page):
+            return LEGACY_PAGINATION.render(Context({"page_obj": page}))
+
+        results = {}
+        for num_pages in (10, 1_000, 50_000):
+            results[num_pages] = (
+                self.time_render(legacy, num_pages),
+                self.time_render(render_pagination, num_pages),
+            )
+
+        timings = "; ".join(
+            f"{num_pages} pages: legacy {legacy * 1000:.2f}ms, "
+            f"window {window * 1000:.2f}ms"
+            for num_pages, (legacy, window) in results.items())
+        legacy_large, window_large = results[50_000]
+        _, window_small = results[10]
+        self.assertLess(window_large, legacy_large / 100, timings)
+        self.assertLess(window_large, window_small * 10, timings)
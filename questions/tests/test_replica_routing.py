@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.db import router
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from config.middleware import REPLICA_PIN_COOKIE
+from config.routers import PrimaryReplicaRouter, RoutingState, routing_state
+from questions.models import Comment, Question
+
+from .utils import create_question
+
+
+# The test database stands in for the replica; random.choice is patched so
+# the tests can tell when a read was sent to a replica.
+@override_settings(REPLICA_DATABASES=["default"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=True)
+        patcher = mock.patch("config.routers.random.choice",
+                             return_value="default")
+        self.choice = patcher.start()
+        self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def test_public_reads_use_a_replica(self):
+        for url in (reverse("questions:list"),
+                    reverse("questions:detail",
+                            kwargs={"pk": self.question.pk}),
+                    reverse("questions-api:list")):
+            self.choice.reset_mock()
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(self.choice.called, url)
+
+    def test_author_views_read_from_the_primary(self):
+        self.client.login(username="username", password="password")
+        self.client.get(reverse("questions:author-questions"))
+        self.client.get(reverse("questions:update",
+                                kwargs={"pk": self.question.pk}))
+
+        self.assertFalse(self.choice.called)
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas_configured(self):
+        response = self.client.get(reverse("questions:list"))
+
+        self.assertFalse(self.choice.called)
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_writing_pins_the_client_to_the_primary(self):
+        self.client.login(username="username", password="password")
+        url = reverse("questions:detail", kwargs={"pk": self.question.pk})
+        response = self.client.post(url, data={"comment_text": "commenttext"})
+
+        cookie = response.cookies[REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 5)
+        self.assertTrue(cookie["httponly"])
+
+        self.choice.reset_mock()
+        response = self.client.get(url)
+        self.assertContains(response, "commenttext")
+        self.assertFalse(self.choice.called)
+
+    def test_reads_without_writes_do_not_pin(self):
+        response = self.client.get(reverse("questions:list"))
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+
+@override_settings(REPLICA_DATABASES=["replica1", "replica2"])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.state = RoutingState()
+        token = routing_state.set(self.state)
+        self.addCleanup(routing_state.reset, token)
+        return super().setUp()
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(router.db_for_read(Question), "default")
+
+    def test_only_questions_and_comments_are_replicated(self):
+        self.state.use_replica = True
+        replica_router = PrimaryReplicaRouter()
+
+        self.assertIn(replica_router.db_for_read(Question),
+                      ["replica1", "replica2"])
+        self.assertIn(replica_router.db_for_read(Comment),
+                      ["replica1", "replica2"])
+        self.assertIsNone(replica_router.db_for_read(
+            Question._meta.get_field("author").related_model))
+
+    def test_writes_go_to_the_primary_and_stop_replica_reads(self):
+        self.state.use_replica = True
+        replica_router = PrimaryReplicaRouter()
+
+        self.assertEqual(replica_router.db_for_write(Comment), "default")
+        self.assertTrue(self.state.wrote)
+        self.assertIsNone(replica_router.db_for_read(Question))
+
+    def test_replicas_are_not_migrated(self):
+        replica_router = PrimaryReplicaRouter()
+
+        self.assertFalse(replica_router.allow_migrate("replica1", "questions"))
+        self.assertIsNone(replica_router.allow_migrate("default", "questions"))
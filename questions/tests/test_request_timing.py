@@ -0,0 +1,52 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .utils import create_question
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+class RequestTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        create_question(is_published=True)
+        return super().setUp()
+
+    def server_timing(self, response):
+        metrics = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, value = metric.split(";")
+            metrics[name] = value.split("=")[1].strip('"')
+        return metrics
+
+    def test_server_timing_header_reports_queries_and_durations(self):
+        response = self.client.get(reverse("questions:list"))
+        metrics = self.server_timing(response)
+
+        self.assertEqual(set(metrics),
+                         {"db", "tpl", "view", "total", "queries"})
+        self.assertGreater(int(metrics["queries"]), 0)
+        self.assertGreater(float(metrics["tpl"]), 0)
+        self.assertAlmostEqual(
+            float(metrics["db"]) + float(metrics["tpl"])
+            + float(metrics["view"]), float(metrics["total"]), delta=0.05)
+
+    def test_timing_is_logged_as_json(self):
+        with self.assertLogs("request_timing", level="INFO") as logs:
+            self.client.get(reverse("questions:detail", kwargs={"pk": 1}))
+        record = json.loads(logs.records[0].getMessage())
+
+        self.assertEqual(record["view"], "questions:detail")
+        self.assertEqual(record["status"], 200)
+        self.assertIn("db_ms", record)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_instrumented(self):
+        response = self.client.get(reverse("questions:list"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        with self.assertLogs("request_timing", level="INFO"):
+            response = self.client.get(reverse("questions:list"))
+        self.assertNotIn("Server-Timing", response)
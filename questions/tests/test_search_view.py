@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from questions.models import Comment, Question
+from questions.search import SEARCH_TABLE
+from .utils import create_question
+
+
+class QuestionSearchViewTests(TestCase):
+    def setUp(self):
+        self.question = create_question(
+            question_text="How do I cook brown rice?", is_published=True)
+        self.author = User.objects.get(username="username")
+        return super().setUp()
+
+    def search(self, query, **params):
+        return self.client.get(reverse("questions:search"),
+                               data={"q": query, **params})
+
+    def test_search_is_using_correct_template(self):
+        response = self.client.get(reverse("questions:search"))
+        self.assertTemplateUsed(response, "questions/question_search.html")
+        self.assertEqual(response.status_code, 200)
+
+    def test_search_finds_question_text(self):
+        response = self.search("cooking rice")
+        self.assertEqual(list(response.context["search_page"]),
+                         [self.question])
+
+    def test_search_finds_comment_text(self):
+        Comment.objects.create(question=self.question, author=self.author,
+                               comment_text="Use a pressure cooker")
+        response = self.search("pressure")
+        self.assertContains(response, "How do I cook brown rice?")
+
+    def test_search_does_not_show_unpublished_questions(self):
+        create_question(question_text="A secret about rice",
+                        username="username2")
+        response = self.search("secret")
+        self.assertContains(response, "No questions to show")
+
+    def test_search_follows_question_updates(self):
+        self.question.question_text = "How do I bake bread at home?"
+        self.question.save()
+
+        self.assertContains(self.search("bread"), "bake bread")
+        self.assertContains(self.search("rice"), "No questions to show")
+
+    def test_search_forgets_deleted_comments(self):
+        comment = Comment.objects.create(
+            question=self.question, author=self.author,
+            comment_text="Use a pressure cooker")
+        comment.delete()
+
+        self.assertContains(self.search("pressure"), "No questions to show")
+
+    def test_search_ignores_query_syntax(self):
+        response = self.search('"rice* -(')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "How do I cook brown rice?")
+
+    def test_search_results_are_keyset_paginated(self):
+        for i in range(12):
+            create_question(question_text=f"Rice question number {i}",
+                            username=f"username {i}", is_published=True)
+        first = self.search("rice")
+        cursor = first.context["search_page"].next_cursor
+        second = self.search("rice", cursor=cursor)
+
+        seen = list(first.context["search_page"]) + \
+            list(second.context["search_page"])
+        self.assertEqual(len(first.context["search_page"]), 10)
+        self.assertEqual(len(set(q.pk for q in seen)), 13)
+        self.assertFalse(second.context["search_page"].has_next())
+
+    @override_settings(SEARCH_CANDIDATES=12)
+    def test_search_ranks_only_the_newest_candidates(self):
+        newest = [
+            create_question(question_text=f"Rice question number {i}",
+                            username=f"username {i}", is_published=True)
+            for i in range(12)
+        ]
+        first = self.search("rice")
+        cursor = first.context["search_page"].next_cursor
+        second = self.search("rice", cursor=cursor)
+
+        seen = list(first.context["search_page"]) + \
+            list(second.context["search_page"])
+        # The oldest match is past the candidates.
+        self.assertEqual(set(seen), set(newest))
+        self.assertFalse(second.context["search_page"].has_next())
+
+    def test_search_invalid_cursor_returns_404(self):
+        response = self.search("rice", cursor="nope")
+        self.assertEqual(response.status_code, 404)
+
+    def test_rebuild_search_index_indexes_existing_rows(self):
+        Comment.objects.create(question=self.question, author=self.author,
+                               comment_text="Use a pressure cooker")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        self.assertContains(self.search("rice"), "No questions to show")
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Indexed 2 documents", out.getvalue())
+        self.assertContains(self.search("pressure"), "brown rice")
+        self.assertEqual(Question.objects.count(), 1)
+
+
+class RunSearchBenchmarkCommandTests(TestCase):
+    def test_first_and_next_pages_are_timed(self):
+        for i in range(12):
+            create_question(question_text=f"Rice question number {i}",
+                            username=f"username {i}", is_published=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_search_benchmark", stdout=StringIO(),
+                         queries=["rice", "bread"], repeat=2, output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["documents"], 12)
+        rice = results["queries"]["rice"]
+        self.assertEqual(rice["first page"]["requests"], 2)
+        self.assertEqual(rice["first page"]["results"], 10)
+        self.assertEqual(rice["next page"]["results"], 2)
+        self.assertEqual(list(results["queries"]["bread"]), ["first page"])
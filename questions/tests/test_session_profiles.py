@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .utils import create_question
+
+
+def session_queries(queries):
+    return [q["sql"] for q in queries if "django_session" in q["sql"]]
+
+
+def profile(name):
+    engine, message_storage = settings.SESSION_PROFILES[name]
+    return override_settings(SESSION_ENGINE=engine,
+                             MESSAGE_STORAGE=message_storage)
+
+
+class SessionProfileTests(TestCase):
+    def setUp(self):
+        self.question = create_question(is_published=False)
+        return super().setUp()
+
+    def test_anonymous_list_does_not_touch_the_session_table(self):
+        for name in settings.SESSION_PROFILES:
+            with self.subTest(profile=name), profile(name), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("questions:list"))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(session_queries(queries), [])
+
+    @profile("signed_cookies")
+    def test_signed_cookie_profile_keeps_sessions_and_messages_off_the_db(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.login(username="username", password="password")
+            self.client.post(reverse("questions:delete",
+                                     kwargs={"pk": self.question.pk}))
+            response = self.client.get(reverse("questions:author-questions"))
+
+        self.assertEqual(session_queries(queries), [])
+        self.assertContains(response, "Your question was successfully deleted!")
+
+    @profile("cached_db")
+    def test_cached_db_profile_reads_sessions_from_the_cache(self):
+        self.client.login(username="username", password="password")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("questions:author-questions"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session_queries(queries), [])
+
+
+class RunSessionBenchmarkCommandTests(TestCase):
+    def test_each_profile_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_session_benchmark", stdout=StringIO(),
+                         output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        profiles = results["profiles"]
+        self.assertEqual(set(profiles), set(settings.SESSION_PROFILES))
+        self.assertEqual(profiles["signed_cookies"]
+                         ["session_queries_per_request"], 0)
+        self.assertGreater(profiles["db"]["session_queries_per_request"], 0)
+        for row in profiles.values():
+            self.assertEqual(
+                [step["status"] for step in row["steps"]],
+                [200, 302, 200, 302, 200, 302, 200])
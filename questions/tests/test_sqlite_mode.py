@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from config.sqlite import run_with_lock_retry
+from questions.models import Comment
+
+from .utils import create_question
+
+TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 1048576,
+    "cache_size": -2000,
+    "busy_timeout": 2500,
+}
+
+
+class SQLitePragmaTests(TestCase):
+    def open_connection(self, path):
+        settings_dict = {**connections.settings["default"], "NAME": path}
+        connection = DatabaseWrapper(settings_dict, alias="pragma_test")
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=TUNED_PRAGMAS)
+    def test_pragmas_are_applied_to_new_connections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            connection = self.open_connection(os.path.join(tmp, "db.sqlite3"))
+
+            self.assertEqual(self.pragma(connection, "journal_mode"), "wal")
+            self.assertEqual(self.pragma(connection, "synchronous"), 1)
+            self.assertEqual(self.pragma(connection, "cache_size"), -2000)
+            self.assertEqual(self.pragma(connection, "busy_timeout"), 2500)
+            connection.close()
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_default_mode_leaves_connections_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            connection = self.open_connection(os.path.join(tmp, "db.sqlite3"))
+
+            self.assertEqual(self.pragma(connection, "journal_mode"), "delete")
+            connection.close()
+
+
+@override_settings(SQLITE_LOCK_RETRIES=3, SQLITE_LOCK_RETRY_DELAY=0.01)
+@mock.patch("config.sqlite.time.sleep")
+class LockRetryTests(SimpleTestCase):
+    def test_lock_errors_are_retried(self, sleep):
+        func = mock.Mock(side_effect=[
+            OperationalError("database is locked"),
+            OperationalError("database is locked"),
+            "saved",
+        ])
+
+        self.assertEqual(run_with_lock_retry(func), "saved")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+        # Full jitter: each delay is at most base * 2 ** attempt.
+        for attempt, call in enumerate(sleep.call_args_list):
+            self.assertLessEqual(call.args[0], 0.01 * 2 ** attempt)
+
+    def test_gives_up_after_the_configured_retries(self, sleep):
+        func = mock.Mock(side_effect=OperationalError("database is locked"))
+
+        with self.assertRaises(OperationalError):
+            run_with_lock_retry(func)
+        self.assertEqual(func.call_count, 4)
+
+    def test_other_errors_are_not_retried(self, sleep):
+        func = mock.Mock(side_effect=OperationalError("no such table: x"))
+
+        with self.assertRaises(OperationalError):
+            run_with_lock_retry(func)
+        self.assertEqual(func.call_count, 1)
+        sleep.assert_not_called()
+
+
+@override_settings(SQLITE_LOCK_RETRY_DELAY=0)
+class CommentPostLockRetryTests(TestCase):
+    def test_locked_comment_post_is_retried(self):
+        question = create_question(is_published=True)
+        self.client.login(username="username", password="password")
+        save = Comment.save
+        calls = []
+
+        def locked_once(comment, *args, **kwargs):
+            calls.append(comment)
+            if len(calls) == 1:
+                raise OperationalError("database is locked")
+            return save(comment, *args, **kwargs)
+
+        with mock.patch.object(Comment, "save", locked_once):
+            response = self.client.post(
+                reverse("questions:detail", kwargs={"pk": question.pk}),
+                data={"comment_text": "commenttext"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(calls), 2)
+        question.refresh_from_db()
+        self.assertEqual(question.comment_count, 1)
+
+
+class RunWriteBenchmarkCommandTests(TestCase):
+    def test_comments_are_posted_for_each_mode(self):
+        question = create_question(is_published=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            call_command("run_write_benchmark", stdout=StringIO(),
+                         comments=3, writers=1, modes=["current", "tuned"],
+                         output=path)
+            with open(path) as f:
+                results = json.load(f)
+
+        self.assertEqual(set(results["modes"]), {"current", "tuned"})
+        for row in results["modes"].values():
+            self.assertEqual(row["requests"], 3)
+            self.assertEqual(row["errors"], 0)
+        question.refresh_from_db()
+        self.assertEqual(question.comment_count, 6)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite journal modes.")
+    def test_journal_mode_is_restored(self):
+        create_question(is_published=True)
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            before = cursor.fetchone()[0]
+
+        out = StringIO()
+        call_command("run_write_benchmark", stdout=out, comments=1,
+                     writers=1, modes=["baseline", "tuned"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], before)
+        self.assertIn(f"Journal mode restored to {before}.", out.getvalue())
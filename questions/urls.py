@@ -1,19 +1,32 @@
+from django.conf import settings
 from django.urls import path
 
-from . views import (AuthorQuestionListView, QuestionCreateView, QuestionDeleteView,
-                     QuestionDetailView, QuestionListView, QuestionUpdateView)
+from . views import (AsyncQuestionDetailView, AsyncQuestionListView,
+                     AuthorQuestionListView, QuestionCommentsView,
+                     QuestionCreateView, QuestionDeleteView,
+                     QuestionDetailView, QuestionExportView, QuestionListView,
+                     QuestionSearchView, QuestionUpdateView)
 
 app_name = "questions"
 
+if settings.ASYNC_READ_VIEWS:
+    list_view, detail_view = AsyncQuestionListView, AsyncQuestionDetailView
+else:
+    list_view, detail_view = QuestionListView, QuestionDetailView
+
 urlpatterns = [
     path("question/your-questions/", AuthorQuestionListView.as_view(),
          name="author-questions"),
-    path("question/<int:pk>/detail/", QuestionDetailView.as_view(),
+    path("question/<int:pk>/detail/", detail_view.as_view(),
          name="detail"),
+    path("question/<int:pk>/comments/", QuestionCommentsView.as_view(),
+         name="comments"),
     path("question/<int:pk>/update/", QuestionUpdateView.as_view(),
          name="update"),
     path("question/<int:pk>/delete/", QuestionDeleteView.as_view(),
          name="delete"),
     path("question/create/", QuestionCreateView.as_view(), name="create"),
-    path("", QuestionListView.as_view(), name="list"),
+    path("search/", QuestionSearchView.as_view(), name="search"),
+    path("question/export/", QuestionExportView.as_view(), name="export"),
+    path("", list_view.as_view(), name="list"),
 ]
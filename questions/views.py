@@ -1,36 +1,83 @@
 from django.views.generic import (
-    CreateView, DetailView, ListView, UpdateView, DeleteView,
+    CreateView, DetailView, ListView, TemplateView, UpdateView, DeleteView,
+    View,
 )
 from django.views.generic.edit import FormMixin
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import router, transaction
+from django.http import Http404, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils.functional import SimpleLazyObject
+from asgiref.sync import sync_to_async
 
+from config.sqlite import run_with_lock_retry
+from tasks.queue import enqueue
+
+from . import comment_cache, tasks
+from .export import FORMATS, iter_published_threads
 from .models import Question
 from . forms import CommentForm, QuestionForm
+from .pagination import (
+    CachedCountPaginator, InvalidCursor, KeysetPaginationMixin,
+    KeysetPaginator, WindowedPage,
+)
+from .search import search_questions
 
 # Create your views here.
 
 
-class QuestionListView(ListView):
+class QuestionListView(KeysetPaginationMixin, ListView):
     model = Question
     context_object_name = "question_list"
     template_name = "questions/question_list.html"
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        qs = Question.objects.filter(is_published=True)
-        return qs
+        return Question.objects.filter(is_published=True).for_listing()
+
+
+class CommentThreadMixin:
+    comments_paginate_by = 20
+
+    def get_comment_paginator(self, question):
+        comments = question.comment.select_related("author")
+        return KeysetPaginator(comments, self.comments_paginate_by)
+
+    def get_comment_page(self, question, cursor=None):
+        try:
+            return self.get_comment_paginator(question).page(cursor)
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
 
+    def get_thread_context(self, question):
+        # Both are looked up while rendering, so the comments are only
+        # queried when the cached thread is missing or stale.
+        return {
+            "comment_page": SimpleLazyObject(
+                lambda: self.get_comment_page(question)),
+            "comment_thread_version": SimpleLazyObject(
+                lambda: comment_cache.get_version(question.pk)),
+            "comment_thread_timeout": settings.COMMENT_THREAD_CACHE_TIMEOUT,
+        }
 
-class QuestionDetailView(DetailView, FormMixin):
+
+class QuestionDetailView(CommentThreadMixin, DetailView, FormMixin):
     model = Question
     context_object_name = "question"
     template_name = "questions/question_detail.html"
     form_class = CommentForm
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.object.is_published:
+            context.update(self.get_thread_context(self.object))
+        return context
+
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
         form = self.get_form()
@@ -44,14 +91,77 @@ class QuestionDetailView(DetailView, FormMixin):
         new_comment = form.save(commit=False)
         form.instance.question = self.object
         form.instance.author = self.request.user
-        new_comment.save()
 
+        @transaction.atomic
+        def save():
+            new_comment.save()
+            Question.objects.filter(pk=self.object.pk).comment_added(
+                new_comment.pub_date)
+            # The increment keeps counts (and the API's ETags) current; a
+            # worker recounts from the rows to repair any drift.
+            enqueue(tasks.refresh_comment_stats, question_id=self.object.pk)
+
+        run_with_lock_retry(save)
         return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy("questions:detail", kwargs={"pk": self.object.pk})
 
 
+class QuestionCommentsView(CommentThreadMixin, DetailView):
+    model = Question
+    context_object_name = "question"
+    template_name = "questions/comment_thread.html"
+
+    def get_queryset(self):
+        return Question.objects.filter(is_published=True)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comment_page"] = self.get_comment_page(
+            self.object, self.request.GET.get("cursor"))
+        return context
+
+
+class QuestionSearchView(TemplateView):
+    template_name = "questions/question_search.html"
+    paginate_by = 10
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        context["query"] = query
+
+        if query:
+            try:
+                context["search_page"] = search_questions(
+                    query, self.paginate_by, self.request.GET.get("cursor"),
+                    using=router.db_for_read(Question))
+            except InvalidCursor:
+                raise Http404("Invalid cursor.")
+        return context
+
+
+class QuestionExportView(LoginRequiredMixin, UserPassesTestMixin, View):
+    chunk_size = 2000
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get("format", "jsonl")
+        if file_format not in FORMATS:
+            raise Http404("Unknown export format.")
+
+        lines, content_type = FORMATS[file_format]
+        response = StreamingHttpResponse(
+            lines(iter_published_threads(self.chunk_size)),
+            content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="questions.{file_format}"')
+        return response
+
+
 class QuestionCreateView(CreateView):
     model = Question
     template_name = "questions/question_create.html"
@@ -61,7 +171,7 @@ class QuestionCreateView(CreateView):
     def form_valid(self, form):
         new_question = form.save(commit=False)
         form.instance.author = self.request.user
-        new_question.save()
+        run_with_lock_retry(transaction.atomic(new_question.save))
 
         return super().form_valid(form)
 
@@ -78,7 +188,7 @@ class QuestionUpdateView(LoginRequiredMixin, UpdateView):
     def form_valid(self, form):
         new_question = form.save(commit=False)
         form.instance.author = self.request.user
-        new_question.save()
+        run_with_lock_retry(transaction.atomic(new_question.save))
 
         return super().form_valid(form)
 
@@ -96,14 +206,91 @@ class QuestionDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
         return reverse_lazy("questions:author-questions")
 
 
-class AuthorQuestionListView(ListView):
+class AuthorQuestionListView(KeysetPaginationMixin, ListView):
     model = Question
     context_object_name = "question_list"
     template_name = "questions/author_question_list.html"
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        qs = Question.objects.filter(
-            author=self.request.user.id, is_published=False)
-        return qs
+        if not self.request.user.is_authenticated:
+            # The template only asks anonymous users to log in.
+            return Question.objects.none()
+        return Question.objects.filter(
+            author=self.request.user.id, is_published=False,
+        ).only("question_text", "pub_date")
+
+
+class AsyncQuestionListView(View):
+    """
+    QuestionListView served with the async ORM, for ASGI deployments.
+    """
+    template_name = "questions/question_list.html"
+    paginate_by = 10
+
+    def get_queryset(self):
+        return Question.objects.filter(is_published=True).for_listing()
+
+    async def paginate_legacy(self, queryset, number):
+        paginator = CachedCountPaginator(queryset, self.paginate_by)
+        await sync_to_async(lambda: paginator.count)()
+        try:
+            number = paginator.validate_number(number)
+        except InvalidPage:
+            raise Http404("Invalid page.")
+
+        bottom = (number - 1) * self.paginate_by
+        rows = [question async for question in
+                queryset.order_by("-pub_date", "-pk")[
+                    bottom:bottom + self.paginate_by]]
+        return paginator, WindowedPage(rows, number, paginator)
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if "page" in request.GET:
+            paginator, page = await self.paginate_legacy(
+                queryset, request.GET["page"])
+        else:
+            paginator = KeysetPaginator(queryset, self.paginate_by)
+            try:
+                page = await paginator.apage(request.GET.get("cursor"))
+            except InvalidCursor:
+                raise Http404("Invalid cursor.")
+
+        return TemplateResponse(request, self.template_name, {
+            "view": self,
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+            "question_list": page.object_list,
+        })
+
+
+class AsyncQuestionDetailView(CommentThreadMixin, View):
+    """
+    QuestionDetailView GETs served with the async ORM. Comment posts are
+    handed to the synchronous view.
+    """
+    template_name = "questions/question_detail.html"
+
+    async def get(self, request, pk, *args, **kwargs):
+        try:
+            question = await Question.objects.select_related(
+                "author").aget(pk=pk)
+        except Question.DoesNotExist:
+            raise Http404("Question not found.")
+
+        context = {
+            "view": self,
+            "object": question,
+            "question": question,
+            "form": CommentForm(),
+        }
+        if question.is_published:
+            context.update(self.get_thread_context(question))
+        return TemplateResponse(request, self.template_name, context)
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(QuestionDetailView.as_view())(
+            request, *args, **kwargs)
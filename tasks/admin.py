@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "attempts", "run_after",
+                    "wait_time", "run_time", "finished_at")
+    list_filter = ("status", "name")
+    fields = readonly_fields = ("name", "kwargs", "idempotency_key", "status",
+                                "attempts", "max_attempts", "run_after",
+                                "locked_until", "last_error", "created_at",
+                                "finished_at", "wait_time", "run_time")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
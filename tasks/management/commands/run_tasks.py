@@ -0,0 +1,101 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = ("Run queued background tasks with a pool of worker threads, "
+            "retrying failed ones with backoff.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=2,
+            help="Number of worker threads.")
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit when no task is due instead of polling for new ones.")
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds a worker waits between checks for due tasks.")
+        parser.add_argument(
+            "--purge-days", type=int,
+            help="First delete tasks that finished more than this many days "
+                 "ago.")
+        parser.add_argument(
+            "--stats", action="store_true",
+            help="Print counts and timings per task and exit.")
+
+    def handle(self, *args, workers, once, poll_interval, purge_days, stats,
+               **options):
+        if stats:
+            self.print_stats()
+            return
+        if purge_days is not None:
+            self.stdout.write(
+                f"Purged {queue.purge(purge_days)} finished tasks.")
+
+        stop = threading.Event()
+        if workers == 1:
+            try:
+                self.work(stop, once, poll_interval)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        threads = [
+            threading.Thread(target=self.work_in_thread,
+                             args=(stop, once, poll_interval),
+                             name=f"tasks-worker-{i}")
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # Running tasks finish; the rest stay queued.
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def work_in_thread(self, stop, once, poll_interval):
+        try:
+            self.work(stop, once, poll_interval)
+        finally:
+            # Each thread has its own connections.
+            connections.close_all()
+
+    def work(self, stop, once, poll_interval):
+        while not stop.is_set():
+            task = queue.claim()
+            if task is None:
+                if once:
+                    return
+                stop.wait(poll_interval)
+                continue
+
+            queue.run(task)
+            style = (self.style.SUCCESS if task.status == task.DONE
+                     else self.style.ERROR)
+            self.stdout.write(style(
+                f"{task}: {task.status} after attempt {task.attempts} in "
+                f"{task.run_time * 1000:.1f}ms (waited "
+                f"{task.wait_time:.2f}s)"))
+
+    def print_stats(self):
+        rows = queue.stats()
+        if not rows:
+            self.stdout.write("No tasks.")
+            return
+        for row in rows:
+            self.stdout.write(
+                f"{row['name']}: {row['pending']} pending, "
+                f"{row['running']} running, {row['done']} done, "
+                f"{row['failed']} failed; "
+                f"run avg {(row['avg_run'] or 0) * 1000:.1f}ms "
+                f"max {(row['max_run'] or 0) * 1000:.1f}ms, "
+                f"wait avg {row['avg_wait'] or 0:.2f}s")
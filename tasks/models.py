@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    One call of a registered task function, written in the same
+    transaction as the change that needs it (an outbox) and run by the
+    run_tasks worker.
+    """
+    PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"),
+                      (DONE, "Done"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict)
+    idempotency_key = models.CharField(
+        max_length=200, null=True, blank=True, unique=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # Not run before this; pushed back after every failed attempt.
+    run_after = models.DateTimeField(default=timezone.now)
+    # A running task whose worker died is claimed again after this.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Seconds from enqueue to the start of the last attempt, and spent in
+    # the last attempt.
+    wait_time = models.FloatField(null=True, blank=True)
+    run_time = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run_after", "id"],
+                         condition=models.Q(status="pending"),
+                         name="task_pending_idx"),
+            models.Index(fields=["locked_until"],
+                         condition=models.Q(status="running"),
+                         name="task_running_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,164 @@
+import logging
+import random
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q
+from django.utils import timezone
+
+from config.sqlite import run_with_lock_retry
+
+from .models import Task
+
+logger = logging.getLogger("tasks")
+
+# Due tasks a worker tries to claim before giving up until the next poll.
+CLAIM_BATCH = 20
+
+_registry = {}
+# Tasks that eager tasks queue, run once the outer task returns.
+_eager = threading.local()
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """
+    Register ``func`` so ``enqueue(func, **kwargs)`` has a worker call
+    ``func(**kwargs)``. The arguments must be JSON serializable, and the
+    function safe to run again: failed and interrupted attempts are retried.
+    """
+    def register(func):
+        func.task_name = name or f"{func.__module__}.{func.__qualname__}"
+        func.max_attempts = max_attempts or settings.TASKS_MAX_ATTEMPTS
+        _registry[func.task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def enqueue(func, *, idempotency_key=None, delay=0, **kwargs):
+    """
+    Queue ``func(**kwargs)``. Inside a transaction, the task only exists if
+    the transaction commits. Only one task is ever queued per
+    ``idempotency_key``; later calls return the first one.
+
+    With TASKS_ALWAYS_EAGER the function runs right away instead.
+    """
+    if settings.TASKS_ALWAYS_EAGER:
+        run_eagerly(func, kwargs)
+        return None
+
+    fields = {
+        "name": func.task_name,
+        "kwargs": kwargs,
+        "max_attempts": func.max_attempts,
+        "run_after": timezone.now() + timedelta(seconds=delay),
+    }
+    if idempotency_key is None:
+        return Task.objects.create(**fields)
+    queued, _ = Task.objects.get_or_create(
+        idempotency_key=idempotency_key, defaults=fields)
+    return queued
+
+
+def run_eagerly(func, kwargs):
+    pending = getattr(_eager, "pending", None)
+    if pending is not None:
+        # Queued by a task running eagerly: run it afterwards, so a task
+        # that queues its own next step doesn't recurse.
+        pending.append((func, kwargs))
+        return
+    _eager.pending = [(func, kwargs)]
+    try:
+        while _eager.pending:
+            func, kwargs = _eager.pending.pop(0)
+            func(**kwargs)
+    finally:
+        _eager.pending = None
+
+
+def claim():
+    """
+    Take the next due task, or one whose worker's lease ran out, and mark
+    it running for TASKS_LEASE_SECONDS. Returns None when nothing is due.
+    """
+    now = timezone.now()
+    due = (
+        Task.objects.filter(status=Task.PENDING, run_after__lte=now)
+        .order_by("run_after", "pk"),
+        Task.objects.filter(status=Task.RUNNING, locked_until__lt=now)
+        .order_by("locked_until"),
+    )
+    lease = now + timedelta(seconds=settings.TASKS_LEASE_SECONDS)
+    for queryset in due:
+        for pk, attempts in queryset.values_list(
+                "pk", "attempts")[:CLAIM_BATCH]:
+            # Every claim bumps attempts, so only one worker's update can
+            # match.
+            claimed = run_with_lock_retry(lambda: Task.objects.filter(
+                pk=pk, attempts=attempts,
+                status__in=[Task.PENDING, Task.RUNNING],
+            ).update(status=Task.RUNNING, attempts=attempts + 1,
+                     locked_until=lease))
+            if claimed:
+                return Task.objects.get(pk=pk)
+    return None
+
+
+def run(claimed):
+    """Run a claimed task and record its outcome and timings."""
+    func = _registry.get(claimed.name)
+    started_at = timezone.now()
+    start = time.perf_counter()
+    try:
+        if func is None:
+            raise LookupError(f"No task is registered as {claimed.name!r}.")
+        func(**claimed.kwargs)
+    except Exception:
+        claimed.last_error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            claimed.status = Task.FAILED
+            claimed.finished_at = timezone.now()
+        else:
+            claimed.status = Task.PENDING
+            claimed.run_after = timezone.now() + timedelta(
+                seconds=random.uniform(
+                    0, settings.TASKS_RETRY_DELAY * 2 ** claimed.attempts))
+        logger.warning("Task %s failed (attempt %s of %s)", claimed,
+                       claimed.attempts, claimed.max_attempts, exc_info=True)
+    else:
+        claimed.status = Task.DONE
+        claimed.finished_at = timezone.now()
+        claimed.last_error = ""
+
+    claimed.run_time = time.perf_counter() - start
+    claimed.wait_time = (started_at - claimed.created_at).total_seconds()
+    claimed.locked_until = None
+    # Skipped if the lease ran out and another worker claimed it since.
+    run_with_lock_retry(lambda: Task.objects.filter(
+        pk=claimed.pk, attempts=claimed.attempts,
+    ).update(**{field: getattr(claimed, field) for field in (
+        "status", "run_after", "locked_until", "last_error", "finished_at",
+        "wait_time", "run_time")}))
+    return claimed
+
+
+def stats():
+    """Task counts by status, and timings, per task name."""
+    return list(Task.objects.values("name").annotate(
+        **{status: Count("pk", filter=Q(status=status))
+           for status, _ in Task.STATUS_CHOICES},
+        avg_wait=Avg("wait_time"),
+        avg_run=Avg("run_time"),
+        max_run=Max("run_time"),
+    ).order_by("name"))
+
+
+def purge(days):
+    """Delete tasks that finished successfully more than ``days`` ago."""
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE,
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
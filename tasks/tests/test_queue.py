@@ -0,0 +1,215 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from questions import page_cache
+from questions.models import Question
+from questions.search import get_search_backend
+from questions.tasks import refresh_comment_stats
+from questions.tests.utils import create_question
+from tasks import queue
+from tasks.models import Task
+
+calls = []
+
+
+@queue.task
+def record(value):
+    calls.append(value)
+
+
+@queue.task(max_attempts=3)
+def fail(message):
+    calls.append(message)
+    raise RuntimeError(message)
+
+
+@queue.task
+def count_down(n):
+    calls.append(n)
+    if n:
+        queue.enqueue(count_down, n=n - 1)
+
+
+class QueueTestMixin:
+    @pytest.fixture(autouse=True)
+    def queue_tasks(self, settings):
+        settings.TASKS_ALWAYS_EAGER = False
+        settings.TASKS_RETRY_DELAY = 10
+
+    def setUp(self):
+        calls.clear()
+        return super().setUp()
+
+
+class QueueTests(QueueTestMixin, TestCase):
+    def test_enqueue_writes_to_the_outbox(self):
+        task = queue.enqueue(record, value=1)
+
+        self.assertEqual(calls, [])
+        self.assertEqual(task.name, "tasks.tests.test_queue.record")
+        self.assertEqual(task.kwargs, {"value": 1})
+        self.assertEqual(task.status, Task.PENDING)
+
+        claimed = queue.claim()
+        queue.run(claimed)
+
+        self.assertEqual(calls, [1])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.DONE, 1))
+        self.assertIsNotNone(task.run_time)
+        self.assertIsNotNone(task.wait_time)
+        self.assertIsNone(queue.claim())
+
+    def test_idempotency_key_queues_once(self):
+        first = queue.enqueue(record, idempotency_key="welcome:1", value=1)
+        second = queue.enqueue(record, idempotency_key="welcome:1", value=2)
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_delayed_tasks_wait(self):
+        queue.enqueue(record, delay=60, value=1)
+
+        self.assertIsNone(queue.claim())
+
+    def test_failed_tasks_are_retried_with_backoff(self):
+        task = queue.enqueue(fail, message="boom")
+
+        queue.run(queue.claim())
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.PENDING, 1))
+        self.assertIn("RuntimeError: boom", task.last_error)
+        self.assertGreater(task.run_after, task.created_at)
+
+        for attempt in (2, 3):
+            Task.objects.update(run_after=timezone.now())
+            queue.run(queue.claim())
+
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 3))
+        self.assertIsNotNone(task.finished_at)
+        self.assertEqual(calls, ["boom"] * 3)
+        Task.objects.update(run_after=timezone.now())
+        self.assertIsNone(queue.claim())
+
+    def test_tasks_of_a_dead_worker_are_claimed_again(self):
+        task = queue.enqueue(record, value=1)
+        claimed = queue.claim()
+
+        self.assertIsNone(queue.claim())
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = queue.claim()
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (task.pk, 2))
+
+        # The first worker lost the task, so its result isn't recorded.
+        queue.run(claimed)
+        reclaimed.refresh_from_db()
+        self.assertEqual(reclaimed.status, Task.RUNNING)
+
+    def test_unknown_tasks_fail(self):
+        Task.objects.create(name="tasks.missing", max_attempts=1)
+
+        task = queue.run(queue.claim())
+
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertIn("tasks.missing", task.last_error)
+
+    def test_purge_keeps_recent_and_unfinished_tasks(self):
+        old = timezone.now() - timedelta(days=10)
+        Task.objects.create(name="old", status=Task.DONE, finished_at=old)
+        Task.objects.create(name="failed", status=Task.FAILED, finished_at=old)
+        Task.objects.create(name="recent", status=Task.DONE,
+                            finished_at=timezone.now())
+
+        self.assertEqual(queue.purge(7), 1)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_new_comment_is_counted_and_indexed_by_the_worker(self):
+        question = create_question(is_published=True)
+        self.client.login(username="username", password="password")
+        Task.objects.all().delete()
+
+        response = self.client.post(
+            reverse("questions:detail", args=[question.pk]),
+            {"comment_text": "A comment about zeppelins"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(sorted(Task.objects.values_list("name", flat=True)), [
+            "questions.tasks.index_comment",
+            "questions.tasks.refresh_comment_stats",
+        ])
+        question.refresh_from_db()
+        self.assertEqual(question.comment_count, 1)
+        self.assertFalse(get_search_backend().search("zeppelins", limit=10))
+
+        call_command("run_tasks", "--once", "--workers=1", stdout=StringIO())
+
+        question.refresh_from_db()
+        self.assertEqual(question.comment_count, 1)
+        self.assertIsNotNone(question.last_comment_at)
+        results = get_search_backend().search("zeppelins", limit=10)
+        self.assertEqual([pk for pk, _ in results], [question.pk])
+
+    def test_eager_tasks_run_the_tasks_they_queue_afterwards(self):
+        with self.settings(TASKS_ALWAYS_EAGER=True):
+            queue.enqueue(count_down, n=2000)
+
+        self.assertEqual(calls, list(range(2000, -1, -1)))
+        self.assertFalse(Task.objects.exists())
+
+    def test_recounts_purge_cached_pages(self):
+        override = override_settings(PAGE_CACHE_ENABLED=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        page_cache.clear()
+        question = create_question(is_published=True)
+        # A count that drifted from the rows.
+        Question.objects.filter(pk=question.pk).update(comment_count=3)
+        self.assertContains(self.client.get(reverse("questions:list")),
+                            "3 answers")
+
+        queue.enqueue(refresh_comment_stats, question_id=question.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("run_tasks", "--once", "--workers=1",
+                         stdout=StringIO())
+
+        response = self.client.get(reverse("questions:list"))
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "0 answers")
+
+    def test_deleted_rows_are_skipped(self):
+        question = create_question()
+        Question.objects.filter(pk=question.pk).delete()
+
+        call_command("run_tasks", "--once", "--workers=1", stdout=StringIO())
+
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
+
+
+class WorkerPoolTests(QueueTestMixin, TransactionTestCase):
+    # Worker threads have their own connections, so the tasks must be
+    # committed.
+    def test_worker_runs_due_tasks_and_reports_stats(self):
+        for i in range(5):
+            queue.enqueue(record, value=str(i))
+        queue.enqueue(fail, message="boom")
+
+        out = StringIO()
+        call_command("run_tasks", "--once", "--workers=3", stdout=out)
+
+        self.assertEqual(sorted(calls), ["0", "1", "2", "3", "4", "boom"])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 5)
+        self.assertIn("record #", out.getvalue())
+
+        out = StringIO()
+        call_command("run_tasks", "--stats", stdout=out)
+        self.assertIn("tasks.tests.test_queue.fail: 1 pending, 0 running, "
+                      "0 done, 0 failed", out.getvalue())
+        self.assertIn("tasks.tests.test_queue.record: 0 pending, 0 running, "
+                      "5 done, 0 failed", out.getvalue())